@@ -11,6 +11,7 @@ sys.path.append(str(project_root))
 
  
 from app.core.config import settings
+from app.db.session import engine_options
 from app.models import Base   
 
  
@@ -24,12 +25,10 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata   
 
  
+# Migrations run on a single connection, so only the asyncpg options matter here
 async_engine = create_async_engine(
     settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
-    pool_size=32,
-    max_overflow=64,
-    connect_args={"statement_cache_size": 0},
+    **engine_options(pooled=False),
 )
 
 
@@ -0,0 +1,99 @@
+"""drop redundant primary key id indexes
+
+Revision ID: 5d2e8a4f7b19
+Revises: c8cfd96a89cf
+Create Date: 2026-10-16 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = '5d2e8a4f7b19'
+down_revision: Union[str, None] = 'c8cfd96a89cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every table got an ix_<table>_id index next to its primary key index on the
+# same column. Ids are now UUIDv7 generated by the application, so existing
+# rows keep their ids and no data changes.
+TABLES = [
+    "positions",
+    "roles",
+    "compliance_requirements",
+    "employees",
+    "users",
+    "ministries",
+    "departments",
+    "counties",
+    "sub_counties",
+    "wards",
+    "agencies",
+    "divisions",
+    "police_stations",
+    "police_officers",
+    "projects",
+    "government_policies",
+    "allowances",
+    "attendances",
+    "benefits",
+    "education",
+    "employee_disciplinary_actions",
+    "employee_emergency_contacts",
+    "employment_history",
+    "leaves",
+    "performance_reviews",
+    "performance_goals",
+    "qualifications",
+    "salaries",
+    "trainings",
+    "api_keys",
+    "login_attempts",
+    "permissions",
+    "security_audits",
+    "security_configurations",
+    "security_incidents",
+    "two_factor_authentications",
+    "user_activities",
+    "compliance_audits",
+    "compliance_reports",
+    "investigations",
+    "policies",
+    "regulations",
+    "risk_assessments",
+    "risk_registers",
+    "budgets",
+    "budget_items",
+    "expenditures",
+    "financial_reports",
+    "payments",
+    "police_complaints",
+    "police_disciplinary_actions",
+    "police_investigations",
+    "evidence",
+    "incident_reports",
+    "crime_reports",
+    "criminal_cases",
+    "case_updates",
+    "missing_persons",
+    "wanted_persons",
+    "department_performances",
+    "performance_metrics",
+    "service_delivery_metrics",
+    "team_performances",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
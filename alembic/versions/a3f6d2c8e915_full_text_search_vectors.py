@@ -0,0 +1,88 @@
+"""full-text search vectors for complaints and reports
+
+Revision ID: a3f6d2c8e915
+Revises: e41a7c9d3b58
+Create Date: 2026-10-17 01:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+
+revision: str = 'a3f6d2c8e915'
+down_revision: Union[str, None] = 'e41a7c9d3b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_ROWS = sa.text("is_deleted = false")
+
+# (column, weight) pairs indexed per table, stemmed with "english" and kept
+# as written with "simple"; must match search_vector_column in the models
+SEARCH_DOCUMENTS = {
+    'complaints': [('subject', 'A'), ('description', 'B'), ('resolution_details', 'C')],
+    'crime_reports': [('description', 'B'), ('suspect_description', 'C')],
+    'police_complaints': [('subject', 'A'), ('description', 'B'), ('resolution_details', 'C')],
+    'incident_reports': [('title', 'A'), ('description', 'B'), ('resolution_details', 'C')],
+}
+
+
+def search_document(weighted_columns) -> str:
+    return " || ".join(
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for config in ('english', 'simple')
+        for column, weight in weighted_columns
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The initial migration predates complaints and some searched columns.
+    # Tables without every searched column are skipped; create_all builds
+    # the vector with a missing table, and a missing column needs its own
+    # migration first.
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+    tables = [
+        table for table, weighted_columns in SEARCH_DOCUMENTS.items()
+        if table in existing
+        and {column['name'] for column in inspector.get_columns(table)}.issuperset(
+            column for column, _ in weighted_columns
+        )
+    ]
+
+    # Adding a stored generated column rewrites the table, so run this in a
+    # maintenance window on large tables.
+    for table in tables:
+        op.add_column(table, sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(search_document(SEARCH_DOCUMENTS[table]), persisted=True),
+            nullable=True,
+        ))
+
+    with op.get_context().autocommit_block():
+        for table in tables:
+            op.create_index(
+                f'ix_{table}_live_search', table, ['search_vector'],
+                postgresql_using='gin',
+                postgresql_where=LIVE_ROWS,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in SEARCH_DOCUMENTS:
+            op.drop_index(f'ix_{table}_live_search', table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+    for table in SEARCH_DOCUMENTS:
+        if table in existing and 'search_vector' in {column['name'] for column in inspector.get_columns(table)}:
+            op.drop_column(table, 'search_vector')
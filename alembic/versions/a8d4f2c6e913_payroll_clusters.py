@@ -0,0 +1,87 @@
+"""payroll integrity clusters
+
+Revision ID: a8d4f2c6e913
+Revises: f3c8e1b4a720
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = 'a8d4f2c6e913'
+down_revision: Union[str, None] = 'f3c8e1b4a720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_ROWS = sa.text("is_deleted = false")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payroll_clusters',
+        sa.Column('rule', sa.String(length=50), nullable=False),
+        sa.Column('reason', sa.Text(), nullable=False),
+        sa.Column('employee_count', sa.Integer(), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_payroll_clusters_rule_size', 'payroll_clusters', ['rule', 'employee_count', 'id'])
+    op.create_table('payroll_cluster_members',
+        sa.Column('cluster_id', sa.UUID(), nullable=False),
+        sa.Column('employee_id', sa.UUID(), nullable=False),
+        sa.Column('ministry_id', sa.UUID(), nullable=True),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['cluster_id'], ['payroll_clusters.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+        sa.ForeignKeyConstraint(['ministry_id'], ['ministries.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_payroll_cluster_members_cluster', 'payroll_cluster_members', ['cluster_id'])
+    op.create_index('ix_payroll_cluster_members_employee', 'payroll_cluster_members', ['employee_id'])
+    op.create_index('ix_payroll_cluster_members_ministry', 'payroll_cluster_members', ['ministry_id'])
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, but
+    # it does not lock attendances against writes while the index builds.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_attendances_live_employee_date', 'attendances', ['employee_id', 'current_date'],
+            postgresql_where=LIVE_ROWS,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_attendances_live_employee_date', table_name='attendances', postgresql_concurrently=True, if_exists=True)
+    op.drop_index('ix_payroll_cluster_members_ministry', table_name='payroll_cluster_members')
+    op.drop_index('ix_payroll_cluster_members_employee', table_name='payroll_cluster_members')
+    op.drop_index('ix_payroll_cluster_members_cluster', table_name='payroll_cluster_members')
+    op.drop_table('payroll_cluster_members')
+    op.drop_index('ix_payroll_clusters_rule_size', table_name='payroll_clusters')
+    op.drop_table('payroll_clusters')
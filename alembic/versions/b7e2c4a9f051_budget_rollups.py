@@ -0,0 +1,98 @@
+"""budget execution rollups
+
+Revision ID: b7e2c4a9f051
+Revises: a3f6d2c8e915
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = 'b7e2c4a9f051'
+down_revision: Union[str, None] = 'a3f6d2c8e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same totals as app.db.rollups.rebuild_budget_rollups, which also runs daily
+BACKFILL = """
+INSERT INTO budget_rollups (
+    id, created_at, updated_at, is_deleted,
+    fiscal_year, ministry_id, department_id, county_id, category,
+    allocated_amount, approved_amount, spent_amount, committed_amount
+)
+SELECT gen_random_uuid(), now(), now(), false, totals.*
+FROM (
+    SELECT b.fiscal_year, b.ministry_id, b.department_id, b.county_id, NULL::varchar AS category,
+           sum(b.total_amount), sum(b.approved_amount), 0.0, 0.0
+    FROM budgets b
+    WHERE b.is_deleted = false
+    GROUP BY b.fiscal_year, b.ministry_id, b.department_id, b.county_id
+    UNION ALL
+    SELECT b.fiscal_year, b.ministry_id, b.department_id, b.county_id, e.category,
+           0.0, 0.0,
+           coalesce(sum(e.amount) FILTER (WHERE e.status = 'COMPLETED'), 0.0),
+           coalesce(sum(e.amount) FILTER (WHERE e.status IN ('PENDING', 'PROCESSING')), 0.0)
+    FROM expenditures e
+    JOIN budgets b ON b.id = e.budget_id
+    WHERE e.is_deleted = false AND b.is_deleted = false
+    GROUP BY b.fiscal_year, b.ministry_id, b.department_id, b.county_id, e.category
+) AS totals
+"""
+
+# Columns BACKFILL reads that the initial migration does not create
+BACKFILL_COLUMNS = {
+    'budgets': {'approved_amount'},
+    'expenditures': {'budget_id', 'status'},
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('budget_rollups',
+        sa.Column('fiscal_year', sa.String(length=10), nullable=False),
+        sa.Column('ministry_id', sa.UUID(), nullable=True),
+        sa.Column('department_id', sa.UUID(), nullable=True),
+        sa.Column('county_id', sa.UUID(), nullable=True),
+        sa.Column('category', sa.String(length=100), nullable=True),
+        sa.Column('allocated_amount', sa.Float(), nullable=False),
+        sa.Column('approved_amount', sa.Float(), nullable=False),
+        sa.Column('spent_amount', sa.Float(), nullable=False),
+        sa.Column('committed_amount', sa.Float(), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # NULLS NOT DISTINCT (Postgres 15+) lets ON CONFLICT match keys with null dimensions
+    op.create_index(
+        'ux_budget_rollups_key', 'budget_rollups',
+        ['fiscal_year', 'ministry_id', 'department_id', 'county_id', 'category'],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    # Left empty where the budget and expenditure columns have not been
+    # migrated; rebuild_budget_rollups fills it once they are
+    inspector = sa.inspect(op.get_bind())
+    if all(
+        columns <= {column['name'] for column in inspector.get_columns(table)}
+        for table, columns in BACKFILL_COLUMNS.items()
+    ):
+        op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_budget_rollups_key', table_name='budget_rollups')
+    op.drop_table('budget_rollups')
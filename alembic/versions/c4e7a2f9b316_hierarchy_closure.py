@@ -0,0 +1,115 @@
+"""organisational and reporting hierarchy closure tables
+
+Revision ID: c4e7a2f9b316
+Revises: a8d4f2c6e913
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = 'c4e7a2f9b316'
+down_revision: Union[str, None] = 'a8d4f2c6e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same paths as app.db.hierarchy maintains on writes and repairs daily.
+# Soft-deleted units and employees are kept so the live ones under them stay
+# connected; the path array stops at any cycle in the source data.
+ORG_UNIT_BACKFILL = """
+WITH RECURSIVE units (id, parent_id) AS (
+    SELECT id, NULL::uuid FROM ministries
+    UNION ALL SELECT id, ministry_id FROM departments
+    UNION ALL SELECT id, department_id FROM divisions
+    UNION ALL SELECT id, ministry_id FROM agencies
+    UNION ALL SELECT id, NULL::uuid FROM counties
+    UNION ALL SELECT id, county_id FROM sub_counties
+    UNION ALL SELECT id, sub_county_id FROM wards
+), paths (ancestor_id, descendant_id, depth, path) AS (
+    SELECT id, id, 0, ARRAY[id] FROM units
+    UNION ALL
+    SELECT u.parent_id, p.descendant_id, p.depth + 1, p.path || u.parent_id
+    FROM paths p
+    JOIN units u ON u.id = p.ancestor_id
+    WHERE u.parent_id IS NOT NULL AND NOT u.parent_id = ANY(p.path)
+)
+INSERT INTO org_unit_closure (id, created_at, updated_at, is_deleted, ancestor_id, descendant_id, depth)
+SELECT gen_random_uuid(), now(), now(), false, ancestor_id, descendant_id, depth
+FROM paths
+"""
+
+EMPLOYEE_BACKFILL = """
+WITH RECURSIVE paths (ancestor_id, descendant_id, depth, path) AS (
+    SELECT id, id, 0, ARRAY[id] FROM employees
+    UNION ALL
+    SELECT e.supervisor_id, p.descendant_id, p.depth + 1, p.path || e.supervisor_id
+    FROM paths p
+    JOIN employees e ON e.id = p.ancestor_id
+    WHERE e.supervisor_id IS NOT NULL AND NOT e.supervisor_id = ANY(p.path)
+)
+INSERT INTO employee_closure (id, created_at, updated_at, is_deleted, ancestor_id, descendant_id, depth)
+SELECT gen_random_uuid(), now(), now(), false, ancestor_id, descendant_id, depth
+FROM paths
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('org_unit_closure',
+        sa.Column('ancestor_id', sa.UUID(), nullable=False),
+        sa.Column('descendant_id', sa.UUID(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('employee_closure',
+        sa.Column('ancestor_id', sa.UUID(), nullable=False),
+        sa.Column('descendant_id', sa.UUID(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['employees.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['descendant_id'], ['employees.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Indexes are built after the backfill, which is faster than maintaining them row by row
+    op.execute(ORG_UNIT_BACKFILL)
+    op.execute(EMPLOYEE_BACKFILL)
+    op.create_index('ux_org_unit_closure_ancestor_descendant', 'org_unit_closure', ['ancestor_id', 'descendant_id'], unique=True)
+    op.create_index('ix_org_unit_closure_descendant_depth', 'org_unit_closure', ['descendant_id', 'depth'])
+    op.create_index('ux_employee_closure_ancestor_descendant', 'employee_closure', ['ancestor_id', 'descendant_id'], unique=True)
+    op.create_index('ix_employee_closure_descendant_depth', 'employee_closure', ['descendant_id', 'depth'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_employee_closure_descendant_depth', table_name='employee_closure')
+    op.drop_index('ux_employee_closure_ancestor_descendant', table_name='employee_closure')
+    op.drop_table('employee_closure')
+    op.drop_index('ix_org_unit_closure_descendant_depth', table_name='org_unit_closure')
+    op.drop_index('ux_org_unit_closure_ancestor_descendant', table_name='org_unit_closure')
+    op.drop_table('org_unit_closure')
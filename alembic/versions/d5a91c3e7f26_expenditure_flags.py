@@ -0,0 +1,53 @@
+"""expenditure anomaly flags
+
+Revision ID: d5a91c3e7f26
+Revises: b7e2c4a9f051
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = 'd5a91c3e7f26'
+down_revision: Union[str, None] = 'b7e2c4a9f051'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('expenditure_flags',
+        sa.Column('fiscal_year', sa.String(length=10), nullable=False),
+        sa.Column('rule', sa.String(length=50), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('reason', sa.Text(), nullable=False),
+        sa.Column('expenditure_id', sa.UUID(), nullable=False),
+        sa.Column('department_id', sa.UUID(), nullable=True),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ),
+        sa.ForeignKeyConstraint(['expenditure_id'], ['expenditures.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_expenditure_flags_fiscal_year_score', 'expenditure_flags', ['fiscal_year', 'score', 'id'])
+    op.create_index('ix_expenditure_flags_expenditure', 'expenditure_flags', ['expenditure_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenditure_flags_expenditure', table_name='expenditure_flags')
+    op.drop_index('ix_expenditure_flags_fiscal_year_score', table_name='expenditure_flags')
+    op.drop_table('expenditure_flags')
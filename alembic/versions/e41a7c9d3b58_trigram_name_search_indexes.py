@@ -0,0 +1,54 @@
+"""trigram indexes for employee and officer name search
+
+Revision ID: e41a7c9d3b58
+Revises: 9b7c3f1e2a64
+Create Date: 2026-10-17 00:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = 'e41a7c9d3b58'
+down_revision: Union[str, None] = '9b7c3f1e2a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_ROWS = sa.text("is_deleted = false")
+
+# Must stay identical to app.db.name_search.search_name for the planner to use it
+SEARCH_NAME = sa.text(
+    "lower(coalesce(first_name, '') || ' ' || coalesce(middle_name, '') || ' ' || coalesce(last_name, '')) gin_trgm_ops"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, but
+    # it does not lock the tables against writes while the indexes build.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_employees_live_name_trgm', 'employees', [SEARCH_NAME],
+            postgresql_using='gin',
+            postgresql_where=LIVE_ROWS,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_police_officers_live_name_trgm', 'police_officers', [SEARCH_NAME],
+            postgresql_using='gin',
+            postgresql_where=LIVE_ROWS,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_police_officers_live_name_trgm', table_name='police_officers', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_employees_live_name_trgm', table_name='employees', postgresql_concurrently=True, if_exists=True)
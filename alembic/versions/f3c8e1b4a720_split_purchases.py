@@ -0,0 +1,105 @@
+"""split purchase detection
+
+Revision ID: f3c8e1b4a720
+Revises: d5a91c3e7f26
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = 'f3c8e1b4a720'
+down_revision: Union[str, None] = 'd5a91c3e7f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_ROWS = sa.text("is_deleted = false")
+
+# Must stay identical to app.models.finance.vendor_key for the planner to use it
+VENDOR_KEY = sa.text("lower(trim(vendor))")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('split_purchases',
+        sa.Column('vendor', sa.String(length=255), nullable=False),
+        sa.Column('threshold', sa.Float(), nullable=False),
+        sa.Column('payment_count', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('first_date', sa.Date(), nullable=False),
+        sa.Column('last_date', sa.Date(), nullable=False),
+        sa.Column('budget_id', sa.UUID(), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['budget_id'], ['budgets.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_split_purchases_budget_vendor', 'split_purchases', ['budget_id', 'vendor'])
+    op.create_index('ix_split_purchases_last_date', 'split_purchases', ['last_date', 'id'])
+    op.create_table('split_purchase_payments',
+        sa.Column('expenditure_date', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('split_purchase_id', sa.UUID(), nullable=False),
+        sa.Column('expenditure_id', sa.UUID(), nullable=False),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.UUID(), nullable=True),
+        sa.Column('updated_by', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_by', sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['expenditure_id'], ['expenditures.id'], ),
+        sa.ForeignKeyConstraint(['split_purchase_id'], ['split_purchases.id'], ),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_split_purchase_payments_split_purchase', 'split_purchase_payments', ['split_purchase_id'])
+    op.create_index('ix_split_purchase_payments_expenditure', 'split_purchase_payments', ['expenditure_id'])
+
+    # The initial migration creates expenditures without vendor or budget_id
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('expenditures')}
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, but
+    # it does not lock expenditures against writes while the indexes build.
+    with op.get_context().autocommit_block():
+        if {'vendor', 'budget_id'} <= columns:
+            op.create_index(
+                'ix_expenditures_live_vendor_budget_date', 'expenditures',
+                [VENDOR_KEY, 'budget_id', 'expenditure_date'],
+                postgresql_where=LIVE_ROWS,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            'ix_expenditures_updated_at', 'expenditures', ['updated_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_expenditures_updated_at', table_name='expenditures', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_expenditures_live_vendor_budget_date', table_name='expenditures', postgresql_concurrently=True, if_exists=True)
+    op.drop_index('ix_split_purchase_payments_expenditure', table_name='split_purchase_payments')
+    op.drop_index('ix_split_purchase_payments_split_purchase', table_name='split_purchase_payments')
+    op.drop_table('split_purchase_payments')
+    op.drop_index('ix_split_purchases_last_date', table_name='split_purchases')
+    op.drop_index('ix_split_purchases_budget_vendor', table_name='split_purchases')
+    op.drop_table('split_purchases')
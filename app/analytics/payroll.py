@@ -0,0 +1,314 @@
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import delete, exists, func, insert, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.base import uuid7
+from app.models.employee import Attendance, Employee, Leave, LeaveStatus
+from app.models.finance import PayrollCluster, PayrollClusterMember, Salary
+
+SHARED_BANK_ACCOUNT = "shared_bank_account"
+SHARED_PHONE = "shared_phone"
+SHARED_ADDRESS = "shared_address"
+DUPLICATE_NAME = "duplicate_name"
+NO_ATTENDANCE = "no_attendance"
+
+IDENTITY_RULES = (SHARED_BANK_ACCOUNT, SHARED_PHONE, SHARED_ADDRESS, DUPLICATE_NAME)
+
+# Leave that accounts for an employee's absence from the attendance register
+EXCUSED_LEAVE = (LeaveStatus.APPROVED, LeaveStatus.COMPLETED)
+
+_INSERT_BATCH = 5_000
+
+_ALNUM = re.compile(r"[^a-z0-9]+")
+_LETTERS = re.compile(r"[^a-z]+")
+_REPEATS = re.compile(r"(.)\1+")
+_QUIET = re.compile(r"[aeiouhwy]")
+
+
+def bank_key(bank_name: str, account_number: str) -> str:
+    account = _ALNUM.sub("", account_number.lower()).lstrip("0")
+    return f"{_ALNUM.sub('', bank_name.lower())}:{account}" if account else ""
+
+
+def phone_key(phone_number: Optional[str]) -> str:
+    # The last nine digits, so +254 712 ..., 0712 ... and 712 ... agree
+    digits = re.sub(r"\D", "", phone_number or "")
+    return digits[-9:] if len(digits) >= 9 else ""
+
+
+def address_key(address: str) -> str:
+    return " ".join(_ALNUM.split(address.lower())).strip()
+
+
+def name_skeleton(name: Optional[str]) -> str:
+    """
+    A name reduced to its first letter and its remaining consonants, with
+    doubled letters collapsed, so spelling variants such as Jon and John, or
+    Mwangi and Muangi, agree.
+    """
+    letters = _LETTERS.sub("", (name or "").lower())
+    if not letters:
+        return ""
+    return _REPEATS.sub(r"\1", letters[0] + _QUIET.sub("", letters[1:]))
+
+
+def name_key(first_name: str, last_name: str, date_of_birth: Optional[date]) -> str:
+    # Middle names are left out, being recorded inconsistently, and first and
+    # last names are sorted, being swapped often
+    parts = sorted(filter(None, (name_skeleton(first_name), name_skeleton(last_name))))
+    return f"{' '.join(parts)}:{date_of_birth}" if len(parts) == 2 and date_of_birth else ""
+
+
+class HashIndex:
+    """
+    Rows grouped by key in one pass, without comparing rows to each other.
+
+    Keys are stored as their 64-bit hash, which for a million keys has about
+    a one in 36 million chance of any collision, and a key seen once holds a
+    bare row number, so the index stays small for the millions of keys that
+    never repeat. Hashes are salted per process, so an index lives only as
+    long as the scan that builds it. A cluster can hold rows whose keys
+    merely collided, so callers recompute the keys before trusting it.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[int, Union[int, List[int]]] = {}
+
+    def add(self, key: str, row: int) -> None:
+        if not key:
+            return
+        digest = hash(key)
+        bucket = self._buckets.get(digest)
+        if bucket is None:
+            self._buckets[digest] = row
+        elif isinstance(bucket, list):
+            if bucket[-1] != row:
+                bucket.append(row)
+        elif bucket != row:
+            self._buckets[digest] = [bucket, row]
+
+    def clusters(self) -> Iterator[List[int]]:
+        for bucket in self._buckets.values():
+            if isinstance(bucket, list):
+                yield bucket
+
+
+@dataclass
+class Cluster:
+    rule: str
+    rows: List[int]
+
+
+class IdentityIndex:
+    """
+    Employees indexed by every identity field payroll fraud reuses.
+
+    Feed rows with add, in any order, then read the flagged clusters. Only
+    ids and ministries are kept per employee; reasons are built afterwards
+    from the few employees flagged.
+    """
+
+    def __init__(self, max_cluster_size: int):
+        self.max_cluster_size = max_cluster_size
+        self.employee_ids: List[Any] = []
+        self.ministry_ids: List[Any] = []
+        self._indexes = {rule: HashIndex() for rule in IDENTITY_RULES}
+
+    def __len__(self) -> int:
+        return len(self.employee_ids)
+
+    def add(
+        self,
+        employee_id: Any,
+        first_name: str,
+        last_name: str,
+        date_of_birth: Optional[date],
+        phone_number: Optional[str],
+        alternative_phone: Optional[str],
+        physical_address: Optional[str],
+        bank_name: Optional[str],
+        account_number: Optional[str],
+        ministry_id: Any,
+    ) -> None:
+        row = len(self.employee_ids)
+        self.employee_ids.append(employee_id)
+        self.ministry_ids.append(ministry_id)
+
+        self._indexes[SHARED_BANK_ACCOUNT].add(bank_key(bank_name or "", account_number or ""), row)
+        self._indexes[SHARED_PHONE].add(phone_key(phone_number), row)
+        self._indexes[SHARED_PHONE].add(phone_key(alternative_phone), row)
+        self._indexes[SHARED_ADDRESS].add(address_key(physical_address or ""), row)
+        self._indexes[DUPLICATE_NAME].add(name_key(first_name, last_name, date_of_birth), row)
+
+    def clusters(self) -> Iterator[Cluster]:
+        for rule, index in self._indexes.items():
+            for rows in index.clusters():
+                if len(rows) > self.max_cluster_size:
+                    continue
+                if rule == DUPLICATE_NAME and len({self.ministry_ids[row] for row in rows}) < 2:
+                    continue
+                yield Cluster(rule, rows)
+
+
+def identity_keys(rule: str, employee: Any) -> Set[str]:
+    """
+    The keys an employee row is indexed under for rule, as IdentityIndex.add
+    computes them.
+    """
+    if rule == SHARED_BANK_ACCOUNT:
+        keys = {bank_key(employee.bank_name or "", employee.account_number or "")}
+    elif rule == SHARED_PHONE:
+        keys = {phone_key(employee.phone_number), phone_key(employee.alternative_phone)}
+    elif rule == SHARED_ADDRESS:
+        keys = {address_key(employee.physical_address or "")}
+    else:
+        keys = {name_key(employee.first_name, employee.last_name, employee.date_of_birth)}
+    keys.discard("")
+    return keys
+
+
+def _reason(rule: str, employees: List[Any]) -> str:
+    first = employees[0]
+    if rule == SHARED_BANK_ACCOUNT:
+        return f"{len(employees)} employees are paid into account ending {first.account_number[-4:]} at {first.bank_name}"
+    if rule == SHARED_PHONE:
+        return f"{len(employees)} employees share a phone number"
+    if rule == SHARED_ADDRESS:
+        return f"{len(employees)} employees share the address {first.physical_address!r}"
+    names = ", ".join(sorted({
+        " ".join(filter(None, (e.first_name, e.middle_name, e.last_name))) for e in employees
+    }))
+    ministries = len({e.ministry_id for e in employees})
+    return f"{names}: near-identical names, born {first.date_of_birth}, in {ministries} ministries"
+
+
+def _identity_query():
+    return select(
+        Employee.id, Employee.first_name, Employee.last_name, Employee.date_of_birth,
+        Employee.phone_number, Employee.alternative_phone, Employee.physical_address,
+        Employee.bank_name, Employee.account_number, Employee.ministry_id,
+    ).execution_options(yield_per=settings.PAYROLL_BATCH_SIZE)
+
+
+async def build_identity_index(db: AsyncSession) -> IdentityIndex:
+    """
+    Index every live employee in one streaming pass.
+    """
+    index = IdentityIndex(settings.PAYROLL_MAX_CLUSTER_SIZE)
+    result = await db.stream(_identity_query())
+    async for batch in result.partitions():
+        for row in batch:
+            index.add(*row)
+    return index
+
+
+async def _flagged_employees(db: AsyncSession, employee_ids: List[Any]) -> Dict[Any, Any]:
+    employees = {}
+    for start in range(0, len(employee_ids), _INSERT_BATCH):
+        query = select(
+            Employee.id, Employee.first_name, Employee.middle_name, Employee.last_name, Employee.date_of_birth,
+            Employee.phone_number, Employee.alternative_phone, Employee.physical_address,
+            Employee.bank_name, Employee.account_number, Employee.ministry_id,
+        ).where(Employee.id.in_(employee_ids[start:start + _INSERT_BATCH]))
+        employees.update((row.id, row) for row in (await db.execute(query)).all())
+    return employees
+
+
+def _unattended_query(today: date):
+    """
+    Employees drawing a salary for the whole attendance window who have no
+    attendance in it and no leave covering it.
+    """
+    window_start = today - timedelta(days=settings.PAYROLL_ATTENDANCE_DAYS)
+    attended = exists().where(
+        Attendance.employee_id == Salary.employee_id,
+        Attendance.current_date >= window_start,
+    )
+    on_leave = exists().where(
+        Leave.employee_id == Salary.employee_id,
+        Leave.status.in_(EXCUSED_LEAVE),
+        Leave.start_date <= window_start,
+        Leave.end_date >= today,
+    )
+    return (
+        select(Salary.employee_id, Employee.ministry_id, func.min(Salary.effective_date).label("salaried_since"))
+        .join(Salary.employee)
+        .where(
+            Salary.effective_date <= window_start,
+            or_(Salary.end_date.is_(None), Salary.end_date >= today),
+            ~attended,
+            ~on_leave,
+        )
+        .group_by(Salary.employee_id, Employee.ministry_id)
+    )
+
+
+async def _write_clusters(db: AsyncSession, clusters: List[Tuple[str, str, List[Tuple[Any, Any]]]]) -> None:
+    for start in range(0, len(clusters), _INSERT_BATCH):
+        rows, members = [], []
+        for rule, reason, employees in clusters[start:start + _INSERT_BATCH]:
+            cluster_id = uuid7()
+            rows.append({"id": cluster_id, "rule": rule, "reason": reason, "employee_count": len(employees)})
+            members.extend(
+                {"cluster_id": cluster_id, "employee_id": employee_id, "ministry_id": ministry_id}
+                for employee_id, ministry_id in employees
+            )
+        await db.execute(insert(PayrollCluster), rows)
+        await db.execute(insert(PayrollClusterMember), members)
+
+
+async def scan_payroll(db: AsyncSession, today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Replace every payroll cluster with a fresh scan of employees, salaries
+    and attendance. Returns the number of clusters per rule; the caller
+    commits.
+    """
+    index = await build_identity_index(db)
+    found = list(index.clusters())
+    employees = await _flagged_employees(
+        db, list(dict.fromkeys(index.employee_ids[row] for cluster in found for row in cluster.rows))
+    )
+    clusters, written = [], set()
+    for cluster in found:
+        # Skipping any employee deleted since the index was built
+        members = [employees[e] for e in (index.employee_ids[row] for row in cluster.rows) if e in employees]
+        # The index grouped rows by key hash, so members are regrouped by
+        # the keys themselves, dropping any whose key only collided
+        by_key: Dict[str, List[Any]] = {}
+        for employee in members:
+            for key in identity_keys(cluster.rule, employee):
+                by_key.setdefault(key, []).append(employee)
+        for key, group in by_key.items():
+            if len(group) < 2 or (cluster.rule, key) in written:
+                continue
+            if cluster.rule == DUPLICATE_NAME and len({e.ministry_id for e in group}) < 2:
+                continue
+            written.add((cluster.rule, key))
+            clusters.append((cluster.rule, _reason(cluster.rule, group), [(e.id, e.ministry_id) for e in group]))
+
+    unattended = await db.execute(_unattended_query(today or date.today()))
+    clusters.extend(
+        (
+            NO_ATTENDANCE,
+            f"Salaried since {row.salaried_since} with no attendance in the last "
+            f"{settings.PAYROLL_ATTENDANCE_DAYS} days",
+            [(row.employee_id, row.ministry_id)],
+        )
+        for row in unattended
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"LOCK TABLE {PayrollCluster.__tablename__} IN EXCLUSIVE MODE"))
+    await db.execute(delete(PayrollClusterMember))
+    await db.execute(delete(PayrollCluster))
+    await _write_clusters(db, clusters)
+
+    counts = dict.fromkeys((*IDENTITY_RULES, NO_ATTENDANCE), 0)
+    for rule, _, _ in clusters:
+        counts[rule] += 1
+    return counts
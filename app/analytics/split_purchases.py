@@ -0,0 +1,251 @@
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.anomalies import SKIPPED_STATUSES
+from app.core.config import settings
+from app.models.base import INCLUDE_DELETED, uuid7
+from app.models.finance import Expenditure, SplitPurchase, SplitPurchasePayment, vendor_key
+
+# (vendor, budget_id) pairs rescanned per statement by incremental scans
+_KEY_BATCH = 500
+
+_INSERT_BATCH = 5_000
+
+
+@dataclass
+class Payment:
+    seq: int  # position in the scan, so windows and groups can be compared cheaply
+    expenditure_id: Any
+    expenditure_date: date
+    amount: float
+
+
+@dataclass
+class Group:
+    vendor: str
+    budget_id: Any
+    threshold: float
+    payments: List[Payment] = field(default_factory=list)
+
+
+class SplitPurchaseDetector:
+    """
+    Finds split purchases in payments fed one at a time, ordered by vendor,
+    budget and date.
+
+    Each payment counts towards the lowest approval threshold above it, if
+    it is at least SPLIT_PURCHASE_MIN_FRACTION of that threshold. A sliding
+    window per threshold holds the counted payments at most
+    SPLIT_PURCHASE_WINDOW_DAYS apart; whenever it holds
+    SPLIT_PURCHASE_MIN_PAYMENTS or more whose total reaches the threshold,
+    they join the open group for that threshold, or start a new one if the
+    window no longer overlaps it. State is kept only for the current vendor
+    and budget, so memory is bounded by the window, not the table.
+    """
+
+    def __init__(
+        self,
+        thresholds: Sequence[float],
+        window_days: int,
+        min_payments: int,
+        min_fraction: float,
+    ):
+        self.thresholds = sorted(thresholds)
+        self.window_days = window_days
+        self.min_payments = min_payments
+        self.min_fraction = min_fraction
+        self._key: Optional[Tuple[str, Any]] = None
+        self._windows: Dict[float, Deque[Payment]] = {}
+        self._groups: Dict[float, Group] = {}
+        self._seq = 0
+
+    def threshold_for(self, amount: float) -> Optional[float]:
+        """
+        The approval threshold a payment of amount evades, or None.
+        """
+        position = bisect_right(self.thresholds, amount)
+        if position == len(self.thresholds):
+            return None
+        threshold = self.thresholds[position]
+        return threshold if amount >= threshold * self.min_fraction else None
+
+    def feed(
+        self, vendor: str, budget_id: Any, expenditure_id: Any, expenditure_date: date, amount: float
+    ) -> Iterator[Group]:
+        """
+        Add the next payment, yielding any groups it closes.
+        """
+        if (vendor, budget_id) != self._key:
+            yield from self.finish()
+            self._key = (vendor, budget_id)
+
+        threshold = self.threshold_for(amount)
+        if threshold is None:
+            return
+        self._seq += 1
+        payment = Payment(self._seq, expenditure_id, expenditure_date, amount)
+
+        window = self._windows.setdefault(threshold, deque())
+        window.append(payment)
+        while (expenditure_date - window[0].expenditure_date).days > self.window_days:
+            window.popleft()
+        if len(window) < self.min_payments or sum(p.amount for p in window) < threshold:
+            return
+
+        group = self._groups.get(threshold)
+        if group is not None and window[0].seq <= group.payments[-1].seq:
+            last = group.payments[-1].seq
+            group.payments.extend(p for p in window if p.seq > last)
+            return
+        if group is not None:
+            yield group
+        self._groups[threshold] = Group(vendor, budget_id, threshold, list(window))
+
+    def finish(self) -> Iterator[Group]:
+        """
+        Yield the groups still open and reset for the next vendor and budget.
+        """
+        yield from sorted(self._groups.values(), key=lambda group: group.payments[0].seq)
+        self._windows.clear()
+        self._groups.clear()
+
+
+def _detector() -> SplitPurchaseDetector:
+    return SplitPurchaseDetector(
+        settings.SPLIT_PURCHASE_THRESHOLDS,
+        settings.SPLIT_PURCHASE_WINDOW_DAYS,
+        settings.SPLIT_PURCHASE_MIN_PAYMENTS,
+        settings.SPLIT_PURCHASE_MIN_FRACTION,
+    )
+
+
+def _candidates_query():
+    """
+    Live payments that could count towards a threshold, in scan order.
+    """
+    thresholds = settings.SPLIT_PURCHASE_THRESHOLDS
+    vendor = vendor_key(Expenditure)
+    return (
+        select(vendor, Expenditure.budget_id, Expenditure.id, Expenditure.expenditure_date, Expenditure.amount)
+        .where(
+            Expenditure.status.not_in(SKIPPED_STATUSES),
+            Expenditure.amount >= min(thresholds) * settings.SPLIT_PURCHASE_MIN_FRACTION,
+            Expenditure.amount < max(thresholds),
+        )
+        .order_by(vendor, Expenditure.budget_id, Expenditure.expenditure_date, Expenditure.id)
+        .execution_options(yield_per=settings.SPLIT_PURCHASE_BATCH_SIZE)
+    )
+
+
+async def _write_groups(db: AsyncSession, groups: List[Group]) -> None:
+    purchases, payments = [], []
+    for group in groups:
+        purchase_id = uuid7()
+        purchases.append({
+            "id": purchase_id,
+            "vendor": group.vendor,
+            "budget_id": group.budget_id,
+            "threshold": group.threshold,
+            "payment_count": len(group.payments),
+            "total_amount": sum(payment.amount for payment in group.payments),
+            "first_date": group.payments[0].expenditure_date,
+            "last_date": group.payments[-1].expenditure_date,
+        })
+        payments.extend(
+            {
+                "split_purchase_id": purchase_id,
+                "expenditure_id": payment.expenditure_id,
+                "expenditure_date": payment.expenditure_date,
+                "amount": payment.amount,
+            }
+            for payment in group.payments
+        )
+    if purchases:
+        await db.execute(insert(SplitPurchase), purchases)
+        await db.execute(insert(SplitPurchasePayment), payments)
+
+
+async def _scan(db: AsyncSession, query) -> int:
+    """
+    Stream query's payments through a detector in one pass, writing the
+    groups found as they close. Returns the number of groups.
+    """
+    detector = _detector()
+    pending: List[Group] = []
+    found = 0
+    result = await db.stream(query)
+    async for row in result:
+        pending.extend(detector.feed(*row))
+        if len(pending) >= _INSERT_BATCH:
+            await _write_groups(db, pending)
+            found += len(pending)
+            pending = []
+    pending.extend(detector.finish())
+    await _write_groups(db, pending)
+    return found + len(pending)
+
+
+async def _lock(db: AsyncSession) -> None:
+    # One scan writes at a time, so overlapping scans cannot both insert a
+    # group; readers are not blocked
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"LOCK TABLE {SplitPurchase.__tablename__} IN EXCLUSIVE MODE"))
+
+
+async def rescan_split_purchases(db: AsyncSession) -> int:
+    """
+    Replace every split purchase with those found in a full scan of the
+    expenditures. Returns the number found; the caller commits.
+    """
+    await _lock(db)
+    await db.execute(delete(SplitPurchasePayment))
+    await db.execute(delete(SplitPurchase))
+    return await _scan(db, _candidates_query())
+
+
+async def scan_split_purchases_since(db: AsyncSession, since: datetime) -> int:
+    """
+    Rescan only the vendors and budgets with expenditures created, changed
+    or deleted since the given time, replacing their split purchases.
+    Returns the number found; the caller commits.
+
+    An expenditure whose vendor or budget changed is rescanned under its
+    new key, and under the key of any split purchase it belonged to, so the
+    group it left is rebuilt without it.
+    """
+    changed = (
+        select(vendor_key(Expenditure), Expenditure.budget_id)
+        .where(Expenditure.updated_at >= since)
+        .distinct()
+        .execution_options(**{INCLUDE_DELETED: True})
+    )
+    left = (
+        select(SplitPurchase.vendor, SplitPurchase.budget_id)
+        .join(SplitPurchasePayment, SplitPurchasePayment.split_purchase_id == SplitPurchase.id)
+        .join(Expenditure, Expenditure.id == SplitPurchasePayment.expenditure_id)
+        .where(Expenditure.updated_at >= since)
+        .distinct()
+        .execution_options(**{INCLUDE_DELETED: True})
+    )
+    keys = list(dict.fromkeys(
+        [tuple(key) for key in (await db.execute(changed)).all()]
+        + [tuple(key) for key in (await db.execute(left)).all()]
+    ))
+    if keys:
+        await _lock(db)
+
+    found = 0
+    for start in range(0, len(keys), _KEY_BATCH):
+        batch = keys[start:start + _KEY_BATCH]
+        stale = select(SplitPurchase.id).where(tuple_(SplitPurchase.vendor, SplitPurchase.budget_id).in_(batch))
+        await db.execute(delete(SplitPurchasePayment).where(SplitPurchasePayment.split_purchase_id.in_(stale)))
+        await db.execute(delete(SplitPurchase).where(SplitPurchase.id.in_(stale)))
+        query = _candidates_query().where(tuple_(vendor_key(Expenditure), Expenditure.budget_id).in_(batch))
+        found += await _scan(db, query)
+    return found
@@ -14,6 +14,7 @@ from app.api.v1.routes import (
     users,
     roles,
     password_reset,
+    search,
 )
 
 api_router = APIRouter()
@@ -30,3 +31,4 @@ api_router.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
 api_router.include_router(complaints.router, prefix="/complaints", tags=["complaints"])
 api_router.include_router(police.router, prefix="/police", tags=["police"])
 api_router.include_router(crime_reports.router, prefix="/crime-reports", tags=["crime-reports"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
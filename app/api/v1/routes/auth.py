@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.controllers import auth_controller
 from app.auth.jwt import get_current_active_user
+from app.auth.security import verify_password_async
 from app.db.session import get_db
 from app.schemas import auth_schema
 from app.models.employee import UserAccount
@@ -56,7 +57,7 @@ async def change_password(
     Change the current user's password.
     """
     # Verify current password
-    if not auth_controller.verify_password(password_data.current_password, current_user.password_hash):
+    if not await verify_password_async(password_data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
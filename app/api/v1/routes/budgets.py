@@ -1,92 +1,252 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from datetime import date
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_db, get_read_db
 from app.controllers import budget_controller
 from app.schemas import budget_schema
+from app.schemas.pagination_schema import CursorPage
+from app.schemas.export_schema import ExportFormatEnum
+from app.auth.jwt import get_optional_principal, has_permission
+from app.auth.permissions import Permissions
+from app.auth.principal import Principal
+from app.models.employee import UserAccount
 
 router = APIRouter()
 
 @router.get("/", response_model=List[budget_schema.Budget])
-def get_budgets(
+async def get_budgets(
     skip: int = 0,
     limit: int = 100,
     fiscal_year: Optional[str] = None,
     ministry_id: Optional[int] = None,
     department_id: Optional[int] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    org_unit_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Retrieve all budgets with optional filtering.
+    Retrieve all budgets with optional filtering. org_unit_id matches budgets
+    anywhere under a ministry, department, agency or county unit.
     """
-    return budget_controller.get_budgets(
+    return await budget_controller.get_budgets(
         db, skip=skip, limit=limit, fiscal_year=fiscal_year,
-        ministry_id=ministry_id, department_id=department_id, status=status
+        ministry_id=ministry_id, department_id=department_id, status=status, org_unit_id=org_unit_id
+    )
+
+@router.get("/cursor", response_model=CursorPage[budget_schema.Budget])
+async def get_budgets_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fiscal_year: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Retrieve budgets using keyset pagination. Pass the returned next_cursor to fetch the following page.
+    """
+    return await budget_controller.get_budgets_page(
+        db, cursor=cursor, limit=limit, fiscal_year=fiscal_year,
+        ministry_id=ministry_id, department_id=department_id, status=status, org_unit_id=org_unit_id
+    )
+
+@router.get("/export")
+async def export_budgets(
+    request: Request,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format"),
+    fiscal_year: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    principal: Optional[Principal] = Depends(get_optional_principal)
+):
+    """
+    Download every budget matching the filters as CSV or NDJSON, streamed and
+    gzip-compressed when the client accepts it. Names of individual civil
+    servants are redacted unless the caller may read employee records.
+    """
+    return budget_controller.export_budgets(
+        request, export_format, principal=principal, fiscal_year=fiscal_year,
+        ministry_id=ministry_id, department_id=department_id, status=status, org_unit_id=org_unit_id
+    )
+
+@router.get("/rollups", response_model=List[budget_schema.BudgetRollup])
+async def get_budget_rollups(
+    group_by: List[budget_schema.RollupDimensionEnum] = Query([]),
+    fiscal_year: Optional[str] = None,
+    ministry_id: Optional[uuid.UUID] = None,
+    department_id: Optional[uuid.UUID] = None,
+    county_id: Optional[uuid.UUID] = None,
+    category: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Allocated, approved, spent and committed totals, summed over the filters
+    and broken down by each group_by dimension (repeat it to group by several).
+    Allocated and approved amounts have no expenditure category, so they only
+    appear where category is not grouped by or filtered on.
+    """
+    return await budget_controller.get_budget_rollups(
+        db, group_by=list(dict.fromkeys(group_by)), fiscal_year=fiscal_year, ministry_id=ministry_id,
+        department_id=department_id, county_id=county_id, category=category
+    )
+
+@router.get("/anomalies", response_model=CursorPage[budget_schema.ExpenditureFlag])
+async def get_expenditure_flags(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fiscal_year: Optional[str] = None,
+    rule: Optional[budget_schema.AnomalyRuleEnum] = None,
+    department_id: Optional[uuid.UUID] = None,
+    vendor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission(Permissions.BUDGET_READ))
+):
+    """
+    Expenditures flagged by the daily anomaly scan, highest score first: amounts
+    far above the usual for their vendor and category, leading digits at odds
+    with Benford's law in their department, and vendors paid round amounts
+    unusually often. A flag is a lead for review, not a finding.
+    """
+    return await budget_controller.get_expenditure_flags(
+        db, cursor=cursor, limit=limit, fiscal_year=fiscal_year,
+        rule=rule, department_id=department_id, vendor=vendor
+    )
+
+@router.get("/split-purchases", response_model=CursorPage[budget_schema.SplitPurchase])
+async def get_split_purchases(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    budget_id: Optional[uuid.UUID] = None,
+    vendor: Optional[str] = None,
+    threshold: Optional[float] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission(Permissions.BUDGET_READ))
+):
+    """
+    Groups of payments to one vendor from one budget that each stay under an
+    approval threshold but together exceed it within a few days, most recent
+    first. since and until select groups overlapping that date range.
+    """
+    return await budget_controller.get_split_purchases(
+        db, cursor=cursor, limit=limit, budget_id=budget_id, vendor=vendor,
+        threshold=threshold, since=since, until=until
     )
 
 @router.post("/", response_model=budget_schema.Budget, status_code=status.HTTP_201_CREATED)
-def create_budget(
+async def create_budget(
     budget: budget_schema.BudgetCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new budget.
     """
-    return budget_controller.create_budget(db, budget=budget)
+    return await budget_controller.create_budget(db, budget=budget)
 
 @router.get("/{budget_id}", response_model=budget_schema.BudgetDetail)
-def get_budget(
+async def get_budget(
     budget_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific budget.
     """
-    db_budget = budget_controller.get_budget(db, budget_id=budget_id)
+    db_budget = await budget_controller.get_budget(db, budget_id=budget_id)
     if db_budget is None:
         raise HTTPException(status_code=404, detail="Budget not found")
     return db_budget
 
 @router.put("/{budget_id}", response_model=budget_schema.Budget)
-def update_budget(
+async def update_budget(
     budget_id: int,
     budget: budget_schema.BudgetUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a budget.
     """
-    db_budget = budget_controller.get_budget(db, budget_id=budget_id)
+    db_budget = await budget_controller.get_budget(db, budget_id=budget_id)
     if db_budget is None:
         raise HTTPException(status_code=404, detail="Budget not found")
-    return budget_controller.update_budget(db, budget_id=budget_id, budget=budget)
+    return await budget_controller.update_budget(db, budget_id=budget_id, budget=budget)
 
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_budget(
+async def delete_budget(
     budget_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a budget (soft delete).
     """
-    db_budget = budget_controller.get_budget(db, budget_id=budget_id)
+    db_budget = await budget_controller.get_budget(db, budget_id=budget_id)
     if db_budget is None:
         raise HTTPException(status_code=404, detail="Budget not found")
-    budget_controller.delete_budget(db, budget_id=budget_id)
+    await budget_controller.delete_budget(db, budget_id=budget_id)
     return None
 
 @router.get("/{budget_id}/expenditures", response_model=List[budget_schema.Expenditure])
-def get_budget_expenditures(
+async def get_budget_expenditures(
     budget_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all expenditures for a specific budget.
     """
-    db_budget = budget_controller.get_budget(db, budget_id=budget_id)
+    db_budget = await budget_controller.get_budget(db, budget_id=budget_id)
     if db_budget is None:
         raise HTTPException(status_code=404, detail="Budget not found")
-    return budget_controller.get_budget_expenditures(db, budget_id=budget_id)
+    return await budget_controller.get_budget_expenditures(db, budget_id=budget_id)
+
+@router.post("/{budget_id}/expenditures", response_model=budget_schema.Expenditure, status_code=status.HTTP_201_CREATED)
+async def create_expenditure(
+    budget_id: int,
+    expenditure: budget_schema.ExpenditureCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Record an expenditure against a budget.
+    """
+    db_expenditure = await budget_controller.create_expenditure(db, budget_id=budget_id, expenditure=expenditure)
+    if db_expenditure is None:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return db_expenditure
 
+@router.put("/{budget_id}/expenditures/{expenditure_id}", response_model=budget_schema.Expenditure)
+async def update_expenditure(
+    budget_id: int,
+    expenditure_id: int,
+    expenditure: budget_schema.ExpenditureUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update an expenditure.
+    """
+    db_expenditure = await budget_controller.update_expenditure(
+        db, budget_id=budget_id, expenditure_id=expenditure_id, expenditure=expenditure
+    )
+    if db_expenditure is None:
+        raise HTTPException(status_code=404, detail="Expenditure not found")
+    return db_expenditure
+
+@router.delete("/{budget_id}/expenditures/{expenditure_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_expenditure(
+    budget_id: int,
+    expenditure_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delete an expenditure (soft delete).
+    """
+    db_expenditure = await budget_controller.delete_expenditure(db, budget_id=budget_id, expenditure_id=expenditure_id)
+    if db_expenditure is None:
+        raise HTTPException(status_code=404, detail="Expenditure not found")
+    return None
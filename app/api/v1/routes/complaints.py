@@ -1,93 +1,141 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_db, get_read_db
 from app.controllers import complaint_controller
 from app.schemas import complaint_schema
+from app.schemas.pagination_schema import CursorPage
+from app.schemas.export_schema import ExportFormatEnum
+from app.auth.jwt import get_optional_principal
+from app.auth.principal import Principal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[complaint_schema.Complaint])
-def get_complaints(
+async def get_complaints(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     ministry_id: Optional[int] = None,
     department_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    org_unit_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Retrieve all complaints with optional filtering.
+    Retrieve all complaints with optional filtering. org_unit_id matches complaints
+    anywhere under a ministry, department, agency or county unit.
     """
-    return complaint_controller.get_complaints(
+    return await complaint_controller.get_complaints(
         db, skip=skip, limit=limit, status=status, priority=priority,
-        ministry_id=ministry_id, department_id=department_id
+        ministry_id=ministry_id, department_id=department_id, org_unit_id=org_unit_id
+    )
+
+@router.get("/cursor", response_model=CursorPage[complaint_schema.Complaint])
+async def get_complaints_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Retrieve complaints newest first using keyset pagination. Pass the returned next_cursor to fetch the following page.
+    """
+    return await complaint_controller.get_complaints_page(
+        db, cursor=cursor, limit=limit, status=status, priority=priority,
+        ministry_id=ministry_id, department_id=department_id, org_unit_id=org_unit_id
+    )
+
+@router.get("/export")
+async def export_complaints(
+    request: Request,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format"),
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    principal: Optional[Principal] = Depends(get_optional_principal)
+):
+    """
+    Download every complaint matching the filters as CSV or NDJSON, streamed
+    and gzip-compressed when the client accepts it. Complainant details are
+    redacted unless the caller may handle complaints, and always for anonymous complaints.
+    """
+    return complaint_controller.export_complaints(
+        request, export_format, principal=principal, status=status, priority=priority,
+        ministry_id=ministry_id, department_id=department_id, org_unit_id=org_unit_id
     )
 
 @router.post("/", response_model=complaint_schema.Complaint, status_code=status.HTTP_201_CREATED)
-def create_complaint(
+async def create_complaint(
     complaint: complaint_schema.ComplaintCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new complaint.
     """
-    return complaint_controller.create_complaint(db, complaint=complaint)
+    return await complaint_controller.create_complaint(db, complaint=complaint)
 
 @router.get("/{complaint_id}", response_model=complaint_schema.ComplaintDetail)
-def get_complaint(
+async def get_complaint(
     complaint_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific complaint.
     """
-    db_complaint = complaint_controller.get_complaint(db, complaint_id=complaint_id)
+    db_complaint = await complaint_controller.get_complaint(db, complaint_id=complaint_id)
     if db_complaint is None:
         raise HTTPException(status_code=404, detail="Complaint not found")
     return db_complaint
 
 @router.put("/{complaint_id}", response_model=complaint_schema.Complaint)
-def update_complaint(
+async def update_complaint(
     complaint_id: int,
     complaint: complaint_schema.ComplaintUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a complaint.
     """
-    db_complaint = complaint_controller.get_complaint(db, complaint_id=complaint_id)
+    db_complaint = await complaint_controller.get_complaint(db, complaint_id=complaint_id)
     if db_complaint is None:
         raise HTTPException(status_code=404, detail="Complaint not found")
-    return complaint_controller.update_complaint(db, complaint_id=complaint_id, complaint=complaint)
+    return await complaint_controller.update_complaint(db, complaint_id=complaint_id, complaint=complaint)
 
 @router.delete("/{complaint_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_complaint(
+async def delete_complaint(
     complaint_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a complaint (soft delete).
     """
-    db_complaint = complaint_controller.get_complaint(db, complaint_id=complaint_id)
+    db_complaint = await complaint_controller.get_complaint(db, complaint_id=complaint_id)
     if db_complaint is None:
         raise HTTPException(status_code=404, detail="Complaint not found")
-    complaint_controller.delete_complaint(db, complaint_id=complaint_id)
+    await complaint_controller.delete_complaint(db, complaint_id=complaint_id)
     return None
 
 @router.post("/{complaint_id}/assign", response_model=complaint_schema.Complaint)
-def assign_complaint(
+async def assign_complaint(
     complaint_id: int,
     assignment: complaint_schema.ComplaintAssignment,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Assign a complaint to an employee.
     """
-    db_complaint = complaint_controller.get_complaint(db, complaint_id=complaint_id)
+    db_complaint = await complaint_controller.get_complaint(db, complaint_id=complaint_id)
     if db_complaint is None:
         raise HTTPException(status_code=404, detail="Complaint not found")
-    return complaint_controller.assign_complaint(db, complaint_id=complaint_id, assignment=assignment)
+    return await complaint_controller.assign_complaint(db, complaint_id=complaint_id, assignment=assignment)
 
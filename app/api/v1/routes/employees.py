@@ -1,17 +1,22 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_db, get_read_db
 from app.controllers import employee_controller
 from app.schemas import employee_schema
+from app.schemas.pagination_schema import CursorPage
+from app.schemas.export_schema import ExportFormatEnum
+from app.schemas.search_schema import NameMatch
 from app.auth.jwt import get_current_active_user, has_permission
 from app.models.employee import UserAccount
 
 router = APIRouter()
 
 @router.get("/", response_model=List[employee_schema.Employee])
-def get_employees(
+async def get_employees(
     skip: int = 0,
     limit: int = 100,
     name: Optional[str] = None,
@@ -19,83 +24,180 @@ def get_employees(
     ministry_id: Optional[int] = None,
     department_id: Optional[int] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    org_unit_id: Optional[uuid.UUID] = None,
+    reports_to: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserAccount = Depends(has_permission("employee:read"))
 ):
     """
-    Retrieve all employees with optional filtering.
+    Retrieve all employees with optional filtering. org_unit_id matches
+    employees anywhere under a ministry, department, agency or county unit;
+    reports_to matches everyone reporting to an employee, directly or not.
     """
-    return employee_controller.get_employees(
+    return await employee_controller.get_employees(
         db, skip=skip, limit=limit, name=name, position_id=position_id,
-        ministry_id=ministry_id, department_id=department_id, status=status
+        ministry_id=ministry_id, department_id=department_id, status=status,
+        org_unit_id=org_unit_id, reports_to=reports_to
+    )
+
+@router.get("/cursor", response_model=CursorPage[employee_schema.Employee])
+async def get_employees_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    name: Optional[str] = None,
+    position_id: Optional[int] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    reports_to: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission("employee:read"))
+):
+    """
+    Retrieve employees using keyset pagination. Pass the returned next_cursor to fetch the following page.
+    """
+    return await employee_controller.get_employees_page(
+        db, cursor=cursor, limit=limit, name=name, position_id=position_id,
+        ministry_id=ministry_id, department_id=department_id, status=status,
+        org_unit_id=org_unit_id, reports_to=reports_to
+    )
+
+@router.get("/search", response_model=List[NameMatch[employee_schema.Employee]])
+async def search_employees(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission("employee:read"))
+):
+    """
+    Find employees by name, tolerating misspellings. Best matches come first.
+    """
+    return await employee_controller.search_employees(db, q=q, limit=limit)
+
+@router.get("/payroll-flags", response_model=CursorPage[employee_schema.PayrollCluster])
+async def get_payroll_clusters(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    rule: Optional[employee_schema.PayrollRuleEnum] = None,
+    ministry_id: Optional[uuid.UUID] = None,
+    employee_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission("employee:read"))
+):
+    """
+    Possible ghost workers and duplicate identities found by the daily payroll
+    scan, largest clusters first: employees sharing a bank account, phone
+    number or address, near-identical names and birth dates across
+    ministries, and salaried employees with no recent attendance.
+    """
+    return await employee_controller.get_payroll_clusters(
+        db, cursor=cursor, limit=limit, rule=rule, ministry_id=ministry_id, employee_id=employee_id
     )
 
 @router.post("/", response_model=employee_schema.Employee, status_code=status.HTTP_201_CREATED)
-def create_employee(
+async def create_employee(
     employee: employee_schema.EmployeeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserAccount = Depends(has_permission("employee:create"))
 ):
     """
     Create a new employee.
     """
-    return employee_controller.create_employee(db, employee=employee)
+    return await employee_controller.create_employee(db, employee=employee)
 
 @router.get("/{employee_id}", response_model=employee_schema.EmployeeDetail)
-def get_employee(
+async def get_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserAccount = Depends(has_permission("employee:read"))
 ):
     """
     Get detailed information about a specific employee.
     """
-    db_employee = employee_controller.get_employee(db, employee_id=employee_id)
+    db_employee = await employee_controller.get_employee(db, employee_id=employee_id)
     if db_employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
     return db_employee
 
 @router.put("/{employee_id}", response_model=employee_schema.Employee)
-def update_employee(
+async def update_employee(
     employee_id: int,
     employee: employee_schema.EmployeeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserAccount = Depends(has_permission("employee:update"))
 ):
     """
     Update an employee.
     """
-    db_employee = employee_controller.get_employee(db, employee_id=employee_id)
+    db_employee = await employee_controller.get_employee(db, employee_id=employee_id)
     if db_employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return employee_controller.update_employee(db, employee_id=employee_id, employee=employee)
+    return await employee_controller.update_employee(db, employee_id=employee_id, employee=employee)
 
 @router.delete("/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_employee(
+async def delete_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserAccount = Depends(has_permission("employee:delete"))
 ):
     """
     Delete an employee (soft delete).
     """
-    db_employee = employee_controller.get_employee(db, employee_id=employee_id)
+    db_employee = await employee_controller.get_employee(db, employee_id=employee_id)
     if db_employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
-    employee_controller.delete_employee(db, employee_id=employee_id)
+    await employee_controller.delete_employee(db, employee_id=employee_id)
     return None
 
 @router.get("/{employee_id}/performance-reviews", response_model=List[employee_schema.PerformanceReview])
-def get_employee_performance_reviews(
+async def get_employee_performance_reviews(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserAccount = Depends(has_permission("performance:read"))
 ):
     """
     Get all performance reviews for a specific employee.
     """
-    db_employee = employee_controller.get_employee(db, employee_id=employee_id)
+    db_employee = await employee_controller.get_employee(db, employee_id=employee_id)
     if db_employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return employee_controller.get_employee_performance_reviews(db, employee_id=employee_id)
+    return await employee_controller.get_employee_performance_reviews(db, employee_id=employee_id)
 
+@router.get("/{employee_id}/org-chart", response_model=employee_schema.OrgChart)
+async def get_org_chart(
+    employee_id: uuid.UUID,
+    depth: int = Query(settings.ORG_CHART_DEFAULT_DEPTH, ge=1, le=settings.ORG_CHART_MAX_DEPTH),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission("employee:read"))
+):
+    """
+    Get an employee's reporting chain, from their direct supervisor up, and
+    their subordinates down to depth levels, nearest first. At most limit
+    subordinates are returned; truncated is set when there were more, and
+    the export below streams the whole subtree.
+    """
+    db_employee = await employee_controller.get_employee(db, employee_id=employee_id)
+    if db_employee is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return await employee_controller.get_org_chart(db, employee_id=employee_id, depth=depth, limit=limit)
+
+@router.get("/{employee_id}/org-chart/export")
+async def export_org_chart(
+    request: Request,
+    employee_id: uuid.UUID,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format"),
+    depth: int = Query(settings.ORG_CHART_MAX_DEPTH, ge=1, le=settings.ORG_CHART_MAX_DEPTH),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission("employee:read"))
+):
+    """
+    Download every subordinate of an employee down to depth levels as CSV or
+    NDJSON, streamed and gzip-compressed when the client accepts it. Each
+    supervisor comes before the people reporting to them.
+    """
+    db_employee = await employee_controller.get_employee(db, employee_id=employee_id)
+    if db_employee is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return employee_controller.export_org_chart(request, employee_id, depth, export_format)
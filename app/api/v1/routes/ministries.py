@@ -1,10 +1,13 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.controllers import ministry_controller
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas import ministry_schema
-from app.auth.jwt import get_current_active_user, has_permission
+from app.schemas.export_schema import ExportFormatEnum
+from app.auth.jwt import get_current_active_user, get_current_principal, has_permission
+from app.auth.principal import Principal
 from app.auth.permissions import Permissions
 from app.models.employee import UserAccount
 
@@ -15,7 +18,7 @@ async def get_ministries(
     skip: int = 0,
     limit: int = 100,
     name: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserAccount = Depends(has_permission(Permissions.MINISTRY_READ))
 ):
     """
@@ -23,6 +26,20 @@ async def get_ministries(
     """
     return await ministry_controller.get_ministries(db, skip=skip, limit=limit, name=name)
 
+@router.get("/export")
+async def export_ministries(
+    request: Request,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format"),
+    name: Optional[str] = None,
+    current_user: UserAccount = Depends(has_permission(Permissions.MINISTRY_READ)),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Download every ministry matching the filter as CSV or NDJSON, streamed and
+    gzip-compressed when the client accepts it.
+    """
+    return ministry_controller.export_ministries(request, export_format, principal=principal, name=name)
+
 @router.post("/", response_model=ministry_schema.Ministry, status_code=status.HTTP_201_CREATED)
 async def create_ministry(
     ministry: ministry_schema.MinistryCreate,
@@ -37,7 +54,7 @@ async def create_ministry(
 @router.get("/{ministry_id}", response_model=ministry_schema.MinistryDetail)
 async def get_ministry(
     ministry_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserAccount = Depends(has_permission(Permissions.MINISTRY_READ))
 ):
     """
@@ -81,7 +98,7 @@ async def delete_ministry(
 @router.get("/{ministry_id}/departments", response_model=List[ministry_schema.Department])
 async def get_ministry_departments(
     ministry_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: UserAccount = Depends(has_permission(Permissions.MINISTRY_READ))
 ):
     """
@@ -92,3 +109,17 @@ async def get_ministry_departments(
         raise HTTPException(status_code=404, detail="Ministry not found")
     return await ministry_controller.get_ministry_departments(db, ministry_id=ministry_id)
 
+@router.get("/{ministry_id}/tree", response_model=ministry_schema.OrgUnitNode)
+async def get_ministry_tree(
+    ministry_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(has_permission(Permissions.MINISTRY_READ))
+):
+    """
+    Get a ministry with its departments and their divisions, and its
+    agencies, served from an in-process cache of the whole structure.
+    """
+    tree = await ministry_controller.get_ministry_tree(db, ministry_id=ministry_id)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Ministry not found")
+    return tree
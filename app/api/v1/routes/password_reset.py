@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 
 from app.auth.password_reset import generate_password_reset_token, reset_password
@@ -16,15 +16,15 @@ class PasswordResetConfirm(BaseModel):
     new_password: str
 
 @router.post("/request-reset")
-def request_password_reset(
+async def request_password_reset(
     reset_request: PasswordResetRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Request a password reset token.
     """
-    token = generate_password_reset_token(db, reset_request.email)
+    token = await generate_password_reset_token(db, reset_request.email)
     
     # TODO: send an email to the user
     
@@ -33,13 +33,13 @@ def request_password_reset(
     }
 
 @router.post("/reset-password", response_model=auth_schema.User)
-def confirm_password_reset(
+async def confirm_password_reset(
     reset_confirm: PasswordResetConfirm,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Reset password using a token.
     """
-    user = reset_password(db, reset_confirm.token, reset_confirm.new_password)
+    user = await reset_password(db, reset_confirm.token, reset_confirm.new_password)
     return user
 
@@ -1,10 +1,13 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_db, get_read_db
 from app.controllers import police_controller
 from app.schemas import police_schema
+from app.schemas.pagination_schema import CursorPage
+from app.schemas.search_schema import NameMatch
 
 router = APIRouter()
 
@@ -15,34 +18,45 @@ async def get_police_officers(
     name: Optional[str] = None,
     rank: Optional[str] = None,
     station_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Retrieve all police officers with optional filtering.
     """
-    return police_controller.get_police_officers(
+    return await police_controller.get_police_officers(
         db, skip=skip, limit=limit, name=name, rank=rank, station_id=station_id
     )
 
+@router.get("/officers/search", response_model=List[NameMatch[police_schema.PoliceOfficer]])
+async def search_police_officers(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Find police officers by name, tolerating misspellings. Best matches come first.
+    """
+    return await police_controller.search_police_officers(db, q=q, limit=limit)
+
 @router.post("/officers", response_model=police_schema.PoliceOfficer, status_code=status.HTTP_201_CREATED)
 async def create_police_officer(
     officer: police_schema.PoliceOfficerCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new police officer.
     """
-    return police_controller.create_police_officer(db, officer=officer)
+    return await police_controller.create_police_officer(db, officer=officer)
 
 @router.get("/officers/{officer_id}", response_model=police_schema.PoliceOfficerDetail)
 async def get_police_officer(
     officer_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific police officer.
     """
-    db_officer = police_controller.get_police_officer(db, officer_id=officer_id)
+    db_officer = await police_controller.get_police_officer(db, officer_id=officer_id)
     if db_officer is None:
         raise HTTPException(status_code=404, detail="Police officer not found")
     return db_officer
@@ -51,28 +65,28 @@ async def get_police_officer(
 async def update_police_officer(
     officer_id: int,
     officer: police_schema.PoliceOfficerUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a police officer.
     """
-    db_officer = police_controller.get_police_officer(db, officer_id=officer_id)
+    db_officer = await police_controller.get_police_officer(db, officer_id=officer_id)
     if db_officer is None:
         raise HTTPException(status_code=404, detail="Police officer not found")
-    return police_controller.update_police_officer(db, officer_id=officer_id, officer=officer)
+    return await police_controller.update_police_officer(db, officer_id=officer_id, officer=officer)
 
 @router.delete("/officers/{officer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_police_officer(
     officer_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a police officer (soft delete).
     """
-    db_officer = police_controller.get_police_officer(db, officer_id=officer_id)
+    db_officer = await police_controller.get_police_officer(db, officer_id=officer_id)
     if db_officer is None:
         raise HTTPException(status_code=404, detail="Police officer not found")
-    police_controller.delete_police_officer(db, officer_id=officer_id)
+    await police_controller.delete_police_officer(db, officer_id=officer_id)
     return None
 
 @router.get("/complaints", response_model=List[police_schema.PoliceComplaint])
@@ -81,7 +95,7 @@ async def get_police_complaints(
     limit: int = 100,
     status: Optional[str] = None,
     officer_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Retrieve all police complaints with optional filtering.
@@ -90,25 +104,40 @@ async def get_police_complaints(
         db, skip=skip, limit=limit, status=status, officer_id=officer_id
     )
 
+@router.get("/complaints/cursor", response_model=CursorPage[police_schema.PoliceComplaint])
+async def get_police_complaints_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    status: Optional[str] = None,
+    officer_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Retrieve police complaints newest first using keyset pagination. Pass the returned next_cursor to fetch the following page.
+    """
+    return await police_controller.get_police_complaints_page(
+        db, cursor=cursor, limit=limit, status=status, officer_id=officer_id
+    )
+
 @router.post("/complaints", response_model=police_schema.PoliceComplaint, status_code=status.HTTP_201_CREATED)
 async def create_police_complaint(
     complaint: police_schema.PoliceComplaintCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new police complaint.
     """
-    return police_controller.create_police_complaint(db, complaint=complaint)
+    return await police_controller.create_police_complaint(db, complaint=complaint)
 
 @router.get("/complaints/{complaint_id}", response_model=police_schema.PoliceComplaintDetail)
 async def get_police_complaint(
     complaint_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific police complaint.
     """
-    db_complaint = police_controller.get_police_complaint(db, complaint_id=complaint_id)
+    db_complaint = await police_controller.get_police_complaint(db, complaint_id=complaint_id)
     if db_complaint is None:
         raise HTTPException(status_code=404, detail="Police complaint not found")
     return db_complaint
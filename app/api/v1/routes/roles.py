@@ -5,7 +5,8 @@ from sqlalchemy import select
 import json
 
 from app.auth.jwt import has_permission
-from app.db.session import get_db
+from app.auth.principal import role_permissions
+from app.db.session import get_db, get_primary_read_db
 from app.models.employee import Role, UserAccount
 from app.schemas import role_schema
 from app.auth.permissions import ADMIN_PERMISSIONS, MANAGER_PERMISSIONS, OFFICER_PERMISSIONS, PUBLIC_PERMISSIONS, Permissions
@@ -16,13 +17,13 @@ router = APIRouter()
 async def get_roles(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     current_user: UserAccount = Depends(has_permission(Permissions.ROLE_READ))
 ):
     """
     Retrieve all roles.
     """
-    query = select(Role).where(Role.is_deleted == False).offset(skip).limit(limit)
+    query = select(Role).offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -62,13 +63,13 @@ async def create_role(
 @router.get("/{role_id}", response_model=role_schema.Role)
 async def get_role(
     role_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     current_user: UserAccount = Depends(has_permission(Permissions.ROLE_READ))
 ):
     """
     Get a specific role by ID.
     """
-    query = select(Role).where(Role.id == role_id, Role.is_deleted == False)
+    query = select(Role).where(Role.id == role_id)
     result = await db.execute(query)
     role = result.scalar_one_or_none()
     
@@ -89,7 +90,7 @@ async def update_role(
     """
     Update a role.
     """
-    query = select(Role).where(Role.id == role_id, Role.is_deleted == False)
+    query = select(Role).where(Role.id == role_id)
     result = await db.execute(query)
     db_role = result.scalar_one_or_none()
     
@@ -109,6 +110,7 @@ async def update_role(
     
     await db.commit()
     await db.refresh(db_role)
+    role_permissions.invalidate(role_id)
     return db_role
 
 @router.delete("/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -120,7 +122,7 @@ async def delete_role(
     """
     Delete a role (soft delete).
     """
-    query = select(Role).where(Role.id == role_id, Role.is_deleted == False)
+    query = select(Role).where(Role.id == role_id)
     result = await db.execute(query)
     db_role = result.scalar_one_or_none()
     
@@ -143,6 +145,7 @@ async def delete_role(
     
     db_role.is_deleted = True
     await db.commit()
+    role_permissions.invalidate(role_id)
     return None
 
 @router.get("/templates/admin", response_model=List[str])
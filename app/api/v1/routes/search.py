@@ -0,0 +1,55 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_read_db
+from app.controllers import search_controller
+from app.schemas.search_schema import SearchHit, SearchTypeEnum
+from app.schemas.pagination_schema import CursorPage
+from app.auth.jwt import get_current_active_user, get_current_principal
+from app.auth.permissions import Permissions, permission_bit
+from app.auth.principal import Principal
+from app.models.employee import UserAccount
+
+router = APIRouter()
+
+# Permission needed to see hits of each type
+SEARCH_PERMISSIONS = {
+    SearchTypeEnum.COMPLAINT: Permissions.COMPLAINT_READ,
+    SearchTypeEnum.CRIME_REPORT: Permissions.CRIME_REPORT_READ,
+    SearchTypeEnum.POLICE_COMPLAINT: Permissions.POLICE_READ,
+    SearchTypeEnum.INCIDENT_REPORT: Permissions.POLICE_READ,
+}
+
+@router.get("/", response_model=CursorPage[SearchHit])
+async def search(
+    q: str = Query(..., min_length=2, max_length=500),
+    types: Optional[List[SearchTypeEnum]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.SEARCH_PAGE_SIZE, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserAccount = Depends(get_current_active_user),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Full-text search across complaints, crime reports, police complaints and incident reports.
+
+    Supports "quoted phrases", OR and -excluded words. Results are ranked by
+    relevance with highlighted snippets; pass the returned next_cursor to
+    fetch the following page. Only types the caller may read are searched.
+    """
+    requested = list(dict.fromkeys(types)) if types else list(SearchTypeEnum)
+    readable = [
+        search_type for search_type in requested
+        if principal.has_role and principal.has_permissions(permission_bit(SEARCH_PERMISSIONS[search_type]))
+    ]
+    # Types the caller asked for explicitly must all be readable; by default
+    # the search is narrowed to the readable ones
+    if not readable or (types and len(readable) < len(requested)):
+        denied = next(search_type for search_type in requested if search_type not in readable)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Permission denied: {SEARCH_PERMISSIONS[denied]} is required",
+        )
+    return await search_controller.search(db, q=q, types=readable, cursor=cursor, limit=limit)
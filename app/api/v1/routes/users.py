@@ -5,7 +5,7 @@ from sqlalchemy import select
 
 from app.controllers import auth_controller
 from app.auth.jwt import get_current_active_user, has_permission, is_admin
-from app.db.session import get_db
+from app.db.session import get_db, get_primary_read_db
 from app.schemas import auth_schema
 from app.models.employee import UserAccount, Employee, Role
 from app.auth.permissions import Permissions
@@ -16,13 +16,13 @@ router = APIRouter()
 async def get_users(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     current_user: UserAccount = Depends(has_permission(Permissions.USER_READ))
 ):
     """
     Retrieve all users.
     """
-    query = select(UserAccount).where(UserAccount.is_deleted == False).offset(skip).limit(limit)
+    query = select(UserAccount).offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -81,13 +81,13 @@ async def create_user(
 @router.get("/{user_id}", response_model=auth_schema.User)
 async def get_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     current_user: UserAccount = Depends(has_permission(Permissions.USER_READ))
 ):
     """
     Get a specific user by ID.
     """
-    query = select(UserAccount).where(UserAccount.id == user_id, UserAccount.is_deleted == False)
+    query = select(UserAccount).where(UserAccount.id == user_id)
     result = await db.execute(query)
     user = result.scalar_one_or_none()
     
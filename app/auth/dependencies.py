@@ -6,7 +6,7 @@ from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.config import settings
-from app.auth.security import verify_password
+from app.auth.security import verify_password_async
 from app.db.session import get_db
 from app.models.employee import UserAccount, Role
 from app.schemas.auth_schema import TokenPayload
@@ -23,7 +23,7 @@ async def authenticate_user(db: AsyncSession, username: str, password: str) -> O
     
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
     return user
 
@@ -1,25 +1,34 @@
-import json
 from typing import List, Optional, Union, Any
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from app.auth.permissions import compile_permissions, permission_bit
+from app.auth.principal import Principal, load_principal
 from app.core.config import settings
 from app.db.session import get_db
-from app.models.employee import UserAccount, Role
+from app.models.employee import UserAccount
 from app.schemas.auth_schema import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
 
-async def get_current_user(
+async def get_current_principal(
+    request: Request,
     db: AsyncSession = Depends(get_db), 
     token: str = Depends(oauth2_scheme)
-) -> UserAccount:
+) -> Principal:
     """
-    Get the current authenticated user from JWT token.
+    Get the principal for the current request.
+    
+    Reuses the principal resolved by RolePermissionMiddleware when present, so the
+    token is decoded and the user and role are loaded at most once per request.
     """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
         token_data = TokenPayload(**payload)
@@ -30,18 +39,39 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    query = select(UserAccount).where(UserAccount.id == token_data.sub)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    principal = await load_principal(db, token_data.sub)
     
-    if not user:
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
+    request.state.principal = principal
+    return principal
+
+async def get_optional_principal(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Optional[Principal]:
+    """
+    Get the principal for routes that also serve anonymous callers.
+
+    Returns None without a bearer token; a token that is present must be valid.
+    """
+    if token is None and getattr(request.state, "principal", None) is None:
+        return None
+    return await get_current_principal(request, db, token)
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+) -> UserAccount:
+    """
+    Get the current authenticated user from JWT token.
+    """
+    return principal.user
 
 async def get_current_active_user(
     current_user: UserAccount = Depends(get_current_user),
@@ -74,31 +104,24 @@ def has_permission(required_permissions: Union[str, List[str]]):
     """
     if isinstance(required_permissions, str):
         required_permissions = [required_permissions]
+    required_mask = compile_permissions(required_permissions)
     
     async def permission_checker(
         current_user: UserAccount = Depends(get_current_active_user),
-        db: AsyncSession = Depends(get_db)
+        principal: Principal = Depends(get_current_principal)
     ) -> UserAccount:
-        # Get user role
-        query = select(Role).where(Role.id == current_user.role_id)
-        result = await db.execute(query)
-        role = result.scalar_one_or_none()
-        
-        if not role:
+        if not principal.has_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User role not found",
             )
         
-        # Parse permissions
-        try:
-            user_permissions = json.loads(role.permissions)
-        except:
-            user_permissions = []
-        
         # Check if user has all required permissions
+        if principal.has_permissions(required_mask):
+            return current_user
+        
         for permission in required_permissions:
-            if permission not in user_permissions:
+            if not principal.has_permissions(permission_bit(permission)):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"Permission denied: {permission} is required",
@@ -110,17 +133,12 @@ def has_permission(required_permissions: Union[str, List[str]]):
 
 async def is_admin(
     current_user: UserAccount = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    principal: Principal = Depends(get_current_principal)
 ) -> UserAccount:
     """
     Check if the current user is an admin.
     """
-    # Get user role
-    query = select(Role).where(Role.id == current_user.role_id)
-    result = await db.execute(query)
-    role = result.scalar_one_or_none()
-    
-    if not role or role.name != "Administrator":
+    if principal.role_name != "Administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required",
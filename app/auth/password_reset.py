@@ -6,7 +6,8 @@ from fastapi import HTTPException, status
 from typing import Optional
 
 from app.models.employee import UserAccount
-from app.auth.security import get_password_hash
+from app.auth.principal import principal_cache
+from app.auth.security import get_password_hash_async
 from app.core.config import settings
 
 async def generate_password_reset_token(db: AsyncSession, email: str) -> Optional[str]:
@@ -68,7 +69,7 @@ async def reset_password(db: AsyncSession, token: str, new_password: str) -> Use
         )
     
     # Update password
-    user.password_hash = get_password_hash(new_password)
+    user.password_hash = await get_password_hash_async(new_password)
     user.activation_token = None
     user.activation_token_expiry = None
     user.password_reset_required = False
@@ -76,6 +77,7 @@ async def reset_password(db: AsyncSession, token: str, new_password: str) -> Use
     
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
     
     return user
 
@@ -1,3 +1,6 @@
+from threading import Lock
+from typing import Dict, Iterable
+
 class Permissions:
     # Employee permissions
     EMPLOYEE_CREATE = "employee:create"
@@ -102,3 +105,31 @@ PUBLIC_PERMISSIONS = [
     Permissions.MINISTRY_READ,
     Permissions.DEPARTMENT_READ,
 ]
+
+# Bit assigned to each permission; the catalogue above takes the low bits in
+# declaration order and any permission outside it gets the next free bit.
+_permission_bits: Dict[str, int] = {}
+_permission_bits_lock = Lock()
+
+def permission_bit(permission: str) -> int:
+    """
+    Get the bit that represents a permission in a compiled permission mask.
+    """
+    bit = _permission_bits.get(permission)
+    if bit is None:
+        with _permission_bits_lock:
+            bit = _permission_bits.setdefault(permission, 1 << len(_permission_bits))
+    return bit
+
+def compile_permissions(permissions: Iterable[str]) -> int:
+    """
+    Compile a list of permissions into an integer bitset.
+    """
+    mask = 0
+    for permission in permissions:
+        mask |= permission_bit(permission)
+    return mask
+
+for _name, _permission in vars(Permissions).items():
+    if _name.isupper():
+        permission_bit(_permission)
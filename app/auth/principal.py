@@ -0,0 +1,152 @@
+import json
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.auth.permissions import compile_permissions
+from app.core.config import settings
+from app.models.employee import UserAccount, Role
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user of a request together with their compiled permissions.
+    """
+    user: UserAccount
+    role_id: Optional[Any]
+    role_name: Optional[str]
+    role_version: int
+    permission_mask: int
+
+    @property
+    def has_role(self) -> bool:
+        return self.role_name is not None
+
+    def has_permissions(self, required_mask: int) -> bool:
+        return self.permission_mask & required_mask == required_mask
+
+
+class RolePermissionCache:
+    """
+    In-process cache of compiled permission bitsets keyed on role id.
+
+    A mask is reused only while the role's permissions are the ones it was
+    compiled from, so a role re-read after an edit in another worker
+    process is compiled afresh. Each role also carries a version that is
+    bumped when the role changes here; principals built against an older
+    version are treated as stale.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._masks: Dict[str, Tuple[Optional[str], int]] = {}
+        self._lock = Lock()
+
+    def version(self, role_id: Any) -> int:
+        return self._versions.get(str(role_id), 0)
+
+    def mask(self, role: Role) -> int:
+        key = str(role.id)
+        entry = self._masks.get(key)
+        if entry is not None and entry[0] == role.permissions:
+            return entry[1]
+        mask = compile_permissions(parse_permissions(role.permissions))
+        with self._lock:
+            self._masks[key] = (role.permissions, mask)
+        return mask
+
+    def invalidate(self, role_id: Any) -> None:
+        key = str(role_id)
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._masks.pop(key, None)
+
+
+class PrincipalCache:
+    """
+    In-process TTL cache of principals keyed on user id.
+
+    Entries are dropped explicitly when a user changes and ignored once their
+    role version is bumped; the TTL bounds staleness for changes made by other
+    worker processes.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Principal]] = {}
+        self._lock = Lock()
+
+    def get(self, user_id: Any) -> Optional[Principal]:
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic() or principal.role_version != role_permissions.version(principal.role_id):
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return principal
+
+    def set(self, user_id: Any, principal: Principal) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[str(user_id)] = (time.monotonic() + self.ttl, principal)
+
+    def invalidate_user(self, user_id: Any) -> None:
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+role_permissions = RolePermissionCache()
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL)
+
+
+def parse_permissions(raw: Optional[str]) -> FrozenSet[str]:
+    """
+    Parse the JSON permission list stored on a role.
+    """
+    try:
+        return frozenset(json.loads(raw))
+    except (TypeError, ValueError):
+        return frozenset()
+
+
+async def load_principal(db: AsyncSession, user_id: Any) -> Optional[Principal]:
+    """
+    Resolve the principal for a user id, loading user and role in one query on a cache miss.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    query = (
+        select(UserAccount, Role)
+        .outerjoin(Role, Role.id == UserAccount.role_id)
+        .where(UserAccount.id == user_id)
+    )
+    result = await db.execute(query)
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    user, role = row
+    # Detach so the cached instance is never mutated through another request's session
+    db.expunge(user)
+    principal = Principal(
+        user=user,
+        role_id=user.role_id,
+        role_name=role.name if role else None,
+        role_version=role_permissions.version(user.role_id),
+        permission_mask=role_permissions.mask(role) if role else 0,
+    )
+    principal_cache.set(user_id, principal)
+    return principal
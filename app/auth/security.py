@@ -1,10 +1,23 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+from typing import Any, Optional, Tuple, Union
 from passlib.context import CryptContext
 from jose import jwt
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below or above the configured cost are flagged by needs_update and
+# rehashed transparently on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+_hash_executor: Optional[Executor] = None
 
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -30,3 +43,76 @@ def get_password_hash(password: str) -> str:
     Hash a password.
     """
     return pwd_context.hash(password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one uses outdated cost parameters.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def get_hash_executor() -> Executor:
+    """
+    Get the bounded pool that password hashing runs in, creating it on first use.
+
+    Worker processes are spawned rather than forked, since a fork of the
+    running server would copy its event loop, connection pools and threads.
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _hash_executor
+
+def _load_hash_backend() -> str:
+    return pwd_context.handler().get_backend()
+
+async def warm_hash_executor() -> None:
+    """
+    Start every worker of the password hashing pool and load the bcrypt
+    backend in it, so the first logins do not pay for either.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_hash_executor()
+    # A task submitted while no worker is idle starts a new one, so one
+    # task per worker submitted at once starts them all
+    await asyncio.gather(*(
+        loop.run_in_executor(executor, _load_hash_backend) for _ in range(settings.PASSWORD_HASH_WORKERS)
+    ))
+
+def shutdown_hash_executor() -> None:
+    """
+    Shut down the password hashing pool.
+    """
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), get_password_hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and compute any rehash without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), verify_and_update_password, plain_password, hashed_password)
@@ -3,7 +3,12 @@ from datetime import timedelta, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from app.models.employee import UserAccount, Role, Employee
-from app.auth.security import get_password_hash, verify_password, create_access_token
+from app.auth.principal import principal_cache
+from app.auth.security import (
+    get_password_hash_async,
+    verify_and_update_password_async,
+    create_access_token,
+)
 from app.core.config import settings
 from app.schemas import auth_schema
 
@@ -27,7 +32,7 @@ async def create_user(db: AsyncSession, user: auth_schema.UserCreate, employee_i
     """
     Create a new user account.
     """
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     db_user = UserAccount(
         username=user.username,
@@ -53,7 +58,8 @@ async def authenticate(db: AsyncSession, username: str, password: str) -> Option
     user = await get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_and_update_password_async(password, user.password_hash)
+    if not valid:
         # Increment failed login attempts
         user.failed_login_attempts += 1
         
@@ -63,10 +69,15 @@ async def authenticate(db: AsyncSession, username: str, password: str) -> Option
             user.lock_reason = "Too many failed login attempts"
         
         await db.commit()
+        principal_cache.invalidate_user(user.id)
         return None
     
+    # Rehash transparently if the stored hash uses outdated cost parameters
+    if new_hash:
+        user.password_hash = new_hash
+    
     # Reset failed login attempts on successful login
-    if user.failed_login_attempts > 0:
+    if user.failed_login_attempts > 0 or new_hash:
         user.failed_login_attempts = 0
         await db.commit()
     
@@ -90,12 +101,13 @@ async def change_password(db: AsyncSession, user_id: int, new_password: str) ->
     if not user:
         return None
     
-    user.password_hash = get_password_hash(new_password)
+    user.password_hash = await get_password_hash_async(new_password)
     user.password_reset_required = False
     user.last_password_change = datetime.utcnow()
     
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
     return user
 
 async def update_user_role(db: AsyncSession, user_id: int, role_id: int) -> UserAccount:
@@ -113,6 +125,7 @@ async def update_user_role(db: AsyncSession, user_id: int, role_id: int) -> User
     
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
     return user
 
 async def lock_user(db: AsyncSession, user_id: int, reason: str) -> UserAccount:
@@ -131,6 +144,7 @@ async def lock_user(db: AsyncSession, user_id: int, reason: str) -> UserAccount:
     
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
     return user
 
 async def unlock_user(db: AsyncSession, user_id: int) -> UserAccount:
@@ -150,4 +164,5 @@ async def unlock_user(db: AsyncSession, user_id: int) -> UserAccount:
     
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
     return user
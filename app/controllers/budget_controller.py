@@ -1,25 +1,68 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from datetime import datetime
-from app.models.finance import Budget, Expenditure
+from sqlalchemy import func, select, or_
+from sqlalchemy.orm import selectinload
+from datetime import date
+from fastapi import Request
+from app.auth.permissions import Permissions
+from app.auth.principal import Principal
+from app.core.exceptions import ValidationError
+from app.db.export import ExportColumn, export_response
+from app.db import hierarchy, rollups
+from app.db.pagination import paginate_keyset, build_page
+from app.db.writes import insert_returning, soft_delete, update_returning
+from app.models.finance import (
+    Budget, BudgetRollup, Expenditure, ExpenditureFlag, PaymentMethod, PaymentStatus, SplitPurchase
+)
 from app.schemas import budget_schema
+from app.schemas.export_schema import ExportFormatEnum
+
+EXPORT_COLUMNS = [
+    ExportColumn("id"),
+    ExportColumn("fiscal_year"),
+    ExportColumn("title"),
+    ExportColumn("description"),
+    ExportColumn("start_date"),
+    ExportColumn("end_date"),
+    ExportColumn("total_amount"),
+    ExportColumn("approved_amount"),
+    ExportColumn("remaining_amount"),
+    ExportColumn("status"),
+    ExportColumn("approval_date"),
+    # Names and ids of individual civil servants
+    ExportColumn("approved_by", Permissions.EMPLOYEE_READ),
+    ExportColumn("prepared_by", Permissions.EMPLOYEE_READ),
+    ExportColumn("ministry_id"),
+    ExportColumn("department_id"),
+    ExportColumn("agency_id"),
+    ExportColumn("county_id"),
+    ExportColumn("project_id"),
+    ExportColumn("created_at"),
+]
+
+# Expenditure workflow states as recorded on the payment
+EXPENDITURE_STATUSES = {
+    budget_schema.ExpenditureStatusEnum.PENDING: PaymentStatus.PENDING,
+    budget_schema.ExpenditureStatusEnum.APPROVED: PaymentStatus.PROCESSING,
+    budget_schema.ExpenditureStatusEnum.PAID: PaymentStatus.COMPLETED,
+    budget_schema.ExpenditureStatusEnum.REJECTED: PaymentStatus.FAILED,
+    budget_schema.ExpenditureStatusEnum.CANCELLED: PaymentStatus.CANCELLED,
+}
 
 async def get_budget(db: AsyncSession, budget_id: int):
-    query = select(Budget).where(Budget.id == budget_id, Budget.is_deleted == False)
+    query = select(Budget).where(Budget.id == budget_id)
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
-async def get_budgets(
-    db: AsyncSession,
-    skip: int = 0,
-    limit: int = 100,
+def _budgets_query(
     fiscal_year: Optional[str] = None,
     ministry_id: Optional[int] = None,
     department_id: Optional[int] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None
 ):
-    query = select(Budget).where(Budget.is_deleted == False)
+    query = select(Budget)
     
     if fiscal_year:
         query = query.where(Budget.fiscal_year == fiscal_year)
@@ -33,10 +76,55 @@ async def get_budgets(
     if status:
         query = query.where(Budget.status == status)
     
+    if org_unit_id:
+        query = query.where(hierarchy.under_org_unit(Budget, org_unit_id))
+    
+    return query
+
+async def get_budgets(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    fiscal_year: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None
+):
+    query = _budgets_query(fiscal_year, ministry_id, department_id, status, org_unit_id)
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+async def get_budgets_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    fiscal_year: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None
+):
+    query = _budgets_query(fiscal_year, ministry_id, department_id, status, org_unit_id)
+    query = paginate_keyset(query, Budget.created_at, Budget.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.scalars().all(), Budget.created_at, limit)
+
+def export_budgets(
+    request: Request,
+    export_format: ExportFormatEnum,
+    principal: Optional[Principal] = None,
+    fiscal_year: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None
+):
+    query = _budgets_query(fiscal_year, ministry_id, department_id, status, org_unit_id)
+    query = query.order_by(Budget.created_at, Budget.id)
+    return export_response(request, query, EXPORT_COLUMNS, export_format, "budgets", principal=principal)
+
 async def create_budget(db: AsyncSession, budget: budget_schema.BudgetCreate):
     db_budget = Budget(
         fiscal_year=budget.fiscal_year,
@@ -63,34 +151,218 @@ async def create_budget(db: AsyncSession, budget: budget_schema.BudgetCreate):
         program_id=budget.program_id
     )
     
-    db.add(db_budget)
+    db_budget = await insert_returning(db, db_budget)
+    await rollups.record_budget(db, db_budget)
     await db.commit()
-    await db.refresh(db_budget)
     return db_budget
 
+def _budget_values(budget) -> dict:
+    values = budget.dict(exclude_unset=True)
+    if "amount" in values:
+        values["total_amount"] = values.pop("amount")
+    columns = Budget.__table__.columns.keys()
+    return {key: value for key, value in values.items() if key in columns}
+
 async def update_budget(db: AsyncSession, budget_id: int, budget: budget_schema.BudgetUpdate):
-    db_budget = await get_budget(db, budget_id)
-    
-    # Update budget attributes
-    for key, value in budget.dict(exclude_unset=True).items():
-        setattr(db_budget, key, value)
-    
+    previous = await rollups.locked_budget(db, budget_id)
+    db_budget = await update_returning(db, Budget, budget_id, _budget_values(budget))
+    if db_budget is not None:
+        await rollups.record_budget(db, previous, sign=-1)
+        await rollups.record_budget(db, db_budget)
     await db.commit()
-    await db.refresh(db_budget)
     return db_budget
 
 async def delete_budget(db: AsyncSession, budget_id: int):
-    db_budget = await get_budget(db, budget_id)
-    db_budget.is_deleted = True
-    db_budget.deleted_at = datetime.now()
+    previous = await rollups.locked_budget(db, budget_id)
+    db_budget = await soft_delete(db, Budget, budget_id)
+    if db_budget is not None:
+        await rollups.record_budget(db, previous, sign=-1)
+        await rollups.record_budget_expenditures(db, previous, sign=-1)
     await db.commit()
     return db_budget
 
 async def get_budget_expenditures(db: AsyncSession, budget_id: int):
     query = select(Expenditure).where(
-        Expenditure.budget_id == budget_id,
-        Expenditure.is_deleted == False
+        Expenditure.budget_id == budget_id
     )
     result = await db.execute(query)
     return result.scalars().all()
 
+def _payment_method(value: str) -> PaymentMethod:
+    try:
+        return PaymentMethod(value)
+    except ValueError:
+        raise ValidationError(f"Unknown payment method: {value}")
+
+def _expenditure_values(expenditure) -> dict:
+    values = expenditure.dict(exclude_unset=True)
+    if "vendor_name" in values:
+        values["vendor"] = values.pop("vendor_name")
+    if "status" in values:
+        values["status"] = EXPENDITURE_STATUSES[values["status"]]
+    if "payment_method" in values:
+        values["payment_method"] = _payment_method(values["payment_method"])
+    columns = Expenditure.__table__.columns.keys()
+    return {key: value for key, value in values.items() if key in columns}
+
+async def create_expenditure(db: AsyncSession, budget_id: int, expenditure: budget_schema.ExpenditureCreate):
+    budget = await rollups.locked_budget(db, budget_id, read=True)
+    if budget is None:
+        return None
+
+    db_expenditure = Expenditure(
+        expenditure_number=f"EX-{uuid.uuid4().hex[:8].upper()}",
+        expenditure_date=expenditure.date,
+        description=expenditure.description,
+        amount=expenditure.amount,
+        category=expenditure.category.value,
+        payment_method=_payment_method(expenditure.payment_method),
+        payment_reference=expenditure.payment_reference,
+        status=EXPENDITURE_STATUSES[expenditure.status],
+        vendor=expenditure.vendor_name or "",
+        invoice_number=expenditure.invoice_number,
+        invoice_date=expenditure.invoice_date,
+        receipt_number=expenditure.receipt_number,
+        budget_id=budget.id,
+        requested_by=expenditure.requested_by,
+        approved_by=expenditure.approved_by
+    )
+
+    db_expenditure = await insert_returning(db, db_expenditure)
+    await rollups.record_expenditure(db, budget, db_expenditure)
+    await db.commit()
+    return db_expenditure
+
+async def update_expenditure(
+    db: AsyncSession,
+    budget_id: int,
+    expenditure_id: int,
+    expenditure: budget_schema.ExpenditureUpdate
+):
+    budget = await rollups.locked_budget(db, budget_id, read=True)
+    previous = await rollups.locked_expenditure(db, expenditure_id)
+    if budget is None or previous is None or previous.budget_id != budget.id:
+        return None
+
+    db_expenditure = await update_returning(db, Expenditure, expenditure_id, _expenditure_values(expenditure))
+    await rollups.record_expenditure(db, budget, previous, sign=-1)
+    await rollups.record_expenditure(db, budget, db_expenditure)
+    await db.commit()
+    return db_expenditure
+
+async def delete_expenditure(db: AsyncSession, budget_id: int, expenditure_id: int):
+    budget = await rollups.locked_budget(db, budget_id, read=True)
+    previous = await rollups.locked_expenditure(db, expenditure_id)
+    if budget is None or previous is None or previous.budget_id != budget.id:
+        return None
+
+    db_expenditure = await soft_delete(db, Expenditure, expenditure_id)
+    await rollups.record_expenditure(db, budget, previous, sign=-1)
+    await db.commit()
+    return db_expenditure
+
+async def get_budget_rollups(
+    db: AsyncSession,
+    group_by: Sequence[budget_schema.RollupDimensionEnum] = (),
+    fiscal_year: Optional[str] = None,
+    ministry_id: Optional[uuid.UUID] = None,
+    department_id: Optional[uuid.UUID] = None,
+    county_id: Optional[uuid.UUID] = None,
+    category: Optional[str] = None
+):
+    dimensions = [getattr(BudgetRollup, dimension.value) for dimension in group_by]
+    query = select(
+        *dimensions,
+        *(func.coalesce(func.sum(getattr(BudgetRollup, measure)), 0).label(measure) for measure in rollups.MEASURES)
+    ).group_by(*dimensions).order_by(*dimensions)
+
+    if fiscal_year:
+        query = query.where(BudgetRollup.fiscal_year == fiscal_year)
+
+    if ministry_id:
+        query = query.where(BudgetRollup.ministry_id == ministry_id)
+
+    if department_id:
+        query = query.where(BudgetRollup.department_id == department_id)
+
+    if county_id:
+        query = query.where(BudgetRollup.county_id == county_id)
+
+    if category:
+        query = query.where(BudgetRollup.category == category)
+
+    result = await db.execute(query)
+    return result.all()
+
+async def get_expenditure_flags(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    fiscal_year: Optional[str] = None,
+    rule: Optional[budget_schema.AnomalyRuleEnum] = None,
+    department_id: Optional[uuid.UUID] = None,
+    vendor: Optional[str] = None
+):
+    query = select(
+        ExpenditureFlag.id,
+        ExpenditureFlag.expenditure_id,
+        Expenditure.expenditure_number,
+        Expenditure.vendor,
+        Expenditure.category,
+        Expenditure.amount,
+        ExpenditureFlag.department_id,
+        ExpenditureFlag.fiscal_year,
+        ExpenditureFlag.rule,
+        ExpenditureFlag.score,
+        ExpenditureFlag.reason,
+        ExpenditureFlag.created_at,
+    ).join(ExpenditureFlag.expenditure)
+
+    if fiscal_year:
+        query = query.where(ExpenditureFlag.fiscal_year == fiscal_year)
+
+    if rule:
+        query = query.where(ExpenditureFlag.rule == rule.value)
+
+    if department_id:
+        query = query.where(ExpenditureFlag.department_id == department_id)
+
+    if vendor:
+        query = query.where(Expenditure.vendor.ilike(f"%{vendor}%"))
+
+    # Most suspicious first
+    query = paginate_keyset(query, ExpenditureFlag.score, ExpenditureFlag.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.all(), ExpenditureFlag.score, limit)
+
+async def get_split_purchases(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    budget_id: Optional[uuid.UUID] = None,
+    vendor: Optional[str] = None,
+    threshold: Optional[float] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None
+):
+    query = select(SplitPurchase).options(selectinload(SplitPurchase.payments))
+
+    if budget_id:
+        query = query.where(SplitPurchase.budget_id == budget_id)
+
+    if vendor:
+        query = query.where(SplitPurchase.vendor.like(f"%{vendor.strip().lower()}%"))
+
+    if threshold:
+        query = query.where(SplitPurchase.threshold == threshold)
+
+    if since:
+        query = query.where(SplitPurchase.last_date >= since)
+
+    if until:
+        query = query.where(SplitPurchase.first_date <= until)
+
+    # Most recent first
+    query = paginate_keyset(query, SplitPurchase.last_date, SplitPurchase.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.scalars().all(), SplitPurchase.last_date, limit)
@@ -3,27 +3,55 @@ from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from datetime import datetime
+from fastapi import Request
+from app.auth.permissions import Permissions
+from app.auth.principal import Principal
+from app.db import hierarchy
+from app.db.export import ExportColumn, export_response
+from app.db.pagination import paginate_keyset, build_page
+from app.db.writes import insert_returning, soft_delete, update_returning
 from app.models.public import Complaint
 from app.schemas import complaint_schema
+from app.schemas.export_schema import ExportFormatEnum
+
+# Complainant details are only exported to staff who handle complaints
+COMPLAINANT_COLUMNS = {"complainant_name", "complainant_contact", "complainant_email", "complainant_id_number"}
+
+EXPORT_COLUMNS = [
+    ExportColumn("id"),
+    ExportColumn("reference_number"),
+    ExportColumn("subject"),
+    ExportColumn("description"),
+    ExportColumn("submission_date"),
+    ExportColumn("status"),
+    ExportColumn("priority"),
+    ExportColumn("anonymous"),
+    *(ExportColumn(name, Permissions.COMPLAINT_UPDATE) for name in sorted(COMPLAINANT_COLUMNS)),
+    ExportColumn("location"),
+    ExportColumn("incident_date"),
+    ExportColumn("resolution_details"),
+    ExportColumn("resolution_date"),
+    ExportColumn("ministry_id"),
+    ExportColumn("department_id"),
+    ExportColumn("county_id"),
+    ExportColumn("created_at"),
+]
 
 async def get_complaint(db: AsyncSession, complaint_id: int):
     query = select(Complaint).where(
-        Complaint.id == complaint_id,
-        Complaint.is_deleted == False
+        Complaint.id == complaint_id
     )
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
-async def get_complaints(
-    db: AsyncSession,
-    skip: int = 0,
-    limit: int = 100,
+def _complaints_query(
     status: Optional[str] = None,
     priority: Optional[str] = None,
     ministry_id: Optional[int] = None,
-    department_id: Optional[int] = None
+    department_id: Optional[int] = None,
+    org_unit_id: Optional[uuid.UUID] = None
 ):
-    query = select(Complaint).where(Complaint.is_deleted == False)
+    query = select(Complaint)
     
     if status:
         query = query.where(Complaint.status == status)
@@ -37,10 +65,62 @@ async def get_complaints(
     if department_id:
         query = query.where(Complaint.department_id == department_id)
     
+    if org_unit_id:
+        query = query.where(hierarchy.under_org_unit(Complaint, org_unit_id))
+    
+    return query
+
+async def get_complaints(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    org_unit_id: Optional[uuid.UUID] = None
+):
+    query = _complaints_query(status, priority, ministry_id, department_id, org_unit_id)
     query = query.order_by(Complaint.submission_date.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+async def get_complaints_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    org_unit_id: Optional[uuid.UUID] = None
+):
+    query = _complaints_query(status, priority, ministry_id, department_id, org_unit_id)
+    query = paginate_keyset(query, Complaint.submission_date, Complaint.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.scalars().all(), Complaint.submission_date, limit)
+
+def _redact_anonymous(complaint: Complaint):
+    # Anonymous complainants are never identified, whoever asks
+    return COMPLAINANT_COLUMNS if complaint.anonymous else set()
+
+def export_complaints(
+    request: Request,
+    export_format: ExportFormatEnum,
+    principal: Optional[Principal] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    org_unit_id: Optional[uuid.UUID] = None
+):
+    query = _complaints_query(status, priority, ministry_id, department_id, org_unit_id)
+    query = query.order_by(Complaint.created_at, Complaint.id)
+    return export_response(
+        request, query, EXPORT_COLUMNS, export_format, "complaints",
+        principal=principal, redact_row=_redact_anonymous
+    )
+
 async def create_complaint(db: AsyncSession, complaint: complaint_schema.ComplaintCreate):
     # Generate a unique reference number
     reference_number = f"C-{uuid.uuid4().hex[:8].upper()}"
@@ -61,41 +141,32 @@ async def create_complaint(db: AsyncSession, complaint: complaint_schema.Complai
         incident_date=complaint.incident_date
     )
     
-    db.add(db_complaint)
+    db_complaint = await insert_returning(db, db_complaint)
     await db.commit()
-    await db.refresh(db_complaint)
     return db_complaint
 
 async def update_complaint(db: AsyncSession, complaint_id: int, complaint: complaint_schema.ComplaintUpdate):
-    db_complaint = await get_complaint(db, complaint_id)
-    
-    # Update complaint attributes
-    for key, value in complaint.dict(exclude_unset=True).items():
-        setattr(db_complaint, key, value)
+    values = complaint.dict(exclude_unset=True)
     
     # If status is set to resolved, set resolution_date
     if complaint.status == "resolved":
-        db_complaint.resolution_date = datetime.now()
+        values["resolution_date"] = datetime.now()
     
+    db_complaint = await update_returning(db, Complaint, complaint_id, values)
     await db.commit()
-    await db.refresh(db_complaint)
     return db_complaint
 
 async def delete_complaint(db: AsyncSession, complaint_id: int):
-    db_complaint = await get_complaint(db, complaint_id)
-    db_complaint.is_deleted = True
-    db_complaint.deleted_at = datetime.now()
+    db_complaint = await soft_delete(db, Complaint, complaint_id)
     await db.commit()
     return db_complaint
 
 async def assign_complaint(db: AsyncSession, complaint_id: int, assignment: complaint_schema.ComplaintAssignment):
-    db_complaint = await get_complaint(db, complaint_id)
-    
-    db_complaint.assigned_to = assignment.assigned_to
-    db_complaint.assignment_date = datetime.now()
-    db_complaint.status = "under_review"
-    
+    db_complaint = await update_returning(db, Complaint, complaint_id, {
+        "assigned_to": assignment.assigned_to,
+        "assignment_date": datetime.now(),
+        "status": "under_review",
+    })
     await db.commit()
-    await db.refresh(db_complaint)
     return db_complaint
 
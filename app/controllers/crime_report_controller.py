@@ -1,42 +1,47 @@
-import os
 import uuid
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from datetime import datetime
 from fastapi import UploadFile, HTTPException
-import aiofiles
-from pathlib import Path
 
-from app.models.crime_reporting import CrimeReport, MediaEvidence, WitnessStatement, ReportStatusUpdate
+from app.db.pagination import paginate_keyset, build_page
+from app.db.writes import insert_returning, soft_delete, update_returning
+from app.models.crime_reporting import CaseStatus, CrimeReport, MediaEvidence, WitnessStatement, ReportStatusUpdate
 from app.schemas import crime_report_schema
+from app.storage.base import content_url
+from app.storage.evidence import evidence_storage
 
-# Create upload directory if it doesn't exist
-UPLOAD_DIR = Path("/tmp/uploads/evidence")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Report statuses shown to reporters, and the case status each one puts the report in
+CASE_STATUSES = {
+    crime_report_schema.ReportStatusEnum.SUBMITTED: CaseStatus.REPORTED,
+    crime_report_schema.ReportStatusEnum.RECEIVED: CaseStatus.REPORTED,
+    crime_report_schema.ReportStatusEnum.UNDER_REVIEW: CaseStatus.UNDER_INVESTIGATION,
+    crime_report_schema.ReportStatusEnum.INVESTIGATING: CaseStatus.UNDER_INVESTIGATION,
+    crime_report_schema.ReportStatusEnum.REQUIRES_MORE_INFO: CaseStatus.UNDER_INVESTIGATION,
+    crime_report_schema.ReportStatusEnum.FORWARDED: CaseStatus.UNDER_INVESTIGATION,
+    crime_report_schema.ReportStatusEnum.RESOLVED: CaseStatus.CLOSED,
+    crime_report_schema.ReportStatusEnum.CLOSED: CaseStatus.CLOSED,
+}
 
 async def get_crime_report(db: AsyncSession, report_id: int):
     query = select(CrimeReport).where(
-        CrimeReport.id == report_id,
-        CrimeReport.is_deleted == False
+        CrimeReport.id == report_id
     )
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
-async def get_crime_reports(
-    db: AsyncSession,
-    skip: int = 0,
-    limit: int = 100,
+def _crime_reports_query(
     status: Optional[str] = None,
     crime_type: Optional[str] = None,
     priority: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None
 ):
-    query = select(CrimeReport).where(CrimeReport.is_deleted == False)
+    query = select(CrimeReport)
     
     if status:
-        query = query.where(CrimeReport.status == status)
+        query = query.where(CrimeReport.case_status == status)
     
     if crime_type:
         query = query.where(CrimeReport.crime_type == crime_type)
@@ -46,16 +51,44 @@ async def get_crime_reports(
     
     if start_date:
         start_datetime = datetime.strptime(start_date, "%Y-%m-%d")
-        query = query.where(CrimeReport.report_datetime >= start_datetime)
+        query = query.where(CrimeReport.report_date >= start_datetime)
     
     if end_date:
         end_datetime = datetime.strptime(end_date, "%Y-%m-%d")
-        query = query.where(CrimeReport.report_datetime <= end_datetime)
+        query = query.where(CrimeReport.report_date <= end_datetime)
     
-    query = query.order_by(CrimeReport.report_datetime.desc()).offset(skip).limit(limit)
+    return query
+
+async def get_crime_reports(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    crime_type: Optional[str] = None,
+    priority: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    query = _crime_reports_query(status, crime_type, priority, start_date, end_date)
+    query = query.order_by(CrimeReport.report_date.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+async def get_crime_reports_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[str] = None,
+    crime_type: Optional[str] = None,
+    priority: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    query = _crime_reports_query(status, crime_type, priority, start_date, end_date)
+    query = paginate_keyset(query, CrimeReport.report_date, CrimeReport.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.scalars().all(), CrimeReport.report_date, limit)
+
 async def create_crime_report(db: AsyncSession, report: crime_report_schema.CrimeReportCreate):
     # Generate a unique report number
     report_number = f"CR-{uuid.uuid4().hex[:8].upper()}"
@@ -82,11 +115,9 @@ async def create_crime_report(db: AsyncSession, report: crime_report_schema.Crim
         emergency_services_details=report.emergency_services_details
     )
     
-    db.add(db_report)
-    await db.commit()
-    await db.refresh(db_report)
+    db_report = await insert_returning(db, db_report)
     
-    # Create initial status update
+    # Create initial status update in the same transaction as the report
     status_update = ReportStatusUpdate(
         crime_report_id=db_report.id,
         status="submitted",
@@ -103,21 +134,27 @@ async def create_crime_report(db: AsyncSession, report: crime_report_schema.Crim
     
     return db_report
 
+def _crime_report_values(report) -> dict:
+    values = report.dict(exclude_unset=True)
+    if "location_description" in values:
+        values["location"] = values.pop("location_description")
+    if "suspects_description" in values:
+        values["suspect_description"] = values.pop("suspects_description")
+    if "status" in values:
+        values["case_status"] = CASE_STATUSES[values.pop("status")]
+    if values.get("incident_datetime") is not None:
+        incident = values.pop("incident_datetime")
+        values["incident_date"], values["incident_time"] = incident.date(), incident.time()
+    columns = CrimeReport.__table__.columns.keys()
+    return {key: value for key, value in values.items() if key in columns}
+
 async def update_crime_report(db: AsyncSession, report_id: int, report: crime_report_schema.CrimeReportUpdate):
-    db_report = await get_crime_report(db, report_id)
-    
-    # Update report attributes
-    for key, value in report.dict(exclude_unset=True).items():
-        setattr(db_report, key, value)
-    
+    db_report = await update_returning(db, CrimeReport, report_id, _crime_report_values(report))
     await db.commit()
-    await db.refresh(db_report)
     return db_report
 
 async def delete_crime_report(db: AsyncSession, report_id: int):
-    db_report = await get_crime_report(db, report_id)
-    db_report.is_deleted = True
-    db_report.deleted_at = datetime.now()
+    db_report = await soft_delete(db, CrimeReport, report_id)
     await db.commit()
     return db_report
 
@@ -138,36 +175,32 @@ async def add_media_evidence(db: AsyncSession, report_id: int, file: UploadFile,
     else:
         media_type = "other"
     
-    # Create file path
-    file_extension = os.path.splitext(file.filename)[1]
-    file_name = f"{evidence_id}{file_extension}"
-    file_path = UPLOAD_DIR / file_name
-    
-    # Save the file
+    # Stream the file into evidence storage, refusing it once past
+    # MAX_UPLOAD_SIZE; a file uploaded before is referenced, not copied
     try:
-        async with aiofiles.open(file_path, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
-            file_size = len(content) / 1024  # Size in KB
-    except Exception as e:
+        stored = await evidence_storage.put(file, ref=evidence_id)
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"Could not upload file: {str(e)}")
     
     # Create database record
     db_evidence = MediaEvidence(
         evidence_id=evidence_id,
         media_type=media_type,
-        file_url=f"/tmp/uploads/evidence/{file_name}",
+        file_url=content_url(stored.digest),
         file_name=file.filename,
-        file_size_kb=file_size,
+        file_size_kb=stored.size / 1024,  # Size in KB
         mime_type=content_type,
         upload_datetime=datetime.now(),
         description=description,
         crime_report_id=report_id
     )
     
-    db.add(db_evidence)
-    await db.commit()
-    await db.refresh(db_evidence)
+    try:
+        db_evidence = await insert_returning(db, db_evidence)
+        await db.commit()
+    except Exception:
+        await evidence_storage.release(stored.digest, evidence_id)
+        raise
     
     return db_evidence
 
@@ -188,9 +221,8 @@ async def add_witness_statement(db: AsyncSession, report_id: int, statement: cri
         crime_report_id=report_id
     )
     
-    db.add(db_statement)
+    db_statement = await insert_returning(db, db_statement)
     await db.commit()
-    await db.refresh(db_statement)
     
     return db_statement
 
@@ -206,14 +238,12 @@ async def add_status_update(db: AsyncSession, report_id: int, status_update: cri
         updated_by=status_update.updated_by
     )
     
-    db.add(db_status_update)
+    db_status_update = await insert_returning(db, db_status_update)
     
     # Update the report status
-    db_report = await get_crime_report(db, report_id)
-    db_report.status = status_update.status
+    await update_returning(db, CrimeReport, report_id, {"case_status": CASE_STATUSES[status_update.status]})
     
     await db.commit()
-    await db.refresh(db_status_update)
     
     return db_status_update
 
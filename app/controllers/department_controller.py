@@ -1,12 +1,13 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
-from datetime import datetime
-from app.models.government import Department, Agency
+from app.db import hierarchy
+from app.db.writes import insert_returning, soft_delete, update_returning
+from app.models.government import Department, Agency, OrgUnitClosure
 from app.schemas import department_schema
 
 async def get_department(db: AsyncSession, department_id: int):
-    query = select(Department).where(Department.id == department_id, Department.is_deleted == False)
+    query = select(Department).where(Department.id == department_id)
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
@@ -17,7 +18,7 @@ async def get_departments(
     name: Optional[str] = None,
     ministry_id: Optional[int] = None
 ):
-    query = select(Department).where(Department.is_deleted == False)
+    query = select(Department)
     
     if name:
         query = query.where(Department.name.ilike(f"%{name}%"))
@@ -44,33 +45,37 @@ async def create_department(db: AsyncSession, department: department_schema.Depa
         is_active=department.is_active,
         ministry_id=department.ministry_id
     )
-    db.add(db_department)
+    db_department = await insert_returning(db, db_department)
+    await hierarchy.attach(db, OrgUnitClosure, db_department.id, db_department.ministry_id)
     await db.commit()
-    await db.refresh(db_department)
+    hierarchy.org_tree_cache.invalidate()
     return db_department
 
+def _department_values(department) -> dict:
+    values = department.dict(exclude_unset=True)
+    if "phone_number" in values:
+        values["phone"] = values.pop("phone_number")
+    columns = Department.__table__.columns.keys()
+    return {key: value for key, value in values.items() if key in columns}
+
 async def update_department(db: AsyncSession, department_id: int, department: department_schema.DepartmentUpdate):
-    db_department = await get_department(db, department_id)
-    
-    # Update department attributes
-    for key, value in department.dict(exclude_unset=True).items():
-        setattr(db_department, key, value)
-    
+    values = _department_values(department)
+    db_department = await update_returning(db, Department, department_id, values)
+    if db_department is not None and "ministry_id" in values:
+        await hierarchy.move(db, OrgUnitClosure, db_department.id, db_department.ministry_id)
     await db.commit()
-    await db.refresh(db_department)
+    hierarchy.org_tree_cache.invalidate()
     return db_department
 
 async def delete_department(db: AsyncSession, department_id: int):
-    db_department = await get_department(db, department_id)
-    db_department.is_deleted = True
-    db_department.deleted_at = datetime.now()
+    db_department = await soft_delete(db, Department, department_id)
     await db.commit()
+    hierarchy.org_tree_cache.invalidate()
     return db_department
 
 async def get_department_agencies(db: AsyncSession, department_id: int):
     query = select(Agency).where(
-        Agency.department_id == department_id,
-        Agency.is_deleted == False
+        Agency.department_id == department_id
     )
     result = await db.execute(query)
     return result.scalars().all()
@@ -1,38 +1,48 @@
 from typing import List, Optional
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from datetime import datetime
-from app.models.employee import Employee
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from fastapi import Request
+from app.db import hierarchy
+from app.db.export import ExportColumn, export_response
+from app.db.name_search import search_by_name, search_name
+from app.db.pagination import paginate_keyset, build_page
+from app.db.writes import insert_returning, soft_delete, update_returning
+from app.models.employee import Employee, EmployeeClosure, Position
+from app.models.finance import PayrollCluster, PayrollClusterMember
 from app.models.performance import PerformanceReview
 from app.schemas import employee_schema
+from app.schemas.export_schema import ExportFormatEnum
+
+# Supervisors come before their subordinates, so a reader can build the tree as rows arrive
+ORG_CHART_EXPORT_COLUMNS = [
+    ExportColumn(name) for name in (
+        "id", "supervisor_id", "employee_number", "first_name", "middle_name", "last_name",
+        "position_id", "ministry_id", "department_id", "status",
+    )
+]
 
 async def get_employee(db: AsyncSession, employee_id: int):
     query = select(Employee).where(
-        Employee.id == employee_id,
-        Employee.is_deleted == False
+        Employee.id == employee_id
     )
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
-async def get_employees(
-    db: AsyncSession,
-    skip: int = 0,
-    limit: int = 100,
+def _employees_query(
     name: Optional[str] = None,
     position_id: Optional[int] = None,
     ministry_id: Optional[int] = None,
     department_id: Optional[int] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    reports_to: Optional[uuid.UUID] = None
 ):
-    query = select(Employee).where(Employee.is_deleted == False)
+    query = select(Employee)
     
     if name:
-        query = query.where(
-            or_(
-                Employee.first_name.ilike(f"%{name}%"),
-                Employee.last_name.ilike(f"%{name}%")
-            )
-        )
+        query = query.where(search_name(Employee).contains(name.lower(), autoescape=True))
     
     if position_id:
         query = query.where(Employee.position_id == position_id)
@@ -46,10 +56,134 @@ async def get_employees(
     if status:
         query = query.where(Employee.status == status)
     
+    if org_unit_id:
+        query = query.where(hierarchy.under_org_unit(Employee, org_unit_id))
+    
+    if reports_to:
+        query = query.where(Employee.id.in_(hierarchy.descendants(EmployeeClosure, reports_to, min_depth=1)))
+    
+    return query
+
+async def get_employees(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    name: Optional[str] = None,
+    position_id: Optional[int] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    reports_to: Optional[uuid.UUID] = None
+):
+    query = _employees_query(name, position_id, ministry_id, department_id, status, org_unit_id, reports_to)
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+async def get_employees_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    name: Optional[str] = None,
+    position_id: Optional[int] = None,
+    ministry_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    status: Optional[str] = None,
+    org_unit_id: Optional[uuid.UUID] = None,
+    reports_to: Optional[uuid.UUID] = None
+):
+    query = _employees_query(name, position_id, ministry_id, department_id, status, org_unit_id, reports_to)
+    query = paginate_keyset(query, Employee.created_at, Employee.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.scalars().all(), Employee.created_at, limit)
+
+async def search_employees(db: AsyncSession, q: str, limit: int = 20):
+    matches = await search_by_name(db, Employee, q, limit=limit)
+    return [{"item": employee, "score": score} for employee, score in matches]
+
+async def get_payroll_clusters(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    rule: Optional[employee_schema.PayrollRuleEnum] = None,
+    ministry_id: Optional[uuid.UUID] = None,
+    employee_id: Optional[uuid.UUID] = None
+):
+    query = select(PayrollCluster).options(selectinload(PayrollCluster.members))
+
+    if rule:
+        query = query.where(PayrollCluster.rule == rule.value)
+
+    if ministry_id:
+        query = query.where(PayrollCluster.members.any(PayrollClusterMember.ministry_id == ministry_id))
+
+    if employee_id:
+        query = query.where(PayrollCluster.members.any(PayrollClusterMember.employee_id == employee_id))
+
+    # Largest clusters first
+    query = paginate_keyset(query, PayrollCluster.employee_count, PayrollCluster.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.scalars().all(), PayrollCluster.employee_count, limit)
+
+def _org_chart_query():
+    return (
+        select(
+            Employee.id, Employee.supervisor_id, Employee.employee_number,
+            Employee.first_name, Employee.middle_name, Employee.last_name,
+            Employee.position_id, Position.title.label("position_title"),
+            Employee.ministry_id, Employee.department_id, Employee.status,
+            EmployeeClosure.depth,
+        )
+        .outerjoin(Employee.position)
+    )
+
+async def get_org_chart(db: AsyncSession, employee_id: uuid.UUID, depth: int, limit: int):
+    version = hierarchy.reporting_cache.version
+    key = (employee_id, depth, limit)
+    chart = hierarchy.reporting_cache.get(version, key)
+    if chart is not None:
+        return chart
+
+    chain_query = (
+        _org_chart_query()
+        .join(EmployeeClosure, EmployeeClosure.ancestor_id == Employee.id)
+        .where(EmployeeClosure.descendant_id == employee_id, EmployeeClosure.depth >= 1)
+        .order_by(EmployeeClosure.depth)
+    )
+    # One row past the limit shows whether the subtree was cut short
+    subtree_query = (
+        _org_chart_query()
+        .join(EmployeeClosure, EmployeeClosure.descendant_id == Employee.id)
+        .where(EmployeeClosure.ancestor_id == employee_id, EmployeeClosure.depth.between(1, depth))
+        .order_by(EmployeeClosure.depth, Employee.last_name, Employee.first_name, Employee.id)
+        .limit(limit + 1)
+    )
+    chain = (await db.execute(chain_query)).all()
+    subordinates = (await db.execute(subtree_query)).all()
+    chart = {
+        "employee_id": employee_id,
+        "chain": chain,
+        "subordinates": subordinates[:limit],
+        "truncated": len(subordinates) > limit,
+    }
+    hierarchy.reporting_cache.set(version, key, chart)
+    return chart
+
+def export_org_chart(
+    request: Request,
+    employee_id: uuid.UUID,
+    depth: int,
+    export_format: ExportFormatEnum
+):
+    query = (
+        select(Employee)
+        .join(EmployeeClosure, EmployeeClosure.descendant_id == Employee.id)
+        .where(EmployeeClosure.ancestor_id == employee_id, EmployeeClosure.depth.between(1, depth))
+        .order_by(EmployeeClosure.depth, Employee.id)
+    )
+    return export_response(request, query, ORG_CHART_EXPORT_COLUMNS, export_format, "org-chart")
+
 async def create_employee(db: AsyncSession, employee: employee_schema.EmployeeCreate):
     db_employee = Employee(
         first_name=employee.first_name,
@@ -100,33 +234,31 @@ async def create_employee(db: AsyncSession, employee: employee_schema.EmployeeCr
         ward_id=employee.ward_id
     )
     
-    db.add(db_employee)
+    db_employee = await insert_returning(db, db_employee)
+    await hierarchy.attach(db, EmployeeClosure, db_employee.id, db_employee.supervisor_id)
     await db.commit()
-    await db.refresh(db_employee)
+    hierarchy.reporting_cache.bump()
     return db_employee
 
 async def update_employee(db: AsyncSession, employee_id: int, employee: employee_schema.EmployeeUpdate):
-    db_employee = await get_employee(db, employee_id)
-    
-    # Update employee attributes
-    for key, value in employee.dict(exclude_unset=True).items():
-        setattr(db_employee, key, value)
-    
+    values = employee.dict(exclude_unset=True)
+    db_employee = await update_returning(db, Employee, employee_id, values)
+    if db_employee is not None and "supervisor_id" in values:
+        await hierarchy.move(db, EmployeeClosure, db_employee.id, db_employee.supervisor_id)
     await db.commit()
-    await db.refresh(db_employee)
+    if "supervisor_id" in values:
+        hierarchy.reporting_cache.bump()
     return db_employee
 
 async def delete_employee(db: AsyncSession, employee_id: int):
-    db_employee = await get_employee(db, employee_id)
-    db_employee.is_deleted = True
-    db_employee.deleted_at = datetime.now()
+    db_employee = await soft_delete(db, Employee, employee_id)
     await db.commit()
+    hierarchy.reporting_cache.bump()
     return db_employee
 
 async def get_employee_performance_reviews(db: AsyncSession, employee_id: int):
     query = select(PerformanceReview).where(
-        PerformanceReview.employee_id == employee_id,
-        PerformanceReview.is_deleted == False
+        PerformanceReview.employee_id == employee_id
     )
     result = await db.execute(query)
     return result.scalars().all()
@@ -1,25 +1,52 @@
 from typing import List, Optional
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, update, delete
-from datetime import datetime
-from app.models.government import Ministry, Department
+from fastapi import Request
+from app.auth.principal import Principal
+from app.db import hierarchy
+from app.db.export import ExportColumn, export_response
+from app.db.writes import insert_returning, soft_delete, update_returning
+from app.models.government import Ministry, Department, OrgUnitClosure
 from app.schemas import ministry_schema
+from app.schemas.export_schema import ExportFormatEnum
+
+EXPORT_COLUMNS = [
+    ExportColumn(name) for name in (
+        "id", "name", "code", "description", "mission", "vision", "functions",
+        "establishment_date", "website", "email", "phone", "physical_address",
+        "postal_address", "is_active", "minister_id", "permanent_secretary_id", "created_at",
+    )
+]
 
 async def get_ministry(db: AsyncSession, ministry_id: int):
-    query = select(Ministry).where(Ministry.id == ministry_id, Ministry.is_deleted == False)
+    query = select(Ministry).where(Ministry.id == ministry_id)
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
-async def get_ministries(db: AsyncSession, skip: int = 0, limit: int = 100, name: Optional[str] = None):
-    query = select(Ministry).where(Ministry.is_deleted == False)
+def _ministries_query(name: Optional[str] = None):
+    query = select(Ministry)
     
     if name:
         query = query.where(Ministry.name.ilike(f"%{name}%"))
     
+    return query
+
+async def get_ministries(db: AsyncSession, skip: int = 0, limit: int = 100, name: Optional[str] = None):
+    query = _ministries_query(name)
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+def export_ministries(
+    request: Request,
+    export_format: ExportFormatEnum,
+    principal: Optional[Principal] = None,
+    name: Optional[str] = None
+):
+    query = _ministries_query(name).order_by(Ministry.created_at, Ministry.id)
+    return export_response(request, query, EXPORT_COLUMNS, export_format, "ministries", principal=principal)
+
 async def create_ministry(db: AsyncSession, ministry: ministry_schema.MinistryCreate):
     db_ministry = Ministry(
         name=ministry.name,
@@ -34,34 +61,39 @@ async def create_ministry(db: AsyncSession, ministry: ministry_schema.MinistryCr
         email=ministry.email,
         is_active=ministry.is_active
     )
-    db.add(db_ministry)
+    db_ministry = await insert_returning(db, db_ministry)
+    await hierarchy.attach(db, OrgUnitClosure, db_ministry.id, None)
     await db.commit()
-    await db.refresh(db_ministry)
+    hierarchy.org_tree_cache.invalidate()
     return db_ministry
 
+def _ministry_values(ministry) -> dict:
+    values = ministry.dict(exclude_unset=True)
+    if "phone_number" in values:
+        values["phone"] = values.pop("phone_number")
+    if values.get("website") is not None:
+        values["website"] = str(values["website"])
+    columns = Ministry.__table__.columns.keys()
+    return {key: value for key, value in values.items() if key in columns}
+
 async def update_ministry(db: AsyncSession, ministry_id: int, ministry: ministry_schema.MinistryUpdate):
-    db_ministry = await get_ministry(db, ministry_id)
-    
-    # Update ministry attributes
-    for key, value in ministry.dict(exclude_unset=True).items():
-        setattr(db_ministry, key, value)
-    
+    db_ministry = await update_returning(db, Ministry, ministry_id, _ministry_values(ministry))
     await db.commit()
-    await db.refresh(db_ministry)
+    hierarchy.org_tree_cache.invalidate()
     return db_ministry
 
 async def delete_ministry(db: AsyncSession, ministry_id: int):
-    db_ministry = await get_ministry(db, ministry_id)
-    db_ministry.is_deleted = True
-    db_ministry.deleted_at = datetime.now()
+    db_ministry = await soft_delete(db, Ministry, ministry_id)
     await db.commit()
+    hierarchy.org_tree_cache.invalidate()
     return db_ministry
 
 async def get_ministry_departments(db: AsyncSession, ministry_id: int):
     query = select(Department).where(
-        Department.ministry_id == ministry_id,
-        Department.is_deleted == False
+        Department.ministry_id == ministry_id
     )
     result = await db.execute(query)
     return result.scalars().all()
 
+async def get_ministry_tree(db: AsyncSession, ministry_id: uuid.UUID):
+    return await hierarchy.org_tree_cache.ministry(db, ministry_id)
@@ -1,15 +1,17 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select
 from datetime import datetime
 import uuid
+from app.db.name_search import search_by_name, search_name
+from app.db.pagination import paginate_keyset, build_page
+from app.db.writes import insert_returning, soft_delete, update_returning
 from app.models.police import PoliceOfficer, PoliceComplaint, PoliceInvestigation
 from app.schemas import police_schema
 
 async def get_police_officer(db: AsyncSession, officer_id: int):
     query = select(PoliceOfficer).where(
-        PoliceOfficer.id == officer_id,
-        PoliceOfficer.is_deleted == False
+        PoliceOfficer.id == officer_id
     )
     result = await db.execute(query)
     return result.scalar_one_or_none()
@@ -22,15 +24,10 @@ async def get_police_officers(
     rank: Optional[str] = None,
     station_id: Optional[int] = None
 ):
-    query = select(PoliceOfficer).where(PoliceOfficer.is_deleted == False)
+    query = select(PoliceOfficer)
     
     if name:
-        query = query.where(
-            or_(
-                PoliceOfficer.first_name.ilike(f"%{name}%"),
-                PoliceOfficer.last_name.ilike(f"%{name}%")
-            )
-        )
+        query = query.where(search_name(PoliceOfficer).contains(name.lower(), autoescape=True))
     
     if rank:
         query = query.where(PoliceOfficer.rank == rank)
@@ -42,6 +39,10 @@ async def get_police_officers(
     result = await db.execute(query)
     return result.scalars().all()
 
+async def search_police_officers(db: AsyncSession, q: str, limit: int = 20):
+    matches = await search_by_name(db, PoliceOfficer, q, limit=limit)
+    return [{"item": officer, "score": score} for officer, score in matches]
+
 async def create_police_officer(db: AsyncSession, officer: police_schema.PoliceOfficerCreate):
     db_officer = PoliceOfficer(
         service_number=officer.service_number,
@@ -62,45 +63,32 @@ async def create_police_officer(db: AsyncSession, officer: police_schema.PoliceO
         status=officer.status
     )
     
-    db.add(db_officer)
+    db_officer = await insert_returning(db, db_officer)
     await db.commit()
-    await db.refresh(db_officer)
     return db_officer
 
 async def update_police_officer(db: AsyncSession, officer_id: int, officer: police_schema.PoliceOfficerUpdate):
-    db_officer = await get_police_officer(db, officer_id)
-    
-    # Update officer attributes
-    for key, value in officer.dict(exclude_unset=True).items():
-        setattr(db_officer, key, value)
-    
+    db_officer = await update_returning(db, PoliceOfficer, officer_id, officer.dict(exclude_unset=True))
     await db.commit()
-    await db.refresh(db_officer)
     return db_officer
 
 async def delete_police_officer(db: AsyncSession, officer_id: int):
-    db_officer = await get_police_officer(db, officer_id)
-    db_officer.is_deleted = True
-    db_officer.deleted_at = datetime.now()
+    db_officer = await soft_delete(db, PoliceOfficer, officer_id)
     await db.commit()
     return db_officer
 
 async def get_police_complaint(db: AsyncSession, complaint_id: int):
     query = select(PoliceComplaint).where(
-        PoliceComplaint.id == complaint_id,
-        PoliceComplaint.is_deleted == False
+        PoliceComplaint.id == complaint_id
     )
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
-async def get_police_complaints(
-    db: AsyncSession,
-    skip: int = 0,
-    limit: int = 100,
+def _police_complaints_query(
     status: Optional[str] = None,
     officer_id: Optional[int] = None
 ):
-    query = select(PoliceComplaint).where(PoliceComplaint.is_deleted == False)
+    query = select(PoliceComplaint)
     
     if status:
         query = query.where(PoliceComplaint.status == status)
@@ -108,10 +96,32 @@ async def get_police_complaints(
     if officer_id:
         query = query.where(PoliceComplaint.officer_id == officer_id)
     
+    return query
+
+async def get_police_complaints(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    officer_id: Optional[int] = None
+):
+    query = _police_complaints_query(status, officer_id)
     query = query.order_by(PoliceComplaint.submission_date.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+async def get_police_complaints_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[str] = None,
+    officer_id: Optional[int] = None
+):
+    query = _police_complaints_query(status, officer_id)
+    query = paginate_keyset(query, PoliceComplaint.submission_date, PoliceComplaint.id, cursor=cursor, limit=limit)
+    result = await db.execute(query)
+    return build_page(result.scalars().all(), PoliceComplaint.submission_date, limit)
+
 async def create_police_complaint(db: AsyncSession, complaint: police_schema.PoliceComplaintCreate):
     # Generate a unique reference number
     reference_number = f"PC-{uuid.uuid4().hex[:8].upper()}"
@@ -134,23 +144,18 @@ async def create_police_complaint(db: AsyncSession, complaint: police_schema.Pol
         witnesses=complaint.witnesses
     )
     
-    db.add(db_complaint)
+    db_complaint = await insert_returning(db, db_complaint)
     await db.commit()
-    await db.refresh(db_complaint)
     return db_complaint
 
 async def update_police_complaint(db: AsyncSession, complaint_id: int, complaint: police_schema.PoliceComplaintUpdate):
-    db_complaint = await get_police_complaint(db, complaint_id)
-    
-    # Update complaint attributes
-    for key, value in complaint.dict(exclude_unset=True).items():
-        setattr(db_complaint, key, value)
+    values = complaint.dict(exclude_unset=True)
     
     # If assigned_to is updated, set assignment_date
     if complaint.assigned_to is not None:
-        db_complaint.assignment_date = datetime.now()
+        values["assignment_date"] = datetime.now()
     
+    db_complaint = await update_returning(db, PoliceComplaint, complaint_id, values)
     await db.commit()
-    await db.refresh(db_complaint)
     return db_complaint
 
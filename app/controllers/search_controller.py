@@ -0,0 +1,71 @@
+from typing import Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, String, cast, func, literal, select, union_all
+from app.core.config import settings
+from app.db.pagination import paginate_keyset, build_page
+from app.models.crime_reporting import CrimeReport
+from app.models.police import PoliceComplaint, IncidentReport
+from app.models.public import Complaint
+from app.schemas.search_schema import SearchTypeEnum
+
+# What each searchable model contributes to a hit:
+# model, reference, title, status, date and the text snippets are cut from
+SEARCH_SOURCES = {
+    SearchTypeEnum.COMPLAINT: lambda: (
+        Complaint, Complaint.reference_number, Complaint.subject, Complaint.status,
+        Complaint.submission_date, (Complaint.subject, Complaint.description, Complaint.resolution_details),
+    ),
+    SearchTypeEnum.CRIME_REPORT: lambda: (
+        CrimeReport, CrimeReport.report_number, cast(CrimeReport.crime_type, String), CrimeReport.case_status,
+        CrimeReport.report_date, (CrimeReport.description, CrimeReport.suspect_description),
+    ),
+    SearchTypeEnum.POLICE_COMPLAINT: lambda: (
+        PoliceComplaint, PoliceComplaint.reference_number, PoliceComplaint.subject, PoliceComplaint.status,
+        PoliceComplaint.submission_date,
+        (PoliceComplaint.subject, PoliceComplaint.description, PoliceComplaint.resolution_details),
+    ),
+    SearchTypeEnum.INCIDENT_REPORT: lambda: (
+        IncidentReport, IncidentReport.report_number, IncidentReport.title, IncidentReport.status,
+        IncidentReport.report_datetime,
+        (IncidentReport.title, IncidentReport.description, IncidentReport.resolution_details),
+    ),
+}
+
+def search_query(q: str):
+    """
+    Parse web-style search input ("quoted phrases", or, -excluded) with both
+    search configurations, so stemmed English and as-written words both match.
+    """
+    return func.websearch_to_tsquery("english", q).op("||")(func.websearch_to_tsquery("simple", q))
+
+def _hits(search_type: SearchTypeEnum, query):
+    model, reference, title, status, date, texts = SEARCH_SOURCES[search_type]()
+    return select(
+        literal(search_type.value).label("type"),
+        model.id.label("id"),
+        reference.label("reference"),
+        title.label("title"),
+        cast(status, String).label("status"),
+        date.label("date"),
+        func.ts_rank_cd(model.search_vector, query, 32, type_=Float).label("rank"),
+        func.concat_ws(" ", *texts).label("body"),
+    ).where(model.search_vector.op("@@")(query))
+
+async def search(
+    db: AsyncSession,
+    q: str,
+    types: Iterable[SearchTypeEnum],
+    cursor: Optional[str] = None,
+    limit: int = 20
+):
+    query = search_query(q)
+    hits = union_all(*(_hits(search_type, query) for search_type in types)).subquery("hits")
+    page = paginate_keyset(select(hits), hits.c.rank, hits.c.id, cursor=cursor, limit=limit).subquery("page")
+
+    # Highlighting is the expensive part, so it only runs on the rows of this page
+    snippet = func.ts_headline("english", page.c.body, query, settings.SEARCH_HEADLINE_OPTIONS)
+    result = await db.execute(
+        select(*(column for column in page.c if column.key != "body"), snippet.label("snippet"))
+        .order_by(page.c.rank.desc(), page.c.id.desc())
+    )
+    return build_page(result.all(), hits.c.rank, limit)
@@ -16,6 +16,12 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
     ALGORITHM: str = "HS256"
+    PRINCIPAL_CACHE_TTL: int = 60  # seconds, 0 disables caching
+
+    # Password hashing
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "process"  # "process", or "thread" when the bcrypt package releases the GIL
+    PASSWORD_HASH_WORKERS: int = 4
 
     # CORS Settings
     CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -36,6 +42,19 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
 
+    # Connection pool and asyncpg tuning
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection
+    DB_PGBOUNCER_MODE: bool = False  # transaction pooling: no server-side statement caching
+
+    # Read replicas: GET routes read from these unless the client wrote recently
+    DB_REPLICA_URIS: List[str] = []
+    DB_READ_YOUR_WRITES_WINDOW: int = 5  # seconds reads stay on the primary after a write
+
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     @classmethod
     def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
@@ -50,6 +69,19 @@ class Settings(BaseSettings):
     # File upload settings
     UPLOAD_DIR: str = "/tmp/uploads"
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50 MB
+    MAX_REQUEST_SIZE: int = 51 * 1024 * 1024  # largest upload plus room for the other form fields
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # bytes read, hashed and written at a time
+
+    # Evidence storage, content-addressed so identical files are kept once
+    EVIDENCE_STORAGE_BACKEND: str = "local"  # "local" or "s3"
+    EVIDENCE_STORAGE_DIR: str = "/tmp/uploads/evidence"  # root of the local store
+    EVIDENCE_S3_ENDPOINT: Optional[str] = None  # e.g. https://s3.af-south-1.amazonaws.com or a MinIO URL
+    EVIDENCE_S3_BUCKET: str = "evidence"
+    EVIDENCE_S3_REGION: str = "us-east-1"
+    EVIDENCE_S3_ACCESS_KEY: Optional[str] = None
+    EVIDENCE_S3_SECRET_KEY: Optional[str] = None
+    EVIDENCE_S3_PREFIX: str = ""  # key prefix, for sharing a bucket
+    EVIDENCE_S3_TIMEOUT: float = 30.0  # seconds
 
     # Email settings for notifications
     SMTP_TLS: bool = True
@@ -64,10 +96,57 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 100
     MAX_PAGE_SIZE: int = 1000
 
+    # Full-text search
+    SEARCH_PAGE_SIZE: int = 20
+    SEARCH_HEADLINE_OPTIONS: str = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MinWords=10, MaxWords=30"
+
+    # Streaming exports
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched per server-side cursor round-trip
+    EXPORT_GZIP_LEVEL: int = 6
+
+    # Expenditure anomaly detection
+    ANOMALY_BATCH_SIZE: int = 50_000  # rows fetched per server-side cursor round-trip
+    ANOMALY_OUTLIER_THRESHOLD: float = 3.5  # modified z-score of an amount within its vendor and category
+    ANOMALY_MIN_GROUP_SIZE: int = 10  # payments a vendor and category need before outliers are judged
+    ANOMALY_BENFORD_MIN_ROWS: int = 500  # payments a department needs before Benford's law is applied
+    ANOMALY_BENFORD_MAD_THRESHOLD: float = 0.015  # Nigrini's first-digit nonconformity bound
+    ANOMALY_ROUND_UNIT: float = 1000  # amounts that are whole multiples of this are round
+    ANOMALY_ROUND_Z_THRESHOLD: float = 3.0
+    ANOMALY_LOOKBACK_DAYS: int = 365  # fiscal years ended within this are still scanned daily
+
+    # Split-purchase detection
+    SPLIT_PURCHASE_THRESHOLDS: List[float] = [100_000, 500_000, 1_000_000, 5_000_000]  # approval limits
+    SPLIT_PURCHASE_MIN_FRACTION: float = 0.2  # smaller payments are not counted towards a limit
+    SPLIT_PURCHASE_WINDOW_DAYS: int = 14  # payments at most this many days apart may be one purchase
+    SPLIT_PURCHASE_MIN_PAYMENTS: int = 2
+    SPLIT_PURCHASE_BATCH_SIZE: int = 10_000  # rows fetched per server-side cursor round-trip
+    SPLIT_PURCHASE_SCAN_INTERVAL: int = 60 * 15  # seconds between scans of recently written expenditures
+
+    # Payroll integrity checks
+    PAYROLL_BATCH_SIZE: int = 10_000  # rows fetched per server-side cursor round-trip
+    PAYROLL_ATTENDANCE_DAYS: int = 90  # salaried employees with no attendance in this many days are flagged
+    PAYROLL_MAX_CLUSTER_SIZE: int = 25  # larger clusters are shared facilities, like barracks addresses
+
+    # Organisational hierarchy
+    ORG_TREE_CACHE_TTL: int = 300  # seconds, bounds staleness for writes made by other worker processes
+    ORG_CHART_DEFAULT_DEPTH: int = 3  # levels of subordinates returned when none is asked for
+    ORG_CHART_MAX_DEPTH: int = 20
+    ORG_CHART_CACHE_TTL: int = 60  # seconds
+    ORG_CHART_CACHE_SIZE: int = 1000  # chains and subtrees kept, least recently used dropped first
+
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_DEFAULT_LIMIT: int = 100
     RATE_LIMIT_DEFAULT_PERIOD: int = 60  # seconds
+    RATE_LIMIT_AUTHENTICATED_LIMIT: int = 300  # per period, keyed on user instead of IP
+    RATE_LIMIT_ROUTE_POLICIES: Dict[str, str] = {
+        "/api/v1/auth/login": "10/60",
+        "/api/v1/password-reset": "5/300",
+    }  # path prefix -> "<limit>/<period seconds>"
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_API_KEY_CACHE_TTL: int = 300  # seconds
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="ignore"
@@ -86,6 +86,15 @@ class ResourceLimitExceededError(BaseAPIException):
         )
 
 
+class PayloadTooLargeError(BaseAPIException):
+    def __init__(self, detail: str = "Upload exceeds the maximum allowed size"):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=detail,
+            error_code="PAYLOAD_TOO_LARGE",
+        )
+
+
 def setup_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(BaseAPIException)
     async def handle_base_api_exception(
@@ -0,0 +1,230 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    Allow `limit` requests per `period` seconds. A limit of zero or less
+    allows none.
+    """
+    limit: int
+    period: int
+
+    def __post_init__(self):
+        if self.period <= 0:
+            raise ValueError(f"Rate limit period must be positive, got {self.period}")
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimitPolicy":
+        """
+        Parse a policy written as "<limit>/<period seconds>", e.g. "10/60".
+        """
+        limit, _, period = value.partition("/")
+        return cls(limit=int(limit), period=int(period or settings.RATE_LIMIT_DEFAULT_PERIOD))
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_at: float
+    retry_after: float = 0.0
+
+
+class MemoryRateLimitStore:
+    """
+    Per-process token bucket limiter.
+
+    Buckets are kept in LRU order and the least recently used are evicted once
+    max_keys is exceeded, so memory stays bounded however many clients appear.
+    An evicted bucket is indistinguishable from one that has refilled.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        now = time.time()
+        if policy.limit <= 0:
+            return RateLimitResult(False, 0, 0, now + policy.period, float(policy.period))
+        rate = policy.limit / policy.period
+
+        tokens, updated = self._buckets.pop(key, (float(policy.limit), now))
+        tokens = min(float(policy.limit), tokens + (now - updated) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=policy.limit,
+            remaining=int(tokens),
+            reset_at=now + (policy.limit - tokens) / rate,
+            retry_after=0.0 if allowed else (1 - tokens) / rate,
+        )
+
+    async def close(self) -> None:
+        self._buckets.clear()
+
+
+class RespError(Exception):
+    pass
+
+
+class RespClient:
+    """
+    Minimal Redis protocol (RESP2) client supporting pipelined commands.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _encode(command: Sequence[Any]) -> bytes:
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by rate limit backend")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RespError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    async def _read_replies(self, count: int) -> List[Any]:
+        # Replies arrive in command order, so they must be read one at a time
+        return [await self._read_reply() for _ in range(count)]
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        setup: List[Sequence[Any]] = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._writer.write(b"".join(self._encode(command) for command in setup))
+            for _ in setup:
+                await self._read_reply()
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await asyncio.wait_for(self._connect(), self.timeout)
+                self._writer.write(b"".join(self._encode(command) for command in commands))
+                await self._writer.drain()
+                return await asyncio.wait_for(self._read_replies(len(commands)), self.timeout)
+            except Exception:
+                await self._close()
+                raise
+
+    async def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close()
+
+
+class RedisRateLimitStore:
+    """
+    Sliding window counter shared by every worker through a Redis protocol server.
+
+    Only INCR, PEXPIRE and GET are used, so any RESP compatible server can act
+    as the backend. If the backend is unreachable requests are allowed through.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        self.client = RespClient(url)
+        self.prefix = prefix
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        now = time.time()
+        window = int(now // policy.period)
+        elapsed = (now % policy.period) / policy.period
+        current_key = f"{self.prefix}{key}:{window}"
+        previous_key = f"{self.prefix}{key}:{window - 1}"
+
+        try:
+            current, _, previous = await self.client.pipeline([
+                ("INCR", current_key),
+                ("PEXPIRE", current_key, policy.period * 2000),
+                ("GET", previous_key),
+            ])
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {str(e)}")
+            return RateLimitResult(True, policy.limit, policy.limit, now + policy.period)
+
+        estimated = int(previous or 0) * (1 - elapsed) + current
+        allowed = estimated <= policy.limit
+        reset_at = (window + 1) * policy.period
+        return RateLimitResult(
+            allowed=allowed,
+            limit=policy.limit,
+            remaining=max(0, int(policy.limit - estimated)),
+            reset_at=reset_at,
+            retry_after=0.0 if allowed else reset_at - now,
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_rate_limit_store():
+    """
+    Build the store selected by RATE_LIMIT_BACKEND.
+    """
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.RATE_LIMIT_REDIS_URL:
+            raise ValueError("RATE_LIMIT_REDIS_URL must be set when RATE_LIMIT_BACKEND is 'redis'")
+        return RedisRateLimitStore(settings.RATE_LIMIT_REDIS_URL)
+    return MemoryRateLimitStore(settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_store = create_rate_limit_store()
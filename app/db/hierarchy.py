@@ -0,0 +1,309 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from sqlalchemy import and_, delete, exists, insert, null, or_, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.logging import logger
+from app.models.base import INCLUDE_DELETED
+from app.models.employee import Employee, EmployeeClosure
+from app.models.government import Agency, County, Department, Division, Ministry, OrgUnitClosure, SubCounty, Ward
+
+Closure = Union[Type[OrgUnitClosure], Type[EmployeeClosure]]
+
+# Each unit table with the column holding its parent unit
+ORG_UNIT_PARENTS = (
+    (Ministry, None),
+    (Department, Department.ministry_id),
+    (Division, Division.department_id),
+    (Agency, Agency.ministry_id),
+    (County, None),
+    (SubCounty, SubCounty.county_id),
+    (Ward, Ward.sub_county_id),
+)
+
+# Columns that place a row such as an employee, budget or complaint in a unit
+ORG_UNIT_COLUMNS = ("ministry_id", "department_id", "agency_id", "county_id", "sub_county_id", "ward_id")
+
+_INSERT_BATCH = 5_000
+
+
+def descendants(closure: Closure, node_id: Any, min_depth: int = 0):
+    """
+    Ids of everything under node_id, and node_id itself unless min_depth is
+    1, as a subquery for IN filters.
+    """
+    query = select(closure.descendant_id).where(closure.ancestor_id == node_id)
+    if min_depth:
+        query = query.where(closure.depth >= min_depth)
+    return query
+
+
+def under_org_unit(model: Any, unit_id: Any):
+    """
+    Criterion for rows of model placed in unit_id or any unit under it,
+    through whichever of their unit columns is set.
+    """
+    units = descendants(OrgUnitClosure, unit_id)
+    return or_(*(getattr(model, column).in_(units) for column in ORG_UNIT_COLUMNS if hasattr(model, column)))
+
+
+async def _lock(db: AsyncSession, closure: Closure) -> None:
+    # One writer at a time, since a node attached under a subtree that is
+    # being moved would copy its old paths; readers are not blocked
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"LOCK TABLE {closure.__tablename__} IN EXCLUSIVE MODE"))
+
+
+async def _insert_paths(db: AsyncSession, closure: Closure, rows: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(rows), _INSERT_BATCH):
+        await db.execute(insert(closure), rows[start:start + _INSERT_BATCH])
+
+
+async def _ancestors(db: AsyncSession, closure: Closure, node_id: Any) -> List[Tuple[Any, int]]:
+    query = select(closure.ancestor_id, closure.depth).where(closure.descendant_id == node_id)
+    return [tuple(row) for row in (await db.execute(query)).all()]
+
+
+async def attach(db: AsyncSession, closure: Closure, node_id: Any, parent_id: Optional[Any]) -> None:
+    """
+    Record a new node under parent_id, or as a root when it is None. The
+    caller owns the transaction and commits.
+    """
+    await _lock(db, closure)
+    rows = [{"ancestor_id": node_id, "descendant_id": node_id, "depth": 0}]
+    if parent_id is not None:
+        rows.extend(
+            {"ancestor_id": ancestor_id, "descendant_id": node_id, "depth": depth + 1}
+            for ancestor_id, depth in await _ancestors(db, closure, parent_id)
+        )
+    await _insert_paths(db, closure, rows)
+
+
+async def move(db: AsyncSession, closure: Closure, node_id: Any, parent_id: Optional[Any]) -> None:
+    """
+    Move node_id, with everything under it, beneath parent_id, or make it a
+    root when parent_id is None.
+
+    Paths inside the moved subtree are kept; only those from units above it
+    are replaced. Does nothing when the node is already there. The caller
+    owns the transaction and commits.
+    """
+    await _lock(db, closure)
+    current = select(closure.ancestor_id).where(closure.descendant_id == node_id, closure.depth == 1)
+    if (await db.execute(current)).scalars().all() == ([] if parent_id is None else [parent_id]):
+        return
+
+    subtree = select(closure.descendant_id, closure.depth).where(closure.ancestor_id == node_id)
+    members = [tuple(row) for row in (await db.execute(subtree)).all()]
+    if parent_id is not None and any(member_id == parent_id for member_id, _ in members):
+        raise ValidationError("A record cannot be placed under itself or anything beneath it")
+
+    member_ids = descendants(closure, node_id)
+    await db.execute(
+        delete(closure).where(closure.descendant_id.in_(member_ids), closure.ancestor_id.not_in(member_ids))
+    )
+    if parent_id is None:
+        return
+    ancestors = await _ancestors(db, closure, parent_id)
+    await _insert_paths(db, closure, [
+        {"ancestor_id": ancestor_id, "descendant_id": member_id, "depth": ancestor_depth + member_depth + 1}
+        for ancestor_id, ancestor_depth in ancestors
+        for member_id, member_depth in members
+    ])
+
+
+def _org_unit_nodes():
+    return union_all(*(
+        select(model.id.label("id"), (parent if parent is not None else null().cast(model.id.type)).label("parent_id"))
+        for model, parent in ORG_UNIT_PARENTS
+    ))
+
+
+def _employee_nodes():
+    return select(Employee.id.label("id"), Employee.supervisor_id.label("parent_id"))
+
+
+async def repair(db: AsyncSession, closure: Closure, nodes) -> int:
+    """
+    Bring a closure table back in line with the parent columns of nodes, a
+    select of (id, parent_id), after writes made outside the controllers.
+
+    Only nodes whose own path or path to their parent is missing or wrong
+    are moved, so a clean table costs one anti-join. Soft-deleted nodes are
+    kept, so their live descendants stay under the units above them.
+    Returns the number of nodes repaired.
+    """
+    await _lock(db, closure)
+    nodes = nodes.subquery()
+    own_path = exists().where(closure.descendant_id == nodes.c.id, closure.depth == 0)
+    parent_path = exists().where(
+        closure.descendant_id == nodes.c.id, closure.depth == 1, closure.ancestor_id == nodes.c.parent_id
+    )
+    stray_path = exists().where(
+        closure.descendant_id == nodes.c.id,
+        closure.depth == 1,
+        or_(nodes.c.parent_id.is_(None), closure.ancestor_id != nodes.c.parent_id),
+    )
+    query = (
+        select(nodes.c.id, nodes.c.parent_id, own_path.label("has_own_path"))
+        .where(or_(~own_path, stray_path, and_(nodes.c.parent_id.is_not(None), ~parent_path)))
+        .execution_options(**{INCLUDE_DELETED: True})
+    )
+    drifted = (await db.execute(query)).all()
+
+    await _insert_paths(db, closure, [
+        {"ancestor_id": row.id, "descendant_id": row.id, "depth": 0} for row in drifted if not row.has_own_path
+    ])
+    for row in drifted:
+        try:
+            await move(db, closure, row.id, row.parent_id)
+        except ValidationError:
+            logger.warning(f"Skipped {closure.__tablename__} repair of {row.id}: its parent is beneath it")
+    return len(drifted)
+
+
+async def repair_hierarchies(db: AsyncSession) -> Dict[str, int]:
+    """
+    Repair both closure tables. Returns the number of nodes repaired in each;
+    the caller commits.
+    """
+    return {
+        OrgUnitClosure.__tablename__: await repair(db, OrgUnitClosure, _org_unit_nodes()),
+        EmployeeClosure.__tablename__: await repair(db, EmployeeClosure, _employee_nodes()),
+    }
+
+
+@dataclass
+class OrgNode:
+    id: Any
+    type: str
+    name: str
+    code: str
+    is_active: bool
+    children: List["OrgNode"] = field(default_factory=list)
+
+
+async def _load_ministry_trees(db: AsyncSession) -> Dict[Any, OrgNode]:
+    """
+    Every live ministry with its departments, their divisions, and its
+    agencies, in four queries.
+    """
+    async def load(model, parent, unit_type: str) -> List[Tuple[Optional[Any], OrgNode]]:
+        parent = (parent if parent is not None else null()).label("parent_id")
+        query = select(model.id, model.name, model.code, model.is_active, parent).order_by(model.name)
+        return [
+            (row.parent_id, OrgNode(row.id, unit_type, row.name, row.code, row.is_active))
+            for row in (await db.execute(query)).all()
+        ]
+
+    ministries = {node.id: node for _, node in await load(Ministry, None, "ministry")}
+    departments = {}
+    for ministry_id, node in await load(Department, Department.ministry_id, "department"):
+        if ministry_id in ministries:
+            ministries[ministry_id].children.append(node)
+            departments[node.id] = node
+    for department_id, node in await load(Division, Division.department_id, "division"):
+        if department_id in departments:
+            departments[department_id].children.append(node)
+    for ministry_id, node in await load(Agency, Agency.ministry_id, "agency"):
+        if ministry_id in ministries:
+            ministries[ministry_id].children.append(node)
+    return ministries
+
+
+class OrgTreeCache:
+    """
+    In-process cache of every ministry's tree of departments, divisions and
+    agencies, loaded whole since the structure is small and read often.
+
+    Dropped explicitly after local writes to the structure; the TTL bounds
+    staleness for writes made by other worker processes. A load that races
+    an invalidation is served but not kept.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._version = 0
+        self._entry: Optional[Tuple[float, Dict[Any, OrgNode]]] = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> Optional[Dict[Any, OrgNode]]:
+        entry = self._entry
+        if entry is not None and entry[0] >= time.monotonic():
+            return entry[1]
+        return None
+
+    async def ministry(self, db: AsyncSession, ministry_id: Any) -> Optional[OrgNode]:
+        ministries = self._fresh()
+        if ministries is None:
+            # One load at a time, so an expiry does not send every request to the database
+            async with self._lock:
+                ministries = self._fresh()
+                if ministries is None:
+                    version = self._version
+                    ministries = await _load_ministry_trees(db)
+                    if self.ttl > 0 and version == self._version:
+                        self._entry = (time.monotonic() + self.ttl, ministries)
+        return ministries.get(ministry_id)
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._entry = None
+
+
+org_tree_cache = OrgTreeCache(settings.ORG_TREE_CACHE_TTL)
+
+
+class ReportingCache:
+    """
+    In-process LRU cache of reporting chains and subtrees, keyed on the
+    reporting hierarchy version as well as the query.
+
+    The version is bumped after local writes that add, remove or move an
+    employee, which leaves every older entry unreachable at once; the TTL
+    bounds staleness for writes made by other worker processes. Callers read
+    the version before querying and store under it, so a result computed
+    while a write committed is never served as current.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, version: int, key: Tuple[Any, ...]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((version, *key))
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[(version, *key)]
+                return None
+            self._entries.move_to_end((version, *key))
+            return entry[1]
+
+    def set(self, version: int, key: Tuple[Any, ...], value: Any) -> None:
+        if self.ttl <= 0 or version != self.version:
+            return
+        with self._lock:
+            self._entries[(version, *key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((version, *key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bump(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+
+reporting_cache = ReportingCache(settings.ORG_CHART_CACHE_TTL, settings.ORG_CHART_CACHE_SIZE)
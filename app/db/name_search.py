@@ -0,0 +1,131 @@
+import re
+from typing import Any, List, Set, Tuple, Type, TypeVar
+
+from sqlalchemy import ColumnElement, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ModelT = TypeVar("ModelT")
+
+NAME_PARTS = ("first_name", "middle_name", "last_name")
+
+# pg_trgm's default pg_trgm.word_similarity_threshold, used by the %> operator
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+# Upper bound on LIKE clauses used to pick candidates without pg_trgm
+MAX_FALLBACK_TRIGRAMS = 16
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def search_name(columns: Any) -> ColumnElement:
+    """
+    Lower-cased "first middle last" name of a model or table.
+
+    Built only from immutable functions, with the constants inlined rather
+    than bound, so queries match the expression index exactly. Pass the model
+    class in queries and Model.__table__.c in index definitions.
+    """
+    empty, space = literal("", literal_execute=True), literal(" ", literal_execute=True)
+    parts = [func.coalesce(getattr(columns, part), empty) for part in NAME_PARTS]
+    expression = parts[0]
+    for part in parts[1:]:
+        expression = expression + space + part
+    return func.lower(expression)
+
+
+def _word_trigrams(word: str) -> List[str]:
+    padded = f"  {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Trigrams of text the way pg_trgm extracts them.
+    """
+    grams: Set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        grams.update(_word_trigrams(word))
+    return grams
+
+
+def similarity(query: str, name: str) -> float:
+    """
+    Python equivalent of pg_trgm's similarity().
+    """
+    a, b = trigrams(query), trigrams(name)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def word_similarity(query: str, name: str, min_score: float = 0.0) -> float:
+    """
+    Python equivalent of pg_trgm's word_similarity().
+
+    The best similarity between the query trigrams and any contiguous run of
+    trigrams in name, so a query matching one of several names scores high.
+    Returns 0 early when the score cannot reach min_score.
+    """
+    wanted = trigrams(query)
+    ordered = [gram for word in _WORD.findall(name.lower()) for gram in _word_trigrams(word)]
+    if not wanted or not ordered:
+        return 0.0
+    # No extent can share more trigrams with the query than the whole name does
+    if len(wanted.intersection(ordered)) / len(wanted) < min_score:
+        return 0.0
+    best = 0.0
+    for start in range(len(ordered)):
+        extent: Set[str] = set()
+        for gram in ordered[start:]:
+            extent.add(gram)
+            common = len(wanted & extent)
+            best = max(best, common / len(wanted | extent))
+    return best
+
+
+async def search_by_name(
+    db: AsyncSession,
+    model: Type[ModelT],
+    query_text: str,
+    limit: int = 20,
+) -> List[Tuple[ModelT, float]]:
+    """
+    Best matches for a person's name across first, middle and last names.
+
+    Returns (row, score) pairs ordered by descending score, where score is the
+    trigram word similarity between the query and the full name. On Postgres
+    the %> operator is answered from the pg_trgm GIN index on search_name;
+    other databases scan LIKE candidates and score them in Python.
+    """
+    query_text = " ".join(_WORD.findall(query_text.lower()))
+    if not query_text:
+        return []
+
+    name = search_name(model)
+    if db.get_bind().dialect.name == "postgresql":
+        score = func.word_similarity(query_text, name)
+        query = (
+            select(model, score.label("score"))
+            .where(name.op("%>")(query_text))
+            .order_by(score.desc(), func.similarity(query_text, name).desc(), model.id)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [(row[0], row.score) for row in result]
+
+    fragments = sorted({
+        word[i:i + 3] if len(word) >= 3 else word
+        for word in query_text.split()
+        for i in range(max(1, len(word) - 2))
+    })[:MAX_FALLBACK_TRIGRAMS]
+    query = select(model).where(or_(*(name.contains(fragment) for fragment in fragments)))
+    result = await db.execute(query)
+
+    matches = []
+    for row in result.scalars():
+        full_name = " ".join(filter(None, (getattr(row, part) for part in NAME_PARTS)))
+        score = word_similarity(query_text, full_name, WORD_SIMILARITY_THRESHOLD)
+        if score >= WORD_SIMILARITY_THRESHOLD:
+            matches.append((score, similarity(query_text, full_name), str(row.id), row))
+    matches.sort(key=lambda match: (-match[0], -match[1], match[2]))
+    return [(row, score) for score, _, _, row in matches[:limit]]
@@ -0,0 +1,115 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.exceptions import ValidationError
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _coerce(column: InstrumentedAttribute, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(str(value))
+    return python_type(value)
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    """
+    payload = json.dumps([_serialize(sort_value), _serialize(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+) -> Tuple[Any, Any]:
+    """
+    Decode a cursor produced by encode_cursor back into typed column values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return _coerce(sort_column, sort_value), _coerce(id_column, row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValidationError("Invalid pagination cursor")
+
+
+def paginate_keyset(
+    query: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = True,
+) -> Select:
+    """
+    Apply keyset pagination ordered on (sort_column, id_column).
+
+    Rows after the cursor are selected with a seek predicate instead of an
+    OFFSET, so every page costs the same regardless of depth. One extra row
+    is fetched so build_page can tell whether another page exists.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column, id_column)
+        if descending:
+            query = query.where(
+                or_(
+                    sort_column < sort_value,
+                    and_(sort_column == sort_value, id_column < row_id),
+                )
+            )
+        else:
+            query = query.where(
+                or_(
+                    sort_column > sort_value,
+                    and_(sort_column == sort_value, id_column > row_id),
+                )
+            )
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    return query.limit(limit + 1)
+
+
+def build_page(
+    rows: Sequence[Any],
+    sort_column: InstrumentedAttribute,
+    limit: int,
+) -> Dict[str, Any]:
+    """
+    Trim the look-ahead row from a keyset query result and compute next_cursor.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), last.id)
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,169 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, insert, literal, null, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.finance import Budget, BudgetRollup, Expenditure, PaymentStatus
+
+DIMENSIONS = ("fiscal_year", "ministry_id", "department_id", "county_id", "category")
+MEASURES = ("allocated_amount", "approved_amount", "spent_amount", "committed_amount")
+
+# Expenditure statuses counted as money paid out, and as money promised but not yet paid
+SPENT_STATUSES = (PaymentStatus.COMPLETED,)
+COMMITTED_STATUSES = (PaymentStatus.PENDING, PaymentStatus.PROCESSING)
+
+# Columns of a budget that its contribution to the rollups depends on
+BUDGET_COLUMNS = (
+    Budget.id, Budget.fiscal_year, Budget.ministry_id, Budget.department_id,
+    Budget.county_id, Budget.total_amount, Budget.approved_amount,
+)
+EXPENDITURE_COLUMNS = (
+    Expenditure.id, Expenditure.budget_id, Expenditure.category, Expenditure.amount, Expenditure.status,
+)
+
+
+def _budget_key(budget: Any, category: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "fiscal_year": budget.fiscal_year,
+        "ministry_id": budget.ministry_id,
+        "department_id": budget.department_id,
+        "county_id": budget.county_id,
+        "category": category,
+    }
+
+
+def _expenditure_measures(amount: float, status: PaymentStatus) -> Dict[str, float]:
+    return {
+        "spent_amount": amount if status in SPENT_STATUSES else 0,
+        "committed_amount": amount if status in COMMITTED_STATUSES else 0,
+    }
+
+
+async def locked_budget(db: AsyncSession, budget_id: Any, read: bool = False):
+    """
+    The rollup columns of a live budget, locked until the transaction ends so
+    concurrent writes to it apply their changes one after the other.
+
+    Expenditure writes take the lock with read=True: they may run together,
+    but not while the budget is being changed or deleted.
+    """
+    query = select(*BUDGET_COLUMNS).where(Budget.id == budget_id).with_for_update(read=read)
+    result = await db.execute(query)
+    return result.one_or_none()
+
+
+async def locked_expenditure(db: AsyncSession, expenditure_id: Any):
+    """
+    The rollup columns of a live expenditure, locked like locked_budget.
+    """
+    query = select(*EXPENDITURE_COLUMNS).where(Expenditure.id == expenditure_id).with_for_update()
+    result = await db.execute(query)
+    return result.one_or_none()
+
+
+async def add_to_rollup(db: AsyncSession, key: Dict[str, Any], deltas: Dict[str, float]) -> None:
+    """
+    Add deltas to the rollup row for key, creating it when missing.
+
+    A single INSERT ... ON CONFLICT DO UPDATE, so concurrent writers to the
+    same row never lose an update. The caller owns the transaction and commits.
+    """
+    deltas = {measure: amount for measure, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    query = pg_insert(BudgetRollup).values(**key, **deltas)
+    query = query.on_conflict_do_update(
+        index_elements=list(DIMENSIONS),
+        set_={
+            **{measure: getattr(BudgetRollup, measure) + query.excluded[measure] for measure in deltas},
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(query)
+
+
+async def record_budget(db: AsyncSession, budget: Any, sign: int = 1) -> None:
+    """
+    Add a budget's allocated and approved amounts to the rollups, or with
+    sign=-1 take them away.
+    """
+    await add_to_rollup(db, _budget_key(budget), {
+        "allocated_amount": sign * (budget.total_amount or 0),
+        "approved_amount": sign * (budget.approved_amount or 0),
+    })
+
+
+async def record_expenditure(db: AsyncSession, budget: Any, expenditure: Any, sign: int = 1) -> None:
+    """
+    Add an expenditure to the spent or committed totals of its budget's
+    rollup, by its status, or with sign=-1 take it away.
+    """
+    measures = _expenditure_measures(sign * expenditure.amount, expenditure.status)
+    await add_to_rollup(db, _budget_key(budget, expenditure.category), measures)
+
+
+async def record_budget_expenditures(db: AsyncSession, budget: Any, sign: int = 1) -> None:
+    """
+    Add or take away every live expenditure of a budget, as when the budget
+    itself is deleted.
+    """
+    query = (
+        select(Expenditure.category, Expenditure.status, func.sum(Expenditure.amount).label("amount"))
+        .where(Expenditure.budget_id == budget.id)
+        .group_by(Expenditure.category, Expenditure.status)
+    )
+    for expenditure in (await db.execute(query)).all():
+        await record_expenditure(db, budget, expenditure, sign)
+
+
+def _rollup_source():
+    """
+    Rollup rows computed from scratch: one group per key, budgets under a
+    null category and expenditures under their own.
+    """
+    key = (Budget.fiscal_year, Budget.ministry_id, Budget.department_id, Budget.county_id)
+    budgets = (
+        select(
+            *key,
+            null().label("category"),
+            func.sum(Budget.total_amount).label("allocated_amount"),
+            func.sum(Budget.approved_amount).label("approved_amount"),
+            literal(0.0).label("spent_amount"),
+            literal(0.0).label("committed_amount"),
+        )
+        .group_by(*key)
+    )
+    spent = func.sum(Expenditure.amount).filter(Expenditure.status.in_(SPENT_STATUSES))
+    committed = func.sum(Expenditure.amount).filter(Expenditure.status.in_(COMMITTED_STATUSES))
+    expenditures = (
+        select(
+            *key,
+            Expenditure.category,
+            literal(0.0).label("allocated_amount"),
+            literal(0.0).label("approved_amount"),
+            func.coalesce(spent, 0.0).label("spent_amount"),
+            func.coalesce(committed, 0.0).label("committed_amount"),
+        )
+        .select_from(Expenditure)
+        .join(Expenditure.budget)
+        .group_by(*key, Expenditure.category)
+    )
+    return union_all(budgets, expenditures)
+
+
+async def rebuild_budget_rollups(db: AsyncSession) -> int:
+    """
+    Recompute every rollup row from the budgets and expenditures tables.
+
+    Corrects any drift in the running totals, such as from writes made
+    outside the controllers. The table is locked against writers for the
+    rebuild; readers are not blocked. Returns the number of rows written.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"LOCK TABLE {BudgetRollup.__tablename__} IN EXCLUSIVE MODE"))
+    rows = [dict(row._mapping) for row in (await db.execute(_rollup_source())).all()]
+    await db.execute(delete(BudgetRollup))
+    if rows:
+        await db.execute(insert(BudgetRollup), rows)
+    return len(rows)
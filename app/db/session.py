@@ -1,16 +1,65 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
+from uuid import uuid4
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
 print(settings.SQLALCHEMY_DATABASE_URI)
 
+
+def engine_options(pooled: bool = True) -> Dict[str, Any]:
+    """
+    Build create_async_engine keyword arguments from settings.
+
+    In PgBouncer mode asyncpg's statement caches are disabled and prepared
+    statements get unique names, since consecutive transactions may land on
+    different server connections.
+    """
+    connect_args: Dict[str, Any] = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_PGBOUNCER_MODE:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+    if pooled:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    else:
+        options["poolclass"] = NullPool
+    return options
+
+
 engine = create_async_engine(
     settings.SQLALCHEMY_DATABASE_URI,
     echo=False,
     future=True,
+    **engine_options(),
 )
 
+replica_engines: List[AsyncEngine] = [
+    create_async_engine(uri, echo=False, future=True, **engine_options())
+    for uri in settings.DB_REPLICA_URIS
+]
+
 AsyncSessionLocal = sessionmaker(
     engine,
     class_=AsyncSession,
@@ -19,13 +68,212 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+
+def client_keys(request: Request) -> List[str]:
+    """
+    Identity a client is recognised by: its user once authenticated, otherwise
+    its IP. Authenticated clients are never keyed on their IP, which a proxy
+    or NAT may share with many others.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return [f"user:{principal.user.id}"]
+    if request.client:
+        return [f"ip:{request.client.host}"]
+    return []
+
+
+class RecentWrites:
+    """
+    Remembers which clients committed a write in the last `window` seconds, so
+    their reads can be served by the primary until replicas have caught up.
+    """
+
+    def __init__(self, window: int, max_keys: int = 100_000):
+        self.window = window
+        self.max_keys = max_keys
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = Lock()
+
+    def mark(self, keys: List[str]) -> None:
+        expires = time.monotonic() + self.window
+        with self._lock:
+            for key in keys:
+                self._expiry.pop(key, None)
+                self._expiry[key] = expires
+            # Entries are in expiry order, so stale ones are always at the front
+            while self._expiry and (
+                len(self._expiry) > self.max_keys
+                or next(iter(self._expiry.values())) < time.monotonic()
+            ):
+                self._expiry.popitem(last=False)
+
+    def is_recent(self, keys: List[str]) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            return any(self._expiry.get(key, 0) > now for key in keys)
+
+
+recent_writes = RecentWrites(settings.DB_READ_YOUR_WRITES_WINDOW)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_write_statement(orm_execute_state) -> None:
+    # INSERT/UPDATE ... RETURNING from app.db.writes bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_write(session: Session) -> None:
+    # Only commits that wrote something; a trailing commit after reads does not count
+    request = session.info.get("request")
+    if session.info.pop("wrote", False) and request is not None and recent_writes.window > 0:
+        recent_writes.mark(client_keys(request))
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs to a read replica and everything else to the primary.
+
+    Reads stay on the primary while flushing, when the session was pinned with
+    info["primary"], or when the requesting client wrote within the
+    read-your-writes window. A session reads from one replica throughout, so
+    its results all come from the same point in replication.
+    """
+
+    primary_bind = engine.sync_engine
+    replica_binds = itertools.cycle([e.sync_engine for e in replica_engines])
+    has_replicas = bool(replica_engines)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.has_replicas
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and not self.info.get("primary")
+        ):
+            request = self.info.get("request")
+            if request is None or not recent_writes.is_recent(client_keys(request)):
+                if "replica" not in self.info:
+                    self.info["replica"] = next(self.replica_binds)
+                return self.info["replica"]
+        return self.primary_bind
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_to_primary(session: Session, flush_context) -> None:
+    # Later reads in this session must see its own uncommitted writes
+    session.info["primary"] = True
+
+
+class ReadOnlySession(RoutingSession):
+    """
+    Routing session that refuses to flush, guarding read-only dependencies against writes.
+    """
+
+    # Reads run in autocommit mode on the same pools: asyncpg then skips BEGIN
+    # and COMMIT entirely, so a GET costs one round-trip per statement.
+    primary_bind = engine.execution_options(isolation_level="AUTOCOMMIT").sync_engine
+    replica_binds = itertools.cycle([
+        e.execution_options(isolation_level="AUTOCOMMIT").sync_engine for e in replica_engines
+    ])
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Attempted to write through a read-only database session")
+        super().flush(objects)
+
+
+ReadOnlySessionLocal = sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReadOnlySession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+_snapshot_replicas = itertools.cycle(replica_engines)
+
+
+@asynccontextmanager
+async def snapshot_session(request: Optional[Request] = None) -> AsyncIterator[AsyncSession]:
+    """
+    Session holding one read-only REPEATABLE READ transaction, for long reads
+    such as exports.
+
+    Server-side cursors need an open transaction, which the autocommit read
+    sessions never start, and the snapshot keeps a long read consistent. Open
+    it where the rows are consumed rather than as a route dependency: a
+    streamed response outlives the dependencies of its route.
+    """
+    read_engine = engine
+    if replica_engines and (request is None or not recent_writes.is_recent(client_keys(request))):
+        read_engine = next(_snapshot_replicas)
+    async with read_engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            await connection.execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True)
+        async with AsyncSession(bind=connection, expire_on_commit=False, autoflush=False) as session:
+            yield session
+
+
+def pool_status(async_engine: AsyncEngine = engine) -> Dict[str, Any]:
+    """
+    Snapshot of connection pool usage for health checks.
+    """
+    pool = async_engine.sync_engine.pool
+    if isinstance(pool, NullPool):
+        return {"pool": "disabled"}
+
+    # Tasks blocked waiting for a connection are queued on the pool's asyncio.Queue
+    queue = getattr(getattr(pool, "_pool", None), "_queue", None)
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "waiters": len(getattr(queue, "_getters", None) or ()),
+    }
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for routes that write, always on the primary. Whatever the handler
+    left uncommitted is committed once at the end; nothing is sent if the
+    controller already committed and no transaction is open.
+    """
+    async with AsyncSessionLocal(info={"request": request}) as session:
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only routes: autocommit connections, served by a replica
+    when one is configured, and no trailing commit.
+    """
+    async with ReadOnlySessionLocal(info={"request": request}) as session:
+        yield session
+
+
+async def get_primary_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only session pinned to the primary, for reads that must never be stale.
+    """
+    async with ReadOnlySessionLocal(info={"request": request, "primary": True}) as session:
+        yield session
+
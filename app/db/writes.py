@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from sqlalchemy import inspect, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.base import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+async def insert_returning(db: AsyncSession, instance: ModelT) -> ModelT:
+    """
+    Insert a new model instance with a single INSERT ... RETURNING.
+
+    Returns the persistent row with server-side defaults populated, so no
+    refresh is needed afterwards. The caller owns the transaction and commits.
+    """
+    model = type(instance)
+    column_keys = inspect(model).column_attrs.keys()
+    values = {
+        key: value
+        for key, value in inspect(instance).dict.items()
+        if key in column_keys
+    }
+    result = await db.execute(insert(model).values(**values).returning(model))
+    return result.scalar_one()
+
+
+async def update_returning(
+    db: AsyncSession,
+    model: Type[ModelT],
+    row_id: Any,
+    values: Dict[str, Any],
+    *criteria,
+) -> Optional[ModelT]:
+    """
+    Update a live (not soft-deleted) row with a single UPDATE ... RETURNING.
+
+    Every key must be a column of the table; callers map schema fields to
+    columns first. Returns the updated row, or None when no row matched.
+    The caller owns the transaction and commits.
+    """
+    unknown = sorted(set(values) - set(model.__table__.c.keys()))
+    if unknown:
+        raise ValueError(f"Not columns of {model.__tablename__}: {', '.join(unknown)}")
+    query = (
+        update(model)
+        .where(model.id == row_id, model.is_deleted == False, *criteria)
+        .values(**values)
+        .returning(model)
+    )
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def soft_delete(db: AsyncSession, model: Type[ModelT], row_id: Any) -> Optional[ModelT]:
+    """
+    Mark a row deleted with a single UPDATE ... RETURNING.
+    """
+    return await update_returning(
+        db, model, row_id, {"is_deleted": True, "deleted_at": datetime.now()}
+    )
@@ -8,13 +8,13 @@ import sys
 import logging
 import asyncio
 
-from app.models.base import Base
+from app.models.base import Base, uuid7
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db.session import AsyncSessionLocal, engine
 from app.models.employee import Role, UserAccount, Employee, Position, MaritalStatus, Gender, EmploymentStatus
-from app.auth.security import get_password_hash
+from app.auth.security import get_password_hash_async
 from app.auth.permissions import ADMIN_PERMISSIONS, MANAGER_PERMISSIONS, OFFICER_PERMISSIONS, PUBLIC_PERMISSIONS
 from app.core.config import settings
 
@@ -60,7 +60,7 @@ async def create_roles(db: AsyncSession) -> None:
     
     # Create admin role
     admin_role = Role(
-        id=uuid.uuid4(),
+        id=uuid7(),
         name="Administrator",
         description="System administrator with full access to all functionality",
         permissions=json.dumps(ADMIN_PERMISSIONS),
@@ -71,7 +71,7 @@ async def create_roles(db: AsyncSession) -> None:
     
     # Create manager role
     manager_role = Role(
-        id=uuid.uuid4(),
+        id=uuid7(),
         name="Manager",
         description="Department or unit manager with access to manage their areas",
         permissions=json.dumps(MANAGER_PERMISSIONS),
@@ -82,7 +82,7 @@ async def create_roles(db: AsyncSession) -> None:
     
     # Create officer role
     officer_role = Role(
-        id=uuid.uuid4(),
+        id=uuid7(),
         name="Officer",
         description="Regular government officer with standard access",
         permissions=json.dumps(OFFICER_PERMISSIONS),
@@ -93,7 +93,7 @@ async def create_roles(db: AsyncSession) -> None:
     
     # Create public role
     public_role = Role(
-        id=uuid.uuid4(),
+        id=uuid7(),
         name="Public",
         description="Public user with limited access",
         permissions=json.dumps(PUBLIC_PERMISSIONS),
@@ -119,7 +119,7 @@ async def get_or_create_admin_position(db: AsyncSession) -> Position:
     
     # Create position
     admin_position = Position(
-        id=uuid.uuid4(),
+        id=uuid7(),
         title="System Administrator",
         code="ADMIN",
         description="System administrator with technical responsibilities",
@@ -154,7 +154,7 @@ async def get_or_create_admin_employee(db: AsyncSession, position_id: uuid.UUID)
     
     # Create employee
     admin_employee = Employee(
-        id=uuid.uuid4(),
+        id=uuid7(),
         first_name="System",
         last_name="Administrator",
         gender=Gender.OTHER,
@@ -208,9 +208,9 @@ async def get_or_create_admin_user(db: AsyncSession, employee_id: uuid.UUID) ->
         raise Exception("Admin role not found")
     
     # Create user
-    hashed_password = get_password_hash("admin123") # Default password, should be changed
+    hashed_password = await get_password_hash_async("admin123") # Default password, should be changed
     admin_user = UserAccount(
-        id=uuid.uuid4(),
+        id=uuid7(),
         username="admin",
         email="admin@example.com",
         password_hash=hashed_password,
@@ -1,10 +1,13 @@
 from contextlib import asynccontextmanager
+from datetime import timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
+from sqlalchemy import func, select, text
 from app.api.v1.router import api_router
+from app.auth.security import shutdown_hash_executor, warm_hash_executor
+from app.core.rate_limiter import rate_limit_store
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,13 +15,21 @@ from app.core.logging import logger
 from app.middlewares import (
     RateLimitMiddleware,
     RequestLoggingMiddleware,
+    RequestSizeLimitMiddleware,
     SecurityHeadersMiddleware,
     RolePermissionMiddleware,
 )
-from app.db.session import get_db, engine
+from app.analytics.anomalies import open_fiscal_years, scan_fiscal_year
+from app.analytics.payroll import scan_payroll
+from app.analytics.split_purchases import rescan_split_purchases, scan_split_purchases_since
+from app.db.hierarchy import repair_hierarchies, reporting_cache
+from app.db.rollups import rebuild_budget_rollups
+from app.db.session import AsyncSessionLocal, get_db, engine, pool_status, replica_engines
+from app.storage.evidence import evidence_storage
 from sqlalchemy.orm import Session
 
 from app.models.base import Base
+from app.models.employee import EmployeeClosure
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -39,6 +50,7 @@ app.add_middleware(
 )
 
 # Add custom middleware
+app.add_middleware(RequestSizeLimitMiddleware)
 if settings.ENVIRONMENT == "production":
     app.add_middleware(RequestLoggingMiddleware)
     app.add_middleware(RateLimitMiddleware)
@@ -69,13 +81,77 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     try:
         # Check database connection
         await db.execute(text("SELECT 1"))
-        return {"status": "healthy", "database": "connected"}
+        return {
+            "status": "healthy",
+            "database": "connected",
+            "pool": pool_status(),
+            "replica_pools": [pool_status(replica) for replica in replica_engines],
+        }
     except Exception as e:
-        return {"status": "unhealthy", "database": str(e)}
+        return {"status": "unhealthy", "database": str(e), "pool": pool_status()}
 
 
-def run_daily():
-    pass
+async def rebuild_rollups():
+    async with AsyncSessionLocal() as db:
+        rows = await rebuild_budget_rollups(db)
+        await db.commit()
+    logger.info(f"Rebuilt {rows} budget rollups")
+
+
+async def repair_hierarchy_paths():
+    async with AsyncSessionLocal() as db:
+        repaired = await repair_hierarchies(db)
+        await db.commit()
+    if repaired[EmployeeClosure.__tablename__]:
+        reporting_cache.bump()
+    logger.info(f"Repaired hierarchy paths: {repaired}")
+
+
+async def scan_anomalies():
+    async with AsyncSessionLocal() as db:
+        for fiscal_year in await open_fiscal_years(db):
+            counts = await scan_fiscal_year(db, fiscal_year)
+            await db.commit()
+            logger.info(f"Flagged expenditures for {fiscal_year}: {counts}")
+
+
+async def scan_split_purchases():
+    async with AsyncSessionLocal() as db:
+        found = await rescan_split_purchases(db)
+        await db.commit()
+    logger.info(f"Found {found} split purchases")
+
+
+async def scan_payroll_clusters():
+    async with AsyncSessionLocal() as db:
+        counts = await scan_payroll(db)
+        await db.commit()
+    logger.info(f"Flagged payroll clusters: {counts}")
+
+
+DAILY_STAGES = (rebuild_rollups, repair_hierarchy_paths, scan_anomalies, scan_split_purchases, scan_payroll_clusters)
+
+
+async def run_daily():
+    # Stages are independent, so one failing must not cost the rest their run
+    for stage in DAILY_STAGES:
+        try:
+            await stage()
+        except Exception as e:
+            logger.error(f"Daily stage {stage.__name__} failed: {str(e)}")
+
+
+async def run_split_purchase_scan():
+    async with AsyncSessionLocal() as db:
+        # Twice the interval back, so a late or slow run leaves no gap. Taken
+        # from the database's clock, which stamps updated_at, since this
+        # host's may differ in time or time zone
+        since = await db.scalar(
+            select(func.localtimestamp() - timedelta(seconds=2 * settings.SPLIT_PURCHASE_SCAN_INTERVAL))
+        )
+        found = await scan_split_purchases_since(db, since)
+        await db.commit()
+    logger.info(f"Found {found} split purchases among recent expenditures")
 
 
 @asynccontextmanager
@@ -84,20 +160,40 @@ async def lifespan():
     scheduler.add_job(
         func=run_daily, trigger="interval", seconds=60 * 60 * 24
     )  # run daily
+    scheduler.add_job(
+        func=run_split_purchase_scan, trigger="interval", seconds=settings.SPLIT_PURCHASE_SCAN_INTERVAL
+    )
     scheduler.start()
     yield
+    scheduler.shutdown(wait=False)
 
 
 main_app_lifespan = app.router.lifespan_context
 
+MIN_POSTGRES_VERSION = (15,)
+
 
 @asynccontextmanager
 async def lifespan_wrapper(app: FastAPI):
     logger.info("Application started")
+    # Password hashing workers start now, not on the first logins
+    await warm_hash_executor()
     async with engine.begin() as conn:
+        # The trigram name indexes use pg_trgm's operator class, so the
+        # extension has to exist before create_all builds them
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # The budget rollup key index is NULLS NOT DISTINCT, new in PostgreSQL 15
+        if conn.dialect.server_version_info < MIN_POSTGRES_VERSION:
+            raise RuntimeError(
+                f"PostgreSQL {'.'.join(map(str, MIN_POSTGRES_VERSION))} or later is required, "
+                f"found {'.'.join(map(str, conn.dialect.server_version_info))}"
+            )
         await conn.run_sync(Base.metadata.create_all)
-    async with main_app_lifespan(app) as maybe_state:
+    async with lifespan(), main_app_lifespan(app) as maybe_state:
         yield maybe_state
+    shutdown_hash_executor()
+    await rate_limit_store.close()
+    await evidence_storage.close()
     logger.info("Application shutting down")
 
 
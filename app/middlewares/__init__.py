@@ -1,4 +1,5 @@
 from app.middlewares.authorizations import *
 from app.middlewares.rate_limit import *
 from app.middlewares.request_logging import *
+from app.middlewares.request_size import *
 from app.middlewares.security_headers import *
\ No newline at end of file
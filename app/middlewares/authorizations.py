@@ -1,26 +1,28 @@
-from fastapi import Request, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from fastapi.security import HTTPBearer
+from starlette.types import ASGIApp, Receive, Scope, Send
 from jose import jwt, JWTError
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import json
-import inspect
-
+from app.auth.principal import load_principal, principal_cache
 from app.db.session import AsyncSessionLocal
-from app.models.employee import UserAccount, Role
 from app.core.config import settings
 
 security = HTTPBearer()
 
-class RolePermissionMiddleware(BaseHTTPMiddleware):
+class RolePermissionMiddleware:
     """
     Middleware for route-based role and permission authorization.
     """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Skip auth for certain paths
-        if request.url.path in [
+        if scope["path"] not in [
             f"{settings.API_V1_STR}/auth/login",
             "/",
             "/docs",
@@ -29,60 +31,50 @@ class RolePermissionMiddleware(BaseHTTPMiddleware):
             "/health",
             "/api/v1/docs"
         ]:
-            return await call_next(request)
+            try:
+                await self.attach_principal(Request(scope))
+            except Exception:
+                # For any errors, let the endpoint handle auth
+                pass
         
+        await self.app(scope, receive, send)
+    
+    async def attach_principal(self, request: Request) -> None:
+        # Extract token from header
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            return  # Let the endpoint handle auth
+        
+        scheme, credentials = auth_header.split()
+        if scheme.lower() != "bearer":
+            return
+        
+        token = credentials
         try:
-            # Extract token from header
-            auth_header = request.headers.get("Authorization")
-            if not auth_header:
-                return await call_next(request)  # Let the endpoint handle auth
-            
-            scheme, credentials = auth_header.split()
-            if scheme.lower() != "bearer":
-                return await call_next(request)
-            
-            token = credentials
-            try:
-                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-                user_id = int(payload["sub"])
-            except JWTError:
-                return await call_next(request)  # Let the endpoint handle invalid token
-            
-            # Get user and permissions
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+            user_id = int(payload["sub"])
+        except JWTError:
+            return  # Let the endpoint handle invalid token
+        
+        # Resolve user and permissions, hitting the database only on a cache miss
+        principal = principal_cache.get(user_id)
+        if principal is None:
             async with AsyncSessionLocal() as db:
-                # Get user
-                query = select(UserAccount).where(UserAccount.id == user_id)
-                result = await db.execute(query)
-                user = result.scalar_one_or_none()
-                
-                if not user:
-                    return await call_next(request)
-                
-                # Check if user is active and not locked
-                if not user.is_active or user.is_locked:
-                    return await call_next(request)
-                
-                # Get role and parse permissions
-                query = select(Role).where(Role.id == user.role_id)
-                result = await db.execute(query)
-                role = result.scalar_one_or_none()
-                
-                if not role:
-                    return await call_next(request)
-                
-                try:
-                    permissions = json.loads(role.permissions)
-                except:
-                    permissions = []
-            
-            # Attach user and permissions to request state
-            request.state.user = user
-            request.state.permissions = permissions
-            
-            # Continue with the request
-            return await call_next(request)
-            
-        except Exception as e:
-            # For any errors, let the endpoint handle auth
-            return await call_next(request)
-
+                principal = await load_principal(db, user_id)
+        
+        if not principal:
+            return
+        
+        # Shared with get_current_principal so the endpoint does not repeat the lookup
+        request.state.principal = principal
+        
+        # Check if user is active and not locked
+        if not principal.user.is_active or principal.user.is_locked:
+            return
+        
+        if not principal.has_role:
+            return
+        
+        # Attach user and permissions to request state
+        request.state.user = principal.user
+        request.state.permission_mask = principal.permission_mask
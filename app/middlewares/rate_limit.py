@@ -1,55 +1,168 @@
 import time
-from typing import Callable, Dict
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Optional, Tuple
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.config import settings
 from app.core.exceptions import RateLimitExceededError
+from app.core.logging import logger
+from app.core.rate_limiter import RateLimitPolicy, RateLimitResult, rate_limit_store
+from app.db.session import AsyncSessionLocal
+from app.models.security import ApiKey
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.rate_limits: Dict[str, Dict] = {}
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        if not settings.RATE_LIMIT_ENABLED:
-            return await call_next(request)
-
-        client_ip = request.client.host if request.client else "unknown"
-
-        current_time = time.time()
-        if client_ip in self.rate_limits:
-            rate_limit_info = self.rate_limits[client_ip]
-
-            if (
-                current_time - rate_limit_info["start_time"]
-                > settings.RATE_LIMIT_DEFAULT_PERIOD
-            ):
-                rate_limit_info["count"] = 1
-                rate_limit_info["start_time"] = current_time
-            else:
-                rate_limit_info["count"] += 1
-
-                if rate_limit_info["count"] > settings.RATE_LIMIT_DEFAULT_LIMIT:
-                    raise RateLimitExceededError()
-        else:
-            self.rate_limits[client_ip] = {"count": 1, "start_time": current_time}
-        response = await call_next(request)
-
-        response.headers["X-RateLimit-Limit"] = str(settings.RATE_LIMIT_DEFAULT_LIMIT)
-        response.headers["X-RateLimit-Remaining"] = str(
-            max(
-                0,
-                settings.RATE_LIMIT_DEFAULT_LIMIT
-                - self.rate_limits[client_ip]["count"],
-            )
+API_KEY_HEADER = "X-API-Key"
+
+
+class ApiKeyLimitCache:
+    """
+    Caches the per-minute limit of each API key so lookups don't hit the database
+    on every request. Unknown or inactive keys are cached as None.
+
+    Entries are kept in LRU order, so a flood of made-up keys evicts the least
+    recently used entries rather than every valid key at once.
+    """
+
+    def __init__(self, ttl: int, max_keys: int = 10_000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries: OrderedDict[str, Tuple[float, Optional[Tuple[str, int]]]] = OrderedDict()
+        self._lock = Lock()
+
+    def cached(self, key_value: str) -> Tuple[bool, Optional[Tuple[str, int]]]:
+        """
+        Whether the key has a fresh entry, and the entry, without querying.
+        """
+        with self._lock:
+            entry = self._entries.get(key_value)
+            if entry is None or entry[0] <= time.monotonic():
+                return False, None
+            self._entries.move_to_end(key_value)
+            return True, entry[1]
+
+    async def get(self, key_value: str) -> Optional[Tuple[str, int]]:
+        found, limit = self.cached(key_value)
+        if found:
+            return limit
+
+        limit = None
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(ApiKey.id, ApiKey.rate_limit, ApiKey.expiry_date).where(
+                        ApiKey.key_value == key_value,
+                        ApiKey.is_active == True,
+                    )
+                )
+                row = result.first()
+            if row and (row.expiry_date is None or row.expiry_date > datetime.utcnow()):
+                limit = (str(row.id), row.rate_limit)
+        except Exception as e:
+            logger.error(f"Error loading API key rate limit: {str(e)}")
+            return None
+
+        with self._lock:
+            self._entries[key_value] = (time.monotonic() + self.ttl, limit)
+            self._entries.move_to_end(key_value)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        return limit
+
+
+api_key_limits = ApiKeyLimitCache(settings.RATE_LIMIT_API_KEY_CACHE_TTL)
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, store=None):
+        self.app = app
+        self.store = store or rate_limit_store
+        # Longest prefix first so the most specific route policy wins
+        self.route_policies = sorted(
+            (
+                (prefix, RateLimitPolicy.parse(policy))
+                for prefix, policy in settings.RATE_LIMIT_ROUTE_POLICIES.items()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True,
         )
-        response.headers["X-RateLimit-Reset"] = str(
-            int(
-                self.rate_limits[client_ip]["start_time"]
-                + settings.RATE_LIMIT_DEFAULT_PERIOD
-            )
+        self.default_policy = RateLimitPolicy(
+            settings.RATE_LIMIT_DEFAULT_LIMIT, settings.RATE_LIMIT_DEFAULT_PERIOD
         )
+        self.authenticated_policy = RateLimitPolicy(
+            settings.RATE_LIMIT_AUTHENTICATED_LIMIT, settings.RATE_LIMIT_DEFAULT_PERIOD
+        )
+
+    async def resolve(self, scope: Scope) -> Tuple[str, RateLimitPolicy]:
+        """
+        Pick the bucket key and policy for a request.
+
+        Route policies apply first and are counted per client. Otherwise API keys
+        get their own configured limit, authenticated users a per-user limit, and
+        anonymous clients the default per-IP limit.
+
+        A key that is not cached costs a database query, so it is looked up only
+        while the client's IP has lookups left under the default policy; past
+        that the key is ignored and the request is limited as anonymous.
+        """
+        client = scope.get("client")
+        identity = f"ip:{client[0] if client else 'unknown'}"
+        policy = self.default_policy
+
+        api_key = Headers(scope=scope).get(API_KEY_HEADER)
+        key_limit = None
+        if api_key:
+            found, key_limit = api_key_limits.cached(api_key)
+            if not found and (await self.store.hit(f"key-lookup:{identity}", self.default_policy)).allowed:
+                key_limit = await api_key_limits.get(api_key)
+        principal = scope.get("state", {}).get("principal")
+        if key_limit:
+            identity = f"key:{key_limit[0]}"
+            policy = RateLimitPolicy(key_limit[1], 60)
+        elif principal is not None:
+            identity = f"user:{principal.user.id}"
+            policy = self.authenticated_policy
+
+        path = scope["path"]
+        for prefix, route_policy in self.route_policies:
+            if path.startswith(prefix):
+                return f"route:{prefix}:{identity}", route_policy
+
+        return identity, policy
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        key, policy = await self.resolve(scope)
+        result = await self.store.hit(key, policy)
+
+        if not result.allowed:
+            # Exceptions raised here never reach the app's exception
+            # handlers, so answer with the same error envelope directly.
+            exc = RateLimitExceededError()
+            response = JSONResponse(
+                status_code=exc.status_code,
+                content={"error": {"code": exc.error_code, "message": exc.detail}},
+            )
+            self.apply_headers(response.headers, result)
+            response.headers["Retry-After"] = str(max(1, int(result.retry_after + 0.999)))
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self.apply_headers(MutableHeaders(scope=message), result)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
-        return response
\ No newline at end of file
+    @staticmethod
+    def apply_headers(headers: MutableHeaders, result: RateLimitResult) -> None:
+        headers["X-RateLimit-Limit"] = str(result.limit)
+        headers["X-RateLimit-Remaining"] = str(result.remaining)
+        headers["X-RateLimit-Reset"] = str(int(result.reset_at))
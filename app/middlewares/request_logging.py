@@ -1,31 +1,47 @@
 import time
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.logging import logger
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        client = scope.get("client")
+        client_host = client[0] if client else "unknown"
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+            await send(message)
+
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            logger.info(
-                f"Request: {request.method} {request.url.path} "
-                f"Status: {response.status_code} "
-                f"Duration: {process_time:.3f}s "
-                f"Client: {request.client.host if request.client else 'unknown'}"
-            )
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
+            await self.app(scope, receive, send_with_timing)
         except Exception as e:
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             logger.error(
-                f"Request: {request.method} {request.url.path} "
+                f"Request: {scope['method']} {scope['path']} "
                 f"Error: {str(e)} "
                 f"Duration: {process_time:.3f}s "
-                f"Client: {request.client.host if request.client else 'unknown'}"
+                f"Client: {client_host}"
             )
             raise
 
+        process_time = time.perf_counter() - start_time
+        logger.info(
+            f"Request: {scope['method']} {scope['path']} "
+            f"Status: {status_code} "
+            f"Duration: {process_time:.3f}s "
+            f"Client: {client_host}"
+        )
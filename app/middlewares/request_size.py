@@ -0,0 +1,53 @@
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.exceptions import PayloadTooLargeError
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Refuses request bodies larger than max_size before they are spooled.
+
+    A declared Content-Length over the limit is answered at once, without
+    reading the body. Bodies sent without one are counted as they arrive and
+    abandoned as soon as they pass the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = None):
+        self.app = app
+        self.max_size = max_size or settings.MAX_REQUEST_SIZE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_size:
+            # Exceptions raised here never reach the app's exception
+            # handlers, so answer with the same error envelope directly.
+            exc = PayloadTooLargeError()
+            response = JSONResponse(
+                status_code=exc.status_code,
+                content={"error": {"code": exc.error_code, "message": exc.detail}},
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # FastAPI re-raises HTTPExceptions from body parsing
+                    # instead of reporting a malformed body
+                    raise HTTPException(status_code=413, detail=PayloadTooLargeError().detail)
+            return message
+
+        await self.app(scope, receive_limited, send)
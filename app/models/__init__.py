@@ -8,7 +8,7 @@ from app.models.employee import (
     Gender, EmploymentStatus, MaritalStatus, EducationLevel,
     QualificationType, TrainingStatus, LeaveType, LeaveStatus,
     DisciplinaryType, DisciplinaryStatus, BenefitType, AllowanceType,
-    Position, Role, Employee, UserAccount, EmploymentHistory,
+    Position, Role, Employee, EmployeeClosure, UserAccount, EmploymentHistory,
     Qualification, Education, Training, Attendance, Leave,
     DisciplinaryAction, Benefit, Allowance, EmployeeEmergencyContact
 )
@@ -16,7 +16,7 @@ from app.models.employee import (
 # Import models with fewer dependencies
 from app.models.government import (
     Ministry, Department, Division, Agency, 
-    County, SubCounty, Ward, Project, Policy as GovernmentPolicy
+    County, SubCounty, Ward, OrgUnitClosure, Project, Policy as GovernmentPolicy
 )
 
 from app.models.performance import (
@@ -33,7 +33,8 @@ from app.models.compliance import (
 
 from app.models.finance import (
     PaymentStatus, PaymentMethod, TransactionType,
-    Budget, BudgetItem, Expenditure, Salary, Payment, FinancialReport
+    Budget, BudgetItem, Expenditure, BudgetRollup, ExpenditureFlag,
+    SplitPurchase, SplitPurchasePayment, Salary, PayrollCluster, PayrollClusterMember, Payment, FinancialReport
 )
 
 from app.models.security import (
@@ -63,12 +64,12 @@ __all__ = [
     'Gender', 'EmploymentStatus', 'MaritalStatus', 'EducationLevel',
     'QualificationType', 'TrainingStatus', 'LeaveType', 'LeaveStatus',
     'DisciplinaryType', 'DisciplinaryStatus', 'BenefitType', 'AllowanceType',
-    'Position', 'Role', 'Employee', 'UserAccount', 'EmploymentHistory',
+    'Position', 'Role', 'Employee', 'EmployeeClosure', 'UserAccount', 'EmploymentHistory',
     'Qualification', 'Education', 'Training', 'Attendance', 'Leave',
     'DisciplinaryAction', 'Benefit', 'Allowance', 'EmployeeEmergencyContact',
     # Government
     'Ministry', 'Department', 'Division', 'Agency', 
-    'County', 'SubCounty', 'Ward', 'Project', 'GovernmentPolicy',
+    'County', 'SubCounty', 'Ward', 'OrgUnitClosure', 'Project', 'GovernmentPolicy',
     # Performance
     'PerformanceRating', 'GoalStatus', 'ReviewStatus',
     'PerformanceReview', 'PerformanceMetric', 'PerformanceGoal',
@@ -79,7 +80,9 @@ __all__ = [
     'Investigation', 'RiskAssessment', 'RiskRegister', 'Policy', 'Regulation',
     # Finance
     'PaymentStatus', 'PaymentMethod', 'TransactionType',
-    'Budget', 'BudgetItem', 'Expenditure', 'Salary', 'Payment', 'FinancialReport',
+    'Budget', 'BudgetItem', 'Expenditure', 'BudgetRollup', 'ExpenditureFlag',
+    'SplitPurchase', 'SplitPurchasePayment', 'Salary', 'PayrollCluster', 'PayrollClusterMember',
+    'Payment', 'FinancialReport',
     # Security
     'LoginStatus', 'ActivityType', 'SeverityLevel',
     'LoginAttempt', 'UserActivity', 'SecurityIncident', 'SecurityAudit',
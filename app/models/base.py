@@ -1,14 +1,104 @@
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from threading import Lock
+from typing import Optional, List, Dict, Any, Tuple
+import secrets
+import time
 import uuid
-from sqlalchemy import UUID, String, DateTime, func, ForeignKey, Text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import UUID, Computed, String, DateTime, event, func, ForeignKey, Index, Text, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import DeclarativeBase, Mapped, ORMExecuteState, Session, mapped_column, relationship, with_loader_criteria
+
+from app.db.name_search import search_name
+
+_uuid7_lock = Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (RFC 9562 version 7).
+
+    The first 48 bits are the Unix time in milliseconds, so new rows append to
+    the right-hand edge of the primary key index instead of landing at random
+    pages. A 12-bit counter keeps ids generated in the same millisecond
+    monotonic within the process.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            # Start low in the counter range to leave room for a burst
+            _uuid7_counter = secrets.randbits(10)
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        timestamp, counter = _uuid7_last_ms, _uuid7_counter
+
+    value = (
+        (timestamp & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return uuid.UUID(int=value)
+
+
+def live_index(name: str, *columns: Any, **kwargs) -> Index:
+    """
+    Partial index over rows that are not soft-deleted.
+
+    Every list query filters on is_deleted = false, so deleted rows are left
+    out of the index entirely.
+    """
+    return Index(name, *columns, postgresql_where=text("is_deleted = false"), **kwargs)
+
+
+# Text search configurations every search document is indexed with. Postgres
+# ships no Swahili configuration, so "simple" (no stemming or stop words)
+# keeps Swahili words and names searchable as written.
+SEARCH_CONFIGS = ("english", "simple")
+
+
+def search_vector_column(*weighted_columns: Tuple[str, str]) -> Mapped[Any]:
+    """
+    Stored generated tsvector over (column, weight) pairs for full-text search.
+
+    Deferred, so ordinary loads of the model do not read it.
+    """
+    document = " || ".join(
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for config in SEARCH_CONFIGS
+        for column, weight in weighted_columns
+    )
+    return mapped_column(TSVECTOR, Computed(document, persisted=True), nullable=True, deferred=True)
+
+
+def live_name_index(name: str, model: Any) -> Index:
+    """
+    Partial pg_trgm GIN index over a person's full name.
+
+    Backs the LIKE and %> searches in app.db.name_search. Declare it after the
+    model class, since it needs the table's columns.
+    """
+    return live_index(
+        name,
+        search_name(model.__table__.c).label("search_name"),
+        postgresql_using="gin",
+        postgresql_ops={"search_name": "gin_trgm_ops"},
+    )
+
 
 class Base(DeclarativeBase):
     """Base model for all models in the application."""
     
     # Common columns for all tables
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, 
@@ -26,3 +116,31 @@ class Base(DeclarativeBase):
     deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     deleted_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
 
+
+INCLUDE_DELETED = "include_deleted"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_soft_deleted(execute_state: ORMExecuteState) -> None:
+    """
+    Hide soft-deleted rows from every ORM select, including joins and
+    relationship loads that originate from it.
+
+    Audit and admin views opt out per statement with
+    execution_options(include_deleted=True), or per session by setting
+    session.info["include_deleted"] = True.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get(INCLUDE_DELETED, False)
+        and not execute_state.session.info.get(INCLUDE_DELETED, False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                Base,
+                lambda cls: cls.is_deleted == False,
+                include_aliases=True,
+            )
+        )
@@ -4,7 +4,7 @@ from typing import Optional, List, TYPE_CHECKING
 import uuid
 from sqlalchemy import String, ForeignKey, Text, Date, DateTime, Time, Enum as SQLEnum, Integer, Float, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.models.base import Base
+from app.models.base import Base, live_index, search_vector_column
 
 if TYPE_CHECKING:
     from app.models.police import PoliceOfficer, PoliceStation
@@ -47,6 +47,13 @@ class CaseStatus(str, Enum):
 class CrimeReport(Base):
     """Represents a crime report filed by a citizen."""
     __tablename__ = "crime_reports"
+    __table_args__ = (
+        live_index("ix_crime_reports_live_report_date", "report_date", "id"),
+        live_index("ix_crime_reports_live_status_report_date", "case_status", "report_date", "id"),
+        live_index("ix_crime_reports_live_type_report_date", "crime_type", "report_date", "id"),
+        live_index("ix_crime_reports_live_station_report_date", "station_id", "report_date", "id"),
+        live_index("ix_crime_reports_live_search", "search_vector", postgresql_using="gin"),
+    )
     
     report_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     crime_type: Mapped[CrimeType] = mapped_column(SQLEnum(CrimeType), nullable=False)
@@ -80,6 +87,9 @@ class CrimeReport(Base):
     evidence_description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     property_involved: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     estimated_loss: Mapped[Optional[float]] = mapped_column(nullable=True)
+    search_vector: Mapped[Optional[str]] = search_vector_column(
+        ("description", "B"), ("suspect_description", "C")
+    )
     
     # Case management
     case_opened: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
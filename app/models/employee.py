@@ -2,9 +2,9 @@ from datetime import date, datetime, time
 from enum import Enum
 from typing import Optional, List, TYPE_CHECKING
 import uuid
-from sqlalchemy import String, ForeignKey, Text, Date, Boolean, Enum as SQLEnum, Time, Integer, Float, DateTime
+from sqlalchemy import String, ForeignKey, Text, Date, Boolean, Enum as SQLEnum, Index, Time, Integer, Float, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.models.base import Base
+from app.models.base import Base, live_index, live_name_index
 
 if TYPE_CHECKING:
     from app.models.performance import PerformanceReview
@@ -154,6 +154,13 @@ class Role(Base):
 class Employee(Base):
     """Represents an employee in the government system."""
     __tablename__ = "employees"
+    __table_args__ = (
+        live_index("ix_employees_live_created", "created_at", "id"),
+        live_index("ix_employees_live_ministry_created", "ministry_id", "created_at", "id"),
+        live_index("ix_employees_live_department_created", "department_id", "created_at", "id"),
+        live_index("ix_employees_live_status_created", "status", "created_at", "id"),
+        live_index("ix_employees_live_supervisor", "supervisor_id"),
+    )
     
     # Personal information
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -235,6 +242,31 @@ class Employee(Base):
     def __repr__(self) -> str:
         return f"<Employee(name='{self.first_name} {self.last_name}', employee_number='{self.employee_number}')>"
 
+live_name_index("ix_employees_live_name_trgm", Employee)
+
+class EmployeeClosure(Base):
+    """
+    One supervisor and subordinate pair of the reporting structure, direct or
+    indirect.
+
+    Every employee is paired with themselves at depth 0 and with each
+    supervisor above them, so all subordinates of an employee are one indexed
+    lookup on ancestor_id. Maintained by app.db.hierarchy on writes and
+    repaired daily.
+    """
+    __tablename__ = "employee_closure"
+    __table_args__ = (
+        Index("ux_employee_closure_ancestor_descendant", "ancestor_id", "descendant_id", unique=True),
+        Index("ix_employee_closure_descendant_depth", "descendant_id", "depth"),
+    )
+
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("employees.id"), nullable=False)
+    descendant_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("employees.id"), nullable=False)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<EmployeeClosure(ancestor_id={self.ancestor_id}, descendant_id={self.descendant_id}, depth={self.depth})>"
+
 class UserAccount(Base):
     """Represents a user account for system access."""
     __tablename__ = "users"
@@ -381,6 +413,10 @@ class Training(Base):
 class Attendance(Base):
     """Represents an employee's daily attendance record."""
     __tablename__ = "attendances"
+    __table_args__ = (
+        # Backs the payroll check for salaried employees with no recent attendance
+        live_index("ix_attendances_live_employee_date", "employee_id", "current_date"),
+    )
     
     current_date: Mapped[date] = mapped_column(Date, nullable=False)
     time_in: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
@@ -1,10 +1,10 @@
 from datetime import date, datetime
 from enum import Enum
-from typing import Optional, List, TYPE_CHECKING
+from typing import Any, Optional, List, TYPE_CHECKING
 import uuid
-from sqlalchemy import String, ForeignKey, Text, Date, DateTime, Enum as SQLEnum, Integer, Float, Boolean
+from sqlalchemy import ColumnElement, String, ForeignKey, Text, Date, DateTime, Enum as SQLEnum, Index, Integer, Float, Boolean, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.models.base import Base
+from app.models.base import Base, live_index
 
 if TYPE_CHECKING:
     from app.models.employee import Employee
@@ -42,6 +42,17 @@ class TransactionType(str, Enum):
 class Budget(Base):
     """Represents a budget for a department or project."""
     __tablename__ = "budgets"
+    __table_args__ = (
+        live_index("ix_budgets_live_created", "created_at", "id"),
+        live_index("ix_budgets_live_ministry_created", "ministry_id", "created_at", "id"),
+        live_index("ix_budgets_live_department_created", "department_id", "created_at", "id"),
+        # Covers fiscal year totals without touching the heap
+        live_index(
+            "ix_budgets_live_fiscal_year_ministry",
+            "fiscal_year", "ministry_id",
+            postgresql_include=["status", "total_amount", "approved_amount"],
+        ),
+    )
     
     fiscal_year: Mapped[str] = mapped_column(String(10), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -100,6 +111,16 @@ class BudgetItem(Base):
 class Expenditure(Base):
     """Represents an expenditure against a budget."""
     __tablename__ = "expenditures"
+    __table_args__ = (
+        # Covers spending per budget without touching the heap
+        live_index(
+            "ix_expenditures_live_budget_date",
+            "budget_id", "expenditure_date",
+            postgresql_include=["amount", "status"],
+        ),
+        # Finds recently written expenditures, deleted ones included, for incremental scans
+        Index("ix_expenditures_updated_at", "updated_at"),
+    )
     
     expenditure_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     expenditure_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -132,6 +153,136 @@ class Expenditure(Base):
     def __repr__(self) -> str:
         return f"<Expenditure(expenditure_number='{self.expenditure_number}', amount={self.amount}, status='{self.status}')>"
 
+def vendor_key(columns: Any) -> ColumnElement:
+    """
+    Vendor name as payments to the same vendor are grouped: trimmed and
+    lower-cased. Pass the model class in queries and Model.__table__.c in
+    index definitions.
+    """
+    return func.lower(func.trim(columns.vendor))
+
+# Backs the per-vendor, per-budget date-ordered scans of app.analytics.split_purchases
+live_index(
+    "ix_expenditures_live_vendor_budget_date",
+    vendor_key(Expenditure.__table__.c), Expenditure.__table__.c.budget_id, Expenditure.__table__.c.expenditure_date,
+)
+
+class BudgetRollup(Base):
+    """
+    Running budget execution totals for one fiscal year, ministry, department,
+    county and expenditure category.
+
+    Maintained by app.db.rollups on budget and expenditure writes and rebuilt
+    daily. Allocated and approved amounts belong to budgets, which have no
+    category, so they are kept on rows whose category is null. The key
+    index treats nulls as equal, which needs PostgreSQL 15 or later.
+    """
+    __tablename__ = "budget_rollups"
+    __table_args__ = (
+        Index(
+            "ux_budget_rollups_key",
+            "fiscal_year", "ministry_id", "department_id", "county_id", "category",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    fiscal_year: Mapped[str] = mapped_column(String(10), nullable=False)
+    ministry_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+    department_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+    county_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+    category: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    allocated_amount: Mapped[float] = mapped_column(nullable=False, default=0)
+    approved_amount: Mapped[float] = mapped_column(nullable=False, default=0)
+    spent_amount: Mapped[float] = mapped_column(nullable=False, default=0)
+    committed_amount: Mapped[float] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<BudgetRollup(fiscal_year='{self.fiscal_year}', category='{self.category}', spent={self.spent_amount})>"
+
+class ExpenditureFlag(Base):
+    """
+    An expenditure flagged as suspicious by one rule of the anomaly engine.
+
+    Written by app.analytics.anomalies, which replaces every flag of a fiscal
+    year on each scan. The fiscal year and department are copied from the
+    budget so flags can be listed without joining it.
+    """
+    __tablename__ = "expenditure_flags"
+    __table_args__ = (
+        Index("ix_expenditure_flags_fiscal_year_score", "fiscal_year", "score", "id"),
+        Index("ix_expenditure_flags_expenditure", "expenditure_id"),
+    )
+
+    fiscal_year: Mapped[str] = mapped_column(String(10), nullable=False)
+    rule: Mapped[str] = mapped_column(String(50), nullable=False)  # amount_outlier, benford, round_number
+    score: Mapped[float] = mapped_column(nullable=False)  # z-score; higher is more suspicious
+    reason: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # Foreign keys
+    expenditure_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("expenditures.id"), nullable=False)
+    department_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("departments.id"), nullable=True)
+
+    # Relationships
+    expenditure: Mapped["Expenditure"] = relationship()
+
+    def __repr__(self) -> str:
+        return f"<ExpenditureFlag(rule='{self.rule}', score={self.score}, expenditure_id='{self.expenditure_id}')>"
+
+class SplitPurchase(Base):
+    """
+    Payments to one vendor from one budget that each stay under an approval
+    threshold but together exceed it within a few days, as when a purchase
+    is split to avoid the approval.
+
+    Written by app.analytics.split_purchases, which replaces the groups of a
+    vendor and budget whenever it rescans them.
+    """
+    __tablename__ = "split_purchases"
+    __table_args__ = (
+        Index("ix_split_purchases_budget_vendor", "budget_id", "vendor"),
+        Index("ix_split_purchases_last_date", "last_date", "id"),
+    )
+
+    vendor: Mapped[str] = mapped_column(String(255), nullable=False)  # as grouped by vendor_key
+    threshold: Mapped[float] = mapped_column(nullable=False)
+    payment_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_amount: Mapped[float] = mapped_column(nullable=False)
+    first_date: Mapped[date] = mapped_column(Date, nullable=False)
+    last_date: Mapped[date] = mapped_column(Date, nullable=False)
+
+    # Foreign keys
+    budget_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("budgets.id"), nullable=False)
+
+    # Relationships
+    payments: Mapped[List["SplitPurchasePayment"]] = relationship(
+        back_populates="split_purchase", order_by="SplitPurchasePayment.expenditure_date"
+    )
+
+    def __repr__(self) -> str:
+        return f"<SplitPurchase(vendor='{self.vendor}', threshold={self.threshold}, total={self.total_amount})>"
+
+class SplitPurchasePayment(Base):
+    """An expenditure making up part of a split purchase."""
+    __tablename__ = "split_purchase_payments"
+    __table_args__ = (
+        Index("ix_split_purchase_payments_split_purchase", "split_purchase_id"),
+        Index("ix_split_purchase_payments_expenditure", "expenditure_id"),
+    )
+
+    expenditure_date: Mapped[date] = mapped_column(Date, nullable=False)
+    amount: Mapped[float] = mapped_column(nullable=False)
+
+    # Foreign keys
+    split_purchase_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("split_purchases.id"), nullable=False)
+    expenditure_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("expenditures.id"), nullable=False)
+
+    # Relationships
+    split_purchase: Mapped["SplitPurchase"] = relationship(back_populates="payments")
+
+    def __repr__(self) -> str:
+        return f"<SplitPurchasePayment(expenditure_id='{self.expenditure_id}', amount={self.amount})>"
+
 class Salary(Base):
     """Represents an employee's salary information."""
     __tablename__ = "salaries"
@@ -162,6 +313,50 @@ class Salary(Base):
     def __repr__(self) -> str:
         return f"<Salary(employee_id={self.employee_id}, effective_date='{self.effective_date}', basic_salary={self.basic_salary})>"
 
+class PayrollCluster(Base):
+    """
+    Employees flagged together by one payroll integrity rule: sharing a bank
+    account, phone number or address, or near-identical names and dates of
+    birth across ministries. Salaried employees with no attendance are
+    clusters of one.
+
+    Written by app.analytics.payroll, which replaces every cluster on each run.
+    """
+    __tablename__ = "payroll_clusters"
+    __table_args__ = (
+        Index("ix_payroll_clusters_rule_size", "rule", "employee_count", "id"),
+    )
+
+    rule: Mapped[str] = mapped_column(String(50), nullable=False)  # shared_bank_account, shared_phone, ...
+    reason: Mapped[str] = mapped_column(Text, nullable=False)
+    employee_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Relationships
+    members: Mapped[List["PayrollClusterMember"]] = relationship(back_populates="cluster")
+
+    def __repr__(self) -> str:
+        return f"<PayrollCluster(rule='{self.rule}', employee_count={self.employee_count})>"
+
+class PayrollClusterMember(Base):
+    """An employee in a payroll cluster."""
+    __tablename__ = "payroll_cluster_members"
+    __table_args__ = (
+        Index("ix_payroll_cluster_members_cluster", "cluster_id"),
+        Index("ix_payroll_cluster_members_employee", "employee_id"),
+        Index("ix_payroll_cluster_members_ministry", "ministry_id"),
+    )
+
+    # Foreign keys
+    cluster_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("payroll_clusters.id"), nullable=False)
+    employee_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("employees.id"), nullable=False)
+    ministry_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("ministries.id"), nullable=True)
+
+    # Relationships
+    cluster: Mapped["PayrollCluster"] = relationship(back_populates="members")
+
+    def __repr__(self) -> str:
+        return f"<PayrollClusterMember(cluster_id={self.cluster_id}, employee_id={self.employee_id})>"
+
 class Payment(Base):
     """Represents a payment made to an employee or vendor."""
     __tablename__ = "payments"
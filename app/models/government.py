@@ -2,7 +2,7 @@ from datetime import date
 from enum import Enum
 from typing import Optional, List, TYPE_CHECKING
 import uuid
-from sqlalchemy import String, ForeignKey, Text, Date, Enum as SQLEnum, Integer, Float, Boolean
+from sqlalchemy import String, ForeignKey, Text, Date, Enum as SQLEnum, Index, Integer, Float, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
 
@@ -256,6 +256,29 @@ class Ward(Base):
     def __repr__(self) -> str:
         return f"<Ward(name='{self.name}', code='{self.code}', sub_county_id={self.sub_county_id})>"
 
+class OrgUnitClosure(Base):
+    """
+    One ancestor and descendant pair of the government structure: Ministry,
+    Department and Division or Agency, and County, SubCounty and Ward.
+
+    Every unit is paired with itself at depth 0 and with each unit above it,
+    so everything under a unit is one indexed lookup on ancestor_id.
+    Maintained by app.db.hierarchy on writes and repaired daily. Ids may be
+    of any of the unit tables, so they carry no foreign keys.
+    """
+    __tablename__ = "org_unit_closure"
+    __table_args__ = (
+        Index("ux_org_unit_closure_ancestor_descendant", "ancestor_id", "descendant_id", unique=True),
+        Index("ix_org_unit_closure_descendant_depth", "descendant_id", "depth"),
+    )
+
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    descendant_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<OrgUnitClosure(ancestor_id={self.ancestor_id}, descendant_id={self.descendant_id}, depth={self.depth})>"
+
 class Project(Base):
     """Represents a government project."""
     __tablename__ = "projects"
@@ -14,7 +14,7 @@ from sqlalchemy import (
     Boolean,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.models.base import Base
+from app.models.base import Base, live_index, live_name_index, search_vector_column
 
 if TYPE_CHECKING:
     from app.models.employee import Employee
@@ -215,10 +215,18 @@ class PoliceOfficer(Base):
     def __repr__(self) -> str:
         return f"<PoliceOfficer(service_number='{self.service_number}', name='{self.first_name} {self.last_name}', rank='{self.rank}')>"
 
+live_name_index("ix_police_officers_live_name_trgm", PoliceOfficer)
+
 class PoliceComplaint(Base):
     """Represents a complaint against a police officer."""
 
     __tablename__ = "police_complaints"
+    __table_args__ = (
+        live_index("ix_police_complaints_live_submission", "submission_date", "id"),
+        live_index("ix_police_complaints_live_status_submission", "status", "submission_date", "id"),
+        live_index("ix_police_complaints_live_officer_submission", "officer_id", "submission_date", "id"),
+        live_index("ix_police_complaints_live_search", "search_vector", postgresql_using="gin"),
+    )
 
     reference_number: Mapped[str] = mapped_column(
         String(50), nullable=False, unique=True
@@ -257,6 +265,9 @@ class PoliceComplaint(Base):
     resolution_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     rejection_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     escalation_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    search_vector: Mapped[Optional[str]] = search_vector_column(
+        ("subject", "A"), ("description", "B"), ("resolution_details", "C")
+    )
 
     # Foreign keys
     officer_id: Mapped[Optional[uuid.UUID]] = mapped_column(
@@ -375,7 +386,7 @@ class Evidence(Base):
     storage_location: Mapped[str] = mapped_column(String(255), nullable=False)
     file_url: Mapped[Optional[str]] = mapped_column(
         String(255), nullable=True
-    )  # For digital evidence
+    )  # For digital evidence: sha256:<digest> of the file in evidence storage
 
     # Foreign keys
     investigation_id: Mapped[uuid.UUID] = mapped_column(
@@ -394,6 +405,9 @@ class IncidentReport(Base):
     """Represents an incident report filed by a police officer."""
 
     __tablename__ = "incident_reports"
+    __table_args__ = (
+        live_index("ix_incident_reports_live_search", "search_vector", postgresql_using="gin"),
+    )
 
     report_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -436,6 +450,9 @@ class IncidentReport(Base):
     follow_up_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     resolution_details: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     resolution_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    search_vector: Mapped[Optional[str]] = search_vector_column(
+        ("title", "A"), ("description", "B"), ("resolution_details", "C")
+    )
 
     # Foreign keys
     reporting_officer_id: Mapped[uuid.UUID] = mapped_column(
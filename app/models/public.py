@@ -4,7 +4,7 @@ from typing import Optional, List, TYPE_CHECKING
 import uuid
 from sqlalchemy import String, ForeignKey, Text, Date, DateTime, Enum as SQLEnum, Integer, Float, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.models.base import Base
+from app.models.base import Base, live_index, search_vector_column
 
 if TYPE_CHECKING:
     from app.models.employee import Employee
@@ -29,6 +29,13 @@ class ComplaintPriority(str, Enum):
 class Complaint(Base):
     """Represents a complaint submitted by a citizen."""
     __tablename__ = "complaints"
+    __table_args__ = (
+        live_index("ix_complaints_live_submission", "submission_date", "id"),
+        live_index("ix_complaints_live_status_submission", "status", "submission_date", "id"),
+        live_index("ix_complaints_live_ministry_submission", "ministry_id", "submission_date", "id"),
+        live_index("ix_complaints_live_department_submission", "department_id", "submission_date", "id"),
+        live_index("ix_complaints_live_search", "search_vector", postgresql_using="gin"),
+    )
     
     reference_number: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     subject: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -55,6 +62,9 @@ class Complaint(Base):
     feedback_provided: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     satisfaction_rating: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 1-5 scale
     attachments: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON string of attachment URLs
+    search_vector: Mapped[Optional[str]] = search_vector_column(
+        ("subject", "A"), ("description", "B"), ("resolution_details", "C")
+    )
     
     # Optional foreign keys for organizational placement
     ministry_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("ministries.id"), nullable=True)
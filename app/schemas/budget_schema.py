@@ -1,5 +1,6 @@
 from typing import Optional, List
 from datetime import date, datetime
+import uuid
 from pydantic import BaseModel, validator
 from enum import Enum
 
@@ -40,6 +41,18 @@ class ExpenditureStatusEnum(str, Enum):
     PAID = "paid"
     CANCELLED = "cancelled"
 
+class RollupDimensionEnum(str, Enum):
+    FISCAL_YEAR = "fiscal_year"
+    MINISTRY = "ministry_id"
+    DEPARTMENT = "department_id"
+    COUNTY = "county_id"
+    CATEGORY = "category"
+
+class AnomalyRuleEnum(str, Enum):
+    AMOUNT_OUTLIER = "amount_outlier"
+    BENFORD = "benford"
+    ROUND_NUMBER = "round_number"
+
 # Base schema for Budget
 class BudgetBase(BaseModel):
     fiscal_year: str
@@ -167,3 +180,59 @@ class BudgetDetail(Budget):
     class Config:
         orm_mode = True
 
+# Schema for budget execution totals; dimensions not grouped by are null
+class BudgetRollup(BaseModel):
+    fiscal_year: Optional[str] = None
+    ministry_id: Optional[uuid.UUID] = None
+    department_id: Optional[uuid.UUID] = None
+    county_id: Optional[uuid.UUID] = None
+    category: Optional[str] = None
+    allocated_amount: float
+    approved_amount: float
+    spent_amount: float
+    committed_amount: float
+
+    class Config:
+        orm_mode = True
+
+# Schema for an expenditure flagged by the anomaly engine
+class ExpenditureFlag(BaseModel):
+    id: uuid.UUID
+    expenditure_id: uuid.UUID
+    expenditure_number: str
+    vendor: str
+    category: str
+    amount: float
+    department_id: Optional[uuid.UUID] = None
+    fiscal_year: str
+    rule: AnomalyRuleEnum
+    score: float
+    reason: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+# Schemas for payments to one vendor split to stay under an approval threshold
+class SplitPurchasePayment(BaseModel):
+    expenditure_id: uuid.UUID
+    expenditure_date: date
+    amount: float
+
+    class Config:
+        orm_mode = True
+
+class SplitPurchase(BaseModel):
+    id: uuid.UUID
+    budget_id: uuid.UUID
+    vendor: str
+    threshold: float
+    payment_count: int
+    total_amount: float
+    first_date: date
+    last_date: date
+    created_at: datetime
+    payments: List[SplitPurchasePayment] = []
+
+    class Config:
+        orm_mode = True
@@ -1,5 +1,6 @@
 from typing import Optional, List
 from datetime import date, datetime
+import uuid
 from pydantic import BaseModel, EmailStr, validator
 from enum import Enum
 
@@ -10,6 +11,13 @@ class GenderEnum(str, Enum):
     OTHER = "other"
     PREFER_NOT_TO_SAY = "prefer_not_to_say"
 
+class PayrollRuleEnum(str, Enum):
+    SHARED_BANK_ACCOUNT = "shared_bank_account"
+    SHARED_PHONE = "shared_phone"
+    SHARED_ADDRESS = "shared_address"
+    DUPLICATE_NAME = "duplicate_name"
+    NO_ATTENDANCE = "no_attendance"
+
 class EmploymentStatusEnum(str, Enum):
     ACTIVE = "active"
     SUSPENDED = "suspended"
@@ -200,3 +208,48 @@ class EmployeeDetail(Employee):
     class Config:
         orm_mode = True
 
+# Schemas for employees flagged together by a payroll integrity rule
+class PayrollClusterMember(BaseModel):
+    employee_id: uuid.UUID
+    ministry_id: Optional[uuid.UUID] = None
+
+    class Config:
+        orm_mode = True
+
+class PayrollCluster(BaseModel):
+    id: uuid.UUID
+    rule: PayrollRuleEnum
+    reason: str
+    employee_count: int
+    created_at: datetime
+    members: List[PayrollClusterMember] = []
+
+    class Config:
+        orm_mode = True
+
+# Schemas for an employee's reporting chain and subordinates
+class OrgChartNode(BaseModel):
+    id: uuid.UUID
+    supervisor_id: Optional[uuid.UUID] = None
+    depth: int
+    employee_number: str
+    first_name: str
+    middle_name: Optional[str] = None
+    last_name: str
+    position_id: uuid.UUID
+    position_title: Optional[str] = None
+    ministry_id: Optional[uuid.UUID] = None
+    department_id: Optional[uuid.UUID] = None
+    status: EmploymentStatusEnum
+
+    class Config:
+        orm_mode = True
+
+class OrgChart(BaseModel):
+    employee_id: uuid.UUID
+    chain: List[OrgChartNode] = []
+    subordinates: List[OrgChartNode] = []
+    truncated: bool
+
+    class Config:
+        orm_mode = True
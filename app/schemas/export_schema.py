@@ -0,0 +1,6 @@
+from enum import Enum
+
+# Enums
+class ExportFormatEnum(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -1,5 +1,7 @@
 from typing import Optional, List
 from datetime import datetime, date
+from enum import Enum
+import uuid
 from pydantic import BaseModel, EmailStr, HttpUrl, validator
 
 # Base schema for Ministry
@@ -60,3 +62,20 @@ class MinistryDetail(Ministry):
     class Config:
         orm_mode = True
 
+class OrgUnitTypeEnum(str, Enum):
+    MINISTRY = "ministry"
+    DEPARTMENT = "department"
+    DIVISION = "division"
+    AGENCY = "agency"
+
+# Schema for a unit in a ministry's organisational tree
+class OrgUnitNode(BaseModel):
+    id: uuid.UUID
+    type: OrgUnitTypeEnum
+    name: str
+    code: str
+    is_active: bool
+    children: List["OrgUnitNode"] = []
+
+    class Config:
+        orm_mode = True
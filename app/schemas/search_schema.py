@@ -0,0 +1,33 @@
+from typing import Generic, Optional, TypeVar
+from datetime import datetime
+from enum import Enum
+import uuid
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Enums
+class SearchTypeEnum(str, Enum):
+    COMPLAINT = "complaint"
+    CRIME_REPORT = "crime_report"
+    POLICE_COMPLAINT = "police_complaint"
+    INCIDENT_REPORT = "incident_report"
+
+# Schema for a ranked name search result
+class NameMatch(BaseModel, Generic[T]):
+    item: T
+    score: float
+
+# Schema for a full-text search result
+class SearchHit(BaseModel):
+    type: SearchTypeEnum
+    id: uuid.UUID
+    reference: str
+    title: str
+    status: str
+    date: datetime
+    rank: float
+    snippet: Optional[str] = None
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,102 @@
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+CONTENT_URL_PREFIX = "sha256:"
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+_REF = re.compile(r"[A-Za-z0-9_-]{1,100}")
+
+
+class StorageError(OSError):
+    """
+    A storage backend failed to store, read or release content.
+    """
+
+
+@dataclass
+class StoredObject:
+    digest: str
+    size: int
+    created: bool  # False when the same content was already stored
+
+    @property
+    def url(self) -> str:
+        return content_url(self.digest)
+
+
+def content_url(digest: str) -> str:
+    """
+    The value kept in a file_url column for stored content. It names the
+    content rather than a location, so it holds whichever backend is in use.
+    """
+    return f"{CONTENT_URL_PREFIX}{check_digest(digest)}"
+
+
+def content_digest(url: str) -> Optional[str]:
+    """
+    The digest a file_url refers to, or None for a url written before
+    content-addressed storage.
+    """
+    if url and url.startswith(CONTENT_URL_PREFIX) and _DIGEST.fullmatch(url[len(CONTENT_URL_PREFIX):]):
+        return url[len(CONTENT_URL_PREFIX):]
+    return None
+
+
+def check_digest(digest: str) -> str:
+    # Digests become file and object names, so nothing else may pass
+    if not _DIGEST.fullmatch(digest):
+        raise ValueError(f"Not a SHA-256 hex digest: {digest!r}")
+    return digest
+
+
+def check_ref(ref: str) -> str:
+    if not _REF.fullmatch(ref):
+        raise ValueError(f"References must be 1 to 100 letters, digits, '-' or '_': {ref!r}")
+    return ref
+
+
+def shard(digest: str) -> str:
+    """
+    The digest under two levels of its leading hex pairs, ab/cd/abcd...,
+    so no directory or listing prefix holds more than a sliver of the store.
+    """
+    return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+class EvidenceStorage(ABC):
+    """
+    Content-addressed store for evidence files.
+
+    Content is kept once under its SHA-256, however many times it is
+    uploaded. Each upload adds a reference, named by the caller after the
+    record that owns it, and content is removed when its last reference is
+    released.
+    """
+
+    @abstractmethod
+    async def put(self, file: UploadFile, ref: str, max_size: Optional[int] = None) -> StoredObject:
+        """
+        Stream file into the store and reference it as ref. Putting the same
+        content under the same ref again adds nothing.
+        """
+
+    @abstractmethod
+    def read(self, digest: str) -> AsyncIterator[bytes]:
+        """
+        The stored content in chunks. Raises FileNotFoundError when there is
+        none under digest.
+        """
+
+    @abstractmethod
+    async def release(self, digest: str, ref: str) -> bool:
+        """
+        Drop the reference ref to digest. Returns True when it was the last
+        one and the content itself was removed.
+        """
+
+    async def close(self) -> None:
+        pass
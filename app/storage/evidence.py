@@ -0,0 +1,30 @@
+from app.core.config import settings
+from app.storage.base import EvidenceStorage
+from app.storage.local import LocalEvidenceStorage
+from app.storage.s3 import S3EvidenceStorage
+
+
+def create_evidence_storage() -> EvidenceStorage:
+    """
+    Build the store selected by EVIDENCE_STORAGE_BACKEND.
+    """
+    if settings.EVIDENCE_STORAGE_BACKEND == "s3":
+        missing = [
+            name for name in ("EVIDENCE_S3_ENDPOINT", "EVIDENCE_S3_ACCESS_KEY", "EVIDENCE_S3_SECRET_KEY")
+            if not getattr(settings, name)
+        ]
+        if missing:
+            raise ValueError(f"{', '.join(missing)} must be set when EVIDENCE_STORAGE_BACKEND is 's3'")
+        return S3EvidenceStorage(
+            settings.EVIDENCE_S3_ENDPOINT,
+            settings.EVIDENCE_S3_BUCKET,
+            settings.EVIDENCE_S3_ACCESS_KEY,
+            settings.EVIDENCE_S3_SECRET_KEY,
+            region=settings.EVIDENCE_S3_REGION,
+            prefix=settings.EVIDENCE_S3_PREFIX,
+            timeout=settings.EVIDENCE_S3_TIMEOUT,
+        )
+    return LocalEvidenceStorage(settings.EVIDENCE_STORAGE_DIR)
+
+
+evidence_storage = create_evidence_storage()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.storage.base import EvidenceStorage, StoredObject, check_digest, check_ref, shard
+from app.storage.uploads import save_upload
+
+
+class LocalEvidenceStorage(EvidenceStorage):
+    """
+    Content-addressed store on a local or mounted filesystem.
+
+    Content lives once under objects/ab/cd/<digest>, read-only. Every
+    reference is a hard link to it under refs/ab/cd/<digest>.<ref>, so the
+    file's link count is its reference count and a duplicate upload costs a
+    directory entry instead of a copy. Uploads are staged under staging/ on
+    the same filesystem, since hard links cannot cross filesystems.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.refs = self.root / "refs"
+        self.staging = self.root / "staging"
+        for directory in (self.objects, self.refs, self.staging):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / shard(check_digest(digest))
+
+    def ref_path(self, digest: str, ref: str) -> Path:
+        return self.refs / f"{shard(check_digest(digest))}.{check_ref(ref)}"
+
+    async def put(self, file: UploadFile, ref: str, max_size: Optional[int] = None) -> StoredObject:
+        check_ref(ref)
+        staged = await save_upload(file, self.staging / uuid.uuid4().hex, max_size)
+        try:
+            await asyncio.to_thread(os.chmod, staged.path, 0o444)
+            object_path, ref_path = self.object_path(staged.sha256), self.ref_path(staged.sha256, ref)
+            await aiofiles.os.makedirs(object_path.parent, exist_ok=True)
+            await aiofiles.os.makedirs(ref_path.parent, exist_ok=True)
+
+            created = False
+            while True:
+                try:
+                    await aiofiles.os.link(object_path, ref_path)
+                    break
+                except FileExistsError:
+                    break
+                except FileNotFoundError:
+                    # New content, or its last reference was released meanwhile
+                    try:
+                        await aiofiles.os.link(staged.path, object_path)
+                        created = True
+                    except FileExistsError:
+                        pass
+        finally:
+            await aiofiles.os.remove(staged.path)
+        return StoredObject(staged.sha256, staged.size, created)
+
+    async def read(self, digest: str) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.object_path(digest), "rb") as in_file:
+            while chunk := await in_file.read(settings.UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+    async def release(self, digest: str, ref: str) -> bool:
+        try:
+            await aiofiles.os.remove(self.ref_path(digest, ref))
+        except FileNotFoundError:
+            pass
+
+        object_path = self.object_path(digest)
+        try:
+            if (await aiofiles.os.stat(object_path)).st_nlink > 1:
+                return False
+            # Moved aside before the final check, so a put that links to it
+            # from now on finds nothing and stores its own copy instead
+            released = object_path.with_name(f".{digest}.{uuid.uuid4().hex}.released")
+            await aiofiles.os.rename(object_path, released)
+        except FileNotFoundError:
+            return False
+
+        if (await aiofiles.os.stat(released)).st_nlink > 1:
+            # A put linked to it before it was moved; the content is the same
+            # whichever copy ends up in place
+            try:
+                await aiofiles.os.link(released, object_path)
+            except FileExistsError:
+                pass
+            await aiofiles.os.remove(released)
+            return False
+        await aiofiles.os.remove(released)
+        return True
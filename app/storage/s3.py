@@ -0,0 +1,211 @@
+import hashlib
+import hmac
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import quote
+
+import aiofiles
+import aiofiles.os
+import httpx
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.storage.base import EvidenceStorage, StorageError, StoredObject, check_digest, check_ref, shard
+from app.storage.uploads import save_upload
+
+EMPTY_PAYLOAD = hashlib.sha256(b"").hexdigest()
+
+_KEY_COUNT = re.compile(r"<KeyCount>(\d+)</KeyCount>")
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+class SigV4Signer:
+    """
+    AWS Signature Version 4 for S3 requests, enough for the object and
+    listing calls used here. Every S3-compatible server accepts it.
+    """
+
+    def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+
+    def headers(
+        self,
+        method: str,
+        url: httpx.URL,
+        payload_sha256: str = EMPTY_PAYLOAD,
+        headers: Optional[Dict[str, str]] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, str]:
+        """
+        The given headers plus the date, payload hash and Authorization
+        headers that sign the request.
+        """
+        now = now or datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{amz_date[:8]}/{self.region}/{self.service}/aws4_request"
+        signed = {
+            **{name.lower(): value.strip() for name, value in (headers or {}).items()},
+            "host": url.netloc.decode(),
+            "x-amz-content-sha256": payload_sha256,
+            "x-amz-date": amz_date,
+        }
+        names = sorted(signed)
+        query = "&".join(
+            f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+            for name, value in sorted(url.params.multi_items())
+        )
+        canonical_request = "\n".join((
+            method,
+            quote(url.path, safe="/-_.~"),
+            query,
+            "".join(f"{name}:{signed[name]}\n" for name in names),
+            ";".join(names),
+            payload_sha256,
+        ))
+        string_to_sign = "\n".join((
+            "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ))
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (amz_date[:8], self.region, self.service, "aws4_request"):
+            key = _hmac(key, part)
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        signed.pop("host")
+        signed["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={';'.join(names)}, Signature={signature}"
+        )
+        return signed
+
+
+class S3EvidenceStorage(EvidenceStorage):
+    """
+    Content-addressed store in an S3-compatible bucket, addressed by path
+    so MinIO, Ceph and the like work as well as AWS.
+
+    Content lives once under objects/ab/cd/<digest>, and each reference is
+    an empty marker object, refs/<digest>/<ref>. Uploads are staged to
+    local disk while they are hashed, then sent only when the bucket does
+    not already hold the content, signed with the digest as the payload
+    hash so the server rejects anything altered on the way.
+
+    S3 has no atomic link count, so a release can remove content that a
+    put of the same file has just found, and that put's record is left
+    pointing at nothing until the file is uploaded again. Evidence records
+    are soft-deleted, so this only arises where references are released
+    explicitly.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        prefix: str = "",
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.signer = SigV4Signer(access_key, secret_key, region)
+        self.staging = Path(settings.UPLOAD_DIR) / "staging"
+        self.staging.mkdir(parents=True, exist_ok=True)
+        self.client = httpx.AsyncClient(timeout=timeout, transport=transport)
+
+    def object_key(self, digest: str) -> str:
+        return f"{self.prefix}objects/{shard(check_digest(digest))}"
+
+    def refs_prefix(self, digest: str) -> str:
+        return f"{self.prefix}refs/{check_digest(digest)}/"
+
+    def ref_key(self, digest: str, ref: str) -> str:
+        return f"{self.refs_prefix(digest)}{check_ref(ref)}"
+
+    async def _send(
+        self,
+        method: str,
+        key: str = "",
+        params: Optional[Dict[str, str]] = None,
+        content=None,
+        payload_sha256: str = EMPTY_PAYLOAD,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        url = httpx.URL(f"{self.endpoint}/{self.bucket}/{key}".rstrip("/"), params=params)
+        request = self.client.build_request(
+            method, url, content=content,
+            headers=self.signer.headers(method, url, payload_sha256, headers),
+        )
+        try:
+            return await self.client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            raise StorageError(f"{method} {key} failed: {str(e)}") from e
+
+    @staticmethod
+    def _check(response: httpx.Response, *expected: int) -> None:
+        if response.status_code not in expected:
+            raise StorageError(f"{response.request.method} {response.request.url.path} returned {response.status_code}")
+
+    async def _staged_chunks(self, path: Path) -> AsyncIterator[bytes]:
+        async with aiofiles.open(path, "rb") as in_file:
+            while chunk := await in_file.read(settings.UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+    async def put(self, file: UploadFile, ref: str, max_size: Optional[int] = None) -> StoredObject:
+        check_ref(ref)
+        staged = await save_upload(file, self.staging / uuid.uuid4().hex, max_size)
+        try:
+            # The reference goes first, so a release that lists references from now on keeps the content
+            self._check(await self._send("PUT", self.ref_key(staged.sha256, ref), content=b""), 200)
+            key = self.object_key(staged.sha256)
+            head = await self._send("HEAD", key)
+            self._check(head, 200, 404)
+            if head.status_code == 200:
+                return StoredObject(staged.sha256, staged.size, False)
+            response = await self._send(
+                "PUT", key,
+                content=self._staged_chunks(staged.path),
+                payload_sha256=staged.sha256,
+                headers={"Content-Length": str(staged.size), "Content-Type": "application/octet-stream"},
+            )
+            self._check(response, 200)
+            return StoredObject(staged.sha256, staged.size, True)
+        finally:
+            await aiofiles.os.remove(staged.path)
+
+    async def read(self, digest: str) -> AsyncIterator[bytes]:
+        response = await self._send("GET", self.object_key(digest), stream=True)
+        try:
+            if response.status_code == 404:
+                raise FileNotFoundError(self.object_key(digest))
+            self._check(response, 200)
+            async for chunk in response.aiter_bytes(settings.UPLOAD_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def release(self, digest: str, ref: str) -> bool:
+        self._check(await self._send("DELETE", self.ref_key(digest, ref)), 204, 200, 404)
+        listing = await self._send(
+            "GET", params={"list-type": "2", "prefix": self.refs_prefix(digest), "max-keys": "1"}
+        )
+        self._check(listing, 200)
+        match = _KEY_COUNT.search(listing.text)
+        if match is None or int(match.group(1)) > 0:
+            return False
+        self._check(await self._send("DELETE", self.object_key(digest)), 204, 200, 404)
+        return True
+
+    async def close(self) -> None:
+        await self.client.aclose()
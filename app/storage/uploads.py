@@ -0,0 +1,64 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.exceptions import PayloadTooLargeError
+
+
+@dataclass
+class SavedUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+def _too_large(max_size: int) -> PayloadTooLargeError:
+    return PayloadTooLargeError(f"Upload exceeds the maximum allowed size of {max_size / (1024 * 1024):g} MB")
+
+
+async def save_upload(
+    file: UploadFile,
+    path: Path,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> SavedUpload:
+    """
+    Stream an upload to path one chunk at a time, hashing it as it goes, so
+    memory use stays at one chunk whatever the file size.
+
+    The file is written under a temporary name and renamed into place once
+    complete, so path never holds a partial upload. Raises
+    PayloadTooLargeError, leaving nothing behind, as soon as more than
+    max_size bytes have been read.
+    """
+    max_size = settings.MAX_UPLOAD_SIZE if max_size is None else max_size
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    # The multipart parser records the size of the spooled upload when it knows it
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+
+    partial = path.with_name(f".{path.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(partial, "wb") as out_file:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(max_size)
+                digest.update(chunk)
+                await out_file.write(chunk)
+        await aiofiles.os.replace(partial, path)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(partial)
+        except FileNotFoundError:
+            pass
+        raise
+    return SavedUpload(path, size, digest.hexdigest())
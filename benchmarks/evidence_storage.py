@@ -0,0 +1,238 @@
+"""
+Evidence storage used by repeated uploads of the same files: a copy per upload versus content-addressed storage.
+
+Makes --distinct synthetic files of --size-mb each and uploads them
+--uploads times, picking files with Zipf-like popularity, as citizens
+reporting the same incident share the same viral video. Saves every
+upload three ways: a copy per upload, as add_media_evidence used to;
+app.storage.local.LocalEvidenceStorage; and app.storage.s3.S3EvidenceStorage.
+Reports each one's time, the bytes kept and, for S3, the bytes sent. Then
+releases every reference and checks that nothing is left behind.
+
+S3 runs against an in-process stand-in that checks signatures and payload
+hashes, or against a real server given --s3-endpoint, such as MinIO:
+
+    python -m benchmarks.evidence_storage --uploads 500 --distinct 20 --size-mb 4
+    python -m benchmarks.evidence_storage --s3-endpoint http://localhost:9000 \\
+        --s3-access-key minioadmin --s3-secret-key minioadmin --s3-bucket evidence
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--uploads", type=int, default=500)
+parser.add_argument("--distinct", type=int, default=20)
+parser.add_argument("--size-mb", type=float, default=4)
+parser.add_argument("--s3-endpoint", default=None)
+parser.add_argument("--s3-bucket", default="evidence")
+parser.add_argument("--s3-access-key", default="benchmark")
+parser.add_argument("--s3-secret-key", default="benchmark")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "benchmark")
+
+import httpx
+from fastapi import UploadFile
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.storage.local import LocalEvidenceStorage
+from app.storage.s3 import S3EvidenceStorage, SigV4Signer
+from app.storage.uploads import save_upload
+
+MB = 1024 * 1024
+
+
+class S3StandIn:
+    """
+    In-memory S3 serving path-style PUT, GET, HEAD, DELETE and
+    ListObjectsV2, rejecting requests whose signature or payload hash does
+    not check out, as S3 does.
+    """
+
+    def __init__(self, signer: SigV4Signer):
+        self.signer = signer
+        self.objects = {}
+        self.bytes_received = 0
+
+    def _signed(self, request: Request) -> bool:
+        match = re.search(r"SignedHeaders=([^,]+)", request.headers.get("authorization", ""))
+        if match is None:
+            return False
+        extra = {
+            name: request.headers[name] for name in match.group(1).split(";")
+            if name not in ("host", "x-amz-content-sha256", "x-amz-date")
+        }
+        now = datetime.strptime(request.headers["x-amz-date"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        expected = self.signer.headers(
+            request.method, httpx.URL(str(request.url)), request.headers["x-amz-content-sha256"], extra, now
+        )
+        return expected["authorization"] == request.headers["authorization"]
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        body = await request.body()
+        bucket, _, key = request.url.path.lstrip("/").partition("/")
+        if not self._signed(request):
+            response = Response(status_code=403)
+        elif request.method == "PUT":
+            if hashlib.sha256(body).hexdigest() != request.headers["x-amz-content-sha256"]:
+                response = Response(status_code=400)
+            else:
+                self.bytes_received += len(body)
+                self.objects[key] = body
+                response = Response(status_code=200)
+        elif request.method == "DELETE":
+            self.objects.pop(key, None)
+            response = Response(status_code=204)
+        elif not key:
+            prefix = request.query_params.get("prefix", "")
+            limit = int(request.query_params.get("max-keys", 1000))
+            keys = sorted(k for k in self.objects if k.startswith(prefix))[:limit]
+            contents = "".join(f"<Contents><Key>{k}</Key></Contents>" for k in keys)
+            response = Response(
+                f"<ListBucketResult><Name>{bucket}</Name><KeyCount>{len(keys)}</KeyCount>{contents}</ListBucketResult>",
+                media_type="application/xml",
+            )
+        elif key not in self.objects:
+            response = Response(status_code=404)
+        elif request.method == "HEAD":
+            response = Response(headers={"Content-Length": str(len(self.objects[key]))})
+        else:
+            response = Response(self.objects[key], media_type="application/octet-stream")
+        await response(scope, receive, send)
+
+    def stored_bytes(self) -> int:
+        return sum(len(body) for key, body in self.objects.items() if "/objects/" in f"/{key}")
+
+
+def make_files(directory: Path, rng: random.Random):
+    files = []
+    for number in range(args.distinct):
+        path = directory / f"video-{number}.mp4"
+        path.write_bytes(rng.randbytes(int(args.size_mb * MB)))
+        files.append(path)
+    weights = [1 / (rank + 1) for rank in range(args.distinct)]
+    return [rng.choices(files, weights)[0] for _ in range(args.uploads)]
+
+
+def upload(path: Path) -> UploadFile:
+    return UploadFile(open(path, "rb"), size=path.stat().st_size, filename=path.name)
+
+
+def disk_usage(directory: Path) -> int:
+    # Hard links share an inode, so each is counted once
+    inodes = {}
+    for path in directory.rglob("*"):
+        if path.is_file():
+            stat = path.stat()
+            inodes[stat.st_ino] = stat.st_size
+    return sum(inodes.values())
+
+
+async def copies(uploads, directory: Path):
+    started = time.perf_counter()
+    for number, path in enumerate(uploads):
+        file = upload(path)
+        try:
+            await save_upload(file, directory / f"EV-{number:08d}.mp4")
+        finally:
+            file.file.close()
+    return time.perf_counter() - started
+
+
+async def content_addressed(storage, uploads):
+    """
+    Put every upload and check one read back. Returns the put time, the
+    digests put, and the count and bytes of those that were new content.
+    """
+    started = time.perf_counter()
+    stored, created, kept = [], 0, 0
+    for number, path in enumerate(uploads):
+        file = upload(path)
+        try:
+            result = await storage.put(file, ref=f"EV-{number:08d}")
+        finally:
+            file.file.close()
+        stored.append(result.digest)
+        if result.created:
+            created, kept = created + 1, kept + result.size
+    elapsed = time.perf_counter() - started
+
+    read_back = hashlib.sha256()
+    async for chunk in storage.read(stored[0]):
+        read_back.update(chunk)
+    assert read_back.hexdigest() == stored[0], "content read back does not match its digest"
+    return elapsed, stored, created, kept
+
+
+async def release_all(storage, stored) -> int:
+    removed = 0
+    for number, digest in enumerate(stored):
+        removed += await storage.release(digest, f"EV-{number:08d}")
+    return removed
+
+
+def report(label: str, elapsed: float, received: int, kept: int, sent: int = None) -> None:
+    sent_column = f"{sent / MB:>12,.0f}" if sent is not None else f"{'-':>12}"
+    print(f"{label:<20}{elapsed:>10.2f}{received / MB / elapsed:>10,.0f}{kept / MB:>12,.0f}{sent_column}")
+
+
+async def main():
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        (directory / "files").mkdir()
+        uploads = make_files(directory / "files", rng)
+        received = sum(path.stat().st_size for path in uploads)
+        distinct = len(set(uploads))
+        print(f"{args.uploads:,} uploads of {distinct} distinct {args.size_mb:g} MB files")
+        print(f"{'method':<20}{'seconds':>10}{'MB/s':>10}{'MB kept':>12}{'MB sent':>12}")
+
+        (directory / "copies").mkdir()
+        elapsed = await copies(uploads, directory / "copies")
+        report("copy per upload", elapsed, received, disk_usage(directory / "copies"))
+
+        local = LocalEvidenceStorage(str(directory / "local"))
+        elapsed, stored, created, kept = await content_addressed(local, uploads)
+        report("local, hard links", elapsed, received, disk_usage(local.objects))
+        assert created == distinct, f"{created} contents stored for {distinct} distinct files"
+        removed = await release_all(local, stored)
+        left = [path for path in local.root.rglob("*") if path.is_file()]
+        print(f"{'':<20}released: {removed} contents removed, {len(left)} files left")
+
+        signer = SigV4Signer(args.s3_access_key, args.s3_secret_key, "us-east-1")
+        stand_in = None if args.s3_endpoint else S3StandIn(signer)
+        s3 = S3EvidenceStorage(
+            args.s3_endpoint or "http://s3.test",
+            args.s3_bucket,
+            args.s3_access_key,
+            args.s3_secret_key,
+            prefix=f"benchmark-{rng.getrandbits(32):08x}/",
+            transport=httpx.ASGITransport(app=stand_in) if stand_in else None,
+        )
+        try:
+            elapsed, stored, created, kept = await content_addressed(s3, uploads)
+            if stand_in:
+                report("s3 stand-in", elapsed, received, stand_in.stored_bytes(), stand_in.bytes_received)
+            else:
+                report("s3", elapsed, received, kept)
+            removed = await release_all(s3, stored)
+            left = f", {len(stand_in.objects)} objects left" if stand_in else ""
+            print(f"{'':<20}released: {removed} contents removed{left}")
+        finally:
+            await s3.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""
+Evidence upload throughput and memory: reading the whole file versus streaming it in chunks.
+
+Spools a synthetic --size-mb upload to disk, as the multipart parser does
+with anything over 1 MB, then saves it the previous way (one read of the
+whole file, then one write) and through app.storage.uploads.save_upload,
+which reads, hashes and writes --chunk-kb at a time. Reports each one's
+time, throughput and peak Python heap, then times save_upload refusing the
+same file, its size undeclared, against a limit of a tenth of its size.
+
+--memory-limit-mb caps the process address space, as a container memory
+limit would, so the whole-file read fails outright once the upload no
+longer fits.
+
+    python -m benchmarks.evidence_uploads --size-mb 1024
+    python -m benchmarks.evidence_uploads --size-mb 1024 --memory-limit-mb 768
+"""
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--size-mb", type=int, default=1024)
+parser.add_argument("--chunk-kb", type=int, default=1024)
+parser.add_argument("--memory-limit-mb", type=int, default=None)
+parser.add_argument("--dir", default=None, help="where the upload and saved copies are written")
+args = parser.parse_args()
+
+for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "benchmark")
+
+import aiofiles
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.core.exceptions import PayloadTooLargeError
+from app.storage.uploads import save_upload
+
+MB = 1024 * 1024
+
+
+def spool(path: Path, size: int) -> None:
+    block = os.urandom(MB)
+    with open(path, "wb") as out_file:
+        for start in range(0, size, MB):
+            out_file.write(block[:min(MB, size - start)])
+
+
+def upload(path: Path) -> UploadFile:
+    return UploadFile(
+        open(path, "rb"),
+        size=path.stat().st_size,
+        filename="evidence.mp4",
+        headers=Headers({"content-type": "video/mp4"}),
+    )
+
+
+async def read_all(file: UploadFile, path: Path) -> int:
+    async with aiofiles.open(path, "wb") as out_file:
+        content = await file.read()
+        await out_file.write(content)
+    return len(content)
+
+
+async def streamed(file: UploadFile, path: Path) -> int:
+    saved = await save_upload(file, path, max_size=file.size, chunk_size=args.chunk_kb * 1024)
+    return saved.size
+
+
+async def refused(file: UploadFile, path: Path) -> int:
+    # With the size unknown, as for a body sent in chunks, the limit is found while streaming
+    max_size, file.size = file.size // 10, None
+    try:
+        await save_upload(file, path, max_size=max_size, chunk_size=args.chunk_kb * 1024)
+    except PayloadTooLargeError:
+        pass
+    return file.file.tell()
+
+
+def run(label: str, method, source: Path, target: Path) -> None:
+    file = upload(source)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        size = asyncio.run(method(file, target))
+    except MemoryError:
+        tracemalloc.stop()
+        print(f"{label:<12}{'out of memory':>14}")
+        return
+    finally:
+        file.file.close()
+        target.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12}{size / MB:>14,.0f}{elapsed:>10.2f}{size / MB / elapsed:>10,.0f}{peak / MB:>14,.1f}")
+
+
+def main():
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        source, target = Path(directory) / "upload", Path(directory) / "saved"
+        spool(source, args.size_mb * MB)
+        if args.memory_limit_mb:
+            limit = args.memory_limit_mb * MB
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        print(f"{args.size_mb:,} MB upload, {args.chunk_kb:,} KB chunks")
+        print(f"{'method':<12}{'MB read':>14}{'seconds':>10}{'MB/s':>10}{'peak heap MB':>14}")
+        # Streamed first, so its peak resident size is not the whole-file read's
+        run("streamed", streamed, source, target)
+        run("refused", refused, source, target)
+        run("read-all", read_all, source, target)
+        print(f"peak resident size {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Speed and recall of the vectorized expenditure anomaly rules against a pure Python scan.
+
+Generates --rows synthetic expenditures in NumPy: vendors each paid
+log-normal amounts around their own typical price, spread over several
+orders of magnitude as real payments are, with three kinds of fraud planted:
+
+    outliers     --outlier-rate of payments inflated 20 to 200 times
+    fabricated   one department in --departments whose amounts were typed
+                 in by hand, with leading digits roughly uniform
+    round        --round-vendors vendors always paid whole thousands
+
+Runs app.analytics.anomalies.detect over every row, and a row-at-a-time
+Python implementation of the same three rules over the first
+--reference-rows, and reports the time taken by each, their throughput, and
+the share of planted rows each rule flagged. Thresholds come from the
+ANOMALY_* settings.
+
+    python -m benchmarks.expenditure_anomalies --rows 2000000 --reference-rows 200000
+
+Requires numpy.
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+from collections import Counter, defaultdict
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--rows", type=int, default=2_000_000)
+parser.add_argument("--reference-rows", type=int, default=200_000)
+parser.add_argument("--vendors", type=int, default=5_000)
+parser.add_argument("--categories", type=int, default=11)
+parser.add_argument("--departments", type=int, default=50)
+parser.add_argument("--outlier-rate", type=float, default=0.001)
+parser.add_argument("--round-vendors", type=int, default=20)
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "benchmark")
+
+import numpy as np
+
+from app.analytics import anomalies
+from app.core.config import settings
+
+
+def generate(rows: int, rng: np.random.Generator):
+    """
+    Synthetic columns and the positions of each kind of planted fraud.
+    """
+    vendors = rng.integers(0, args.vendors, rows).astype(np.int32)
+    categories = rng.integers(0, args.categories, rows).astype(np.int32)
+    departments = rng.integers(0, args.departments, rows).astype(np.int32)
+
+    # Typical price per vendor and category, log-uniform from 100 to 10 million
+    typical = 10 ** rng.uniform(2, 7, (args.vendors, args.categories))
+    amounts = typical[vendors, categories] * rng.lognormal(0, 0.4, rows)
+
+    outliers = rng.random(rows) < args.outlier_rate
+    amounts[outliers] *= rng.uniform(20, 200, outliers.sum())
+
+    fabricated = departments == 0
+    amounts[fabricated] = rng.uniform(1_000, 10_000, fabricated.sum()) * 10 ** rng.integers(0, 3, fabricated.sum())
+
+    round_vendors = vendors < args.round_vendors
+    amounts[round_vendors] = np.maximum(np.round(amounts[round_vendors], -3), 1_000)
+
+    amounts = np.round(amounts, 2)
+    columns = anomalies.ExpenditureColumns(
+        ids=list(range(rows)),
+        amounts=amounts,
+        vendors=vendors,
+        categories=categories,
+        departments=departments,
+        vendor_labels=[f"Vendor {i}" for i in range(args.vendors)],
+        category_labels=[f"Category {i}" for i in range(args.categories)],
+        department_labels=[f"Department {i}" for i in range(args.departments)],
+    )
+    planted = {
+        anomalies.AMOUNT_OUTLIER: outliers & ~fabricated & ~round_vendors,
+        anomalies.BENFORD: fabricated,
+        anomalies.ROUND_NUMBER: round_vendors,
+    }
+    return columns, planted
+
+
+def python_outliers(amounts, vendors, categories):
+    groups = defaultdict(list)
+    for row, (amount, vendor, category) in enumerate(zip(amounts, vendors, categories)):
+        groups[vendor, category].append((math.log1p(max(amount, 0)), row))
+
+    flagged = set()
+    for members in groups.values():
+        if len(members) < settings.ANOMALY_MIN_GROUP_SIZE:
+            continue
+        logs = [value for value, _ in members]
+        median = statistics.median(logs)
+        deviations = [abs(value - median) for value in logs]
+        spread = statistics.median(deviations) / anomalies.MAD_SCALE
+        if not spread:
+            spread = statistics.fmean(deviations) * anomalies.MEAN_AD_SCALE
+        if not spread:
+            continue
+        for value, row in members:
+            if (value - median) / spread > settings.ANOMALY_OUTLIER_THRESHOLD:
+                flagged.add(row)
+    return flagged
+
+
+def leading_digit(amount):
+    if amount < 10:
+        return 0
+    return min(max(int(amount / 10 ** math.floor(math.log10(amount))), 1), 9)
+
+
+def python_benford(amounts, departments):
+    digits = [leading_digit(amount) for amount in amounts]
+    counts = defaultdict(Counter)
+    for digit, department in zip(digits, departments):
+        if digit:
+            counts[department][digit] += 1
+
+    suspicious = set()
+    for department, digit_counts in counts.items():
+        total = sum(digit_counts.values())
+        if total < settings.ANOMALY_BENFORD_MIN_ROWS:
+            continue
+        shares = {digit: digit_counts[digit] / total for digit in range(1, 10)}
+        expected = {digit: math.log10(1 + 1 / digit) for digit in range(1, 10)}
+        mad = sum(abs(shares[d] - expected[d]) for d in range(1, 10)) / 9
+        if mad <= settings.ANOMALY_BENFORD_MAD_THRESHOLD:
+            continue
+        for digit in range(1, 10):
+            z = (abs(shares[digit] - expected[digit]) - 1 / (2 * total)) / math.sqrt(
+                expected[digit] * (1 - expected[digit]) / total
+            )
+            if shares[digit] > expected[digit] and z > anomalies.BENFORD_DIGIT_Z:
+                suspicious.add((department, digit))
+    return {row for row, key in enumerate(zip(departments, digits)) if key in suspicious}
+
+
+def python_round_numbers(amounts, vendors):
+    unit = settings.ANOMALY_ROUND_UNIT
+    is_round = [amount >= unit and amount % unit == 0 for amount in amounts]
+    baseline = sum(is_round) / len(amounts)
+    if not 0 < baseline < 1:
+        return set()
+    totals, rounds = Counter(vendors), Counter(v for v, r in zip(vendors, is_round) if r)
+
+    clustered = set()
+    for vendor, total in totals.items():
+        if total < settings.ANOMALY_MIN_GROUP_SIZE:
+            continue
+        z = (rounds[vendor] - total * baseline) / math.sqrt(total * baseline * (1 - baseline))
+        if z > settings.ANOMALY_ROUND_Z_THRESHOLD:
+            clustered.add(vendor)
+    return {row for row, (vendor, r) in enumerate(zip(vendors, is_round)) if r and vendor in clustered}
+
+
+def python_detect(columns):
+    amounts = columns.amounts.tolist()
+    vendors, categories = columns.vendors.tolist(), columns.categories.tolist()
+    return {
+        anomalies.AMOUNT_OUTLIER: python_outliers(amounts, vendors, categories),
+        anomalies.BENFORD: python_benford(amounts, columns.departments.tolist()),
+        anomalies.ROUND_NUMBER: python_round_numbers(amounts, vendors),
+    }
+
+
+def subset(columns, rows):
+    return anomalies.ExpenditureColumns(
+        ids=columns.ids[:rows],
+        amounts=columns.amounts[:rows],
+        vendors=columns.vendors[:rows],
+        categories=columns.categories[:rows],
+        departments=columns.departments[:rows],
+        vendor_labels=columns.vendor_labels,
+        category_labels=columns.category_labels,
+        department_labels=columns.department_labels,
+    )
+
+
+def timed(function, *arguments):
+    started = time.perf_counter()
+    result = function(*arguments)
+    return result, time.perf_counter() - started
+
+
+def report(label, rows, elapsed, flagged, planted):
+    print(f"{label:<12}{rows:>12,}{elapsed:>10.2f}{rows / elapsed:>14,.0f}", end="")
+    for rule, planted_rows in planted.items():
+        hits = planted_rows[:rows]
+        recall = len(flagged[rule] & set(np.flatnonzero(hits).tolist())) / max(hits.sum(), 1)
+        print(f"{len(flagged[rule]):>10,}{recall:>8.1%}", end="")
+    print()
+
+
+def main():
+    rng = np.random.default_rng(args.seed)
+    columns, planted = generate(args.rows, rng)
+    reference_rows = min(args.reference_rows, args.rows)
+
+    print(
+        f"{args.rows:,} expenditures, {args.vendors:,} vendors, {args.categories} categories, "
+        f"{args.departments} departments; planted {planted[anomalies.AMOUNT_OUTLIER].sum():,} outliers, "
+        f"{planted[anomalies.BENFORD].sum():,} fabricated, {planted[anomalies.ROUND_NUMBER].sum():,} round"
+    )
+    header = "".join(f"{rule:>18}" for rule in planted)
+    print(f"{'':<48}{header}")
+    print(f"{'scan':<12}{'rows':>12}{'seconds':>10}{'rows/s':>14}" + f"{'flagged':>10}{'recall':>8}" * len(planted))
+
+    for label, scanned in (("numpy", subset(columns, reference_rows)), ("numpy", columns)):
+        results, elapsed = timed(anomalies.detect, scanned)
+        flagged = {flags.rule: set(flags.rows.tolist()) for flags in results}
+        report(label, len(scanned), elapsed, flagged, planted)
+        if len(scanned) == reference_rows:
+            vectorized = flagged
+
+    flagged, elapsed = timed(python_detect, subset(columns, reference_rows))
+    report("python", reference_rows, elapsed, flagged, planted)
+    for rule in planted:
+        if flagged[rule] != vectorized[rule]:
+            print(f"{rule}: numpy and python disagree on {len(flagged[rule] ^ vectorized[rule])} rows")
+
+
+if __name__ == "__main__":
+    main()
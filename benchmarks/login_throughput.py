@@ -0,0 +1,82 @@
+"""
+Login throughput and event loop responsiveness under concurrent bcrypt verification.
+
+Runs the same batch of concurrent password verifications three ways: inline
+on the event loop (the previous behaviour), in the thread pool and in the
+process pool used by app.auth.security. A heartbeat task records the
+longest stall of the event loop while the logins run.
+
+    python -m benchmarks.login_throughput --logins 64 --workers 4 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--logins", type=int, default=64)
+parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+parser.add_argument("--rounds", type=int, default=12)
+args = parser.parse_args()
+
+for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "benchmark")
+os.environ["PASSWORD_BCRYPT_ROUNDS"] = str(args.rounds)
+os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+from app.core.config import settings
+from app.auth import security
+
+PASSWORD = "correct horse battery staple"
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def inline_login(hashed: str) -> bool:
+    return security.verify_password(PASSWORD, hashed)
+
+
+async def pooled_login(hashed: str) -> bool:
+    return await security.verify_password_async(PASSWORD, hashed)
+
+
+async def run(login, hashed: str):
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login(hashed) for _ in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst_stall = await monitor
+    assert all(results)
+    return elapsed, worst_stall
+
+
+def main():
+    hashed = security.get_password_hash(PASSWORD)
+    print(f"{args.logins} concurrent logins, bcrypt rounds={args.rounds}, workers={args.workers}")
+
+    modes = [("inline (event loop)", None, inline_login), ("thread pool", "thread", pooled_login), ("process pool", "process", pooled_login)]
+    for label, executor, login in modes:
+        if executor:
+            security.shutdown_hash_executor()
+            settings.PASSWORD_HASH_EXECUTOR = executor
+            asyncio.run(pooled_login(hashed))  # warm the pool
+        elapsed, worst_stall = asyncio.run(run(login, hashed))
+        print(
+            f"{label:<20} {args.logins / elapsed:8.1f} logins/s "
+            f"worst event loop stall {worst_stall * 1000:8.1f} ms"
+        )
+    security.shutdown_hash_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Per-request overhead of the production middleware stack.
+
+Compares the previous BaseHTTPMiddleware implementations of the logging,
+rate limit and security header middlewares with the pure ASGI versions in
+app.middlewares, driving the ASGI app directly so no network or server
+cost is included.
+
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "benchmark")
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.middlewares.rate_limit import RateLimitMiddleware
+from app.middlewares.request_logging import RequestLoggingMiddleware
+from app.middlewares.security_headers import SECURITY_HEADERS, SecurityHeadersMiddleware
+
+
+class LegacyRequestLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(f"Request: {request.method} {request.url.path} Status: {response.status_code}")
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class LegacyRateLimit(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self.rate_limits = {}
+
+    async def dispatch(self, request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        info = self.rate_limits.setdefault(client_ip, {"count": 0, "start_time": time.time()})
+        info["count"] += 1
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(settings.RATE_LIMIT_DEFAULT_LIMIT)
+        response.headers["X-RateLimit-Remaining"] = str(settings.RATE_LIMIT_DEFAULT_LIMIT - info["count"])
+        response.headers["X-RateLimit-Reset"] = str(int(info["start_time"]))
+        return response
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+def build_app(middleware_classes):
+    return Starlette(
+        routes=[Route("/ping", endpoint)],
+        middleware=[Middleware(cls) for cls in middleware_classes],
+    )
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    settings.RATE_LIMIT_DEFAULT_LIMIT = args.requests * 10
+
+    stacks = {
+        "no middleware": [],
+        "BaseHTTPMiddleware": [LegacyRequestLogging, LegacyRateLimit, LegacySecurityHeaders],
+        "pure ASGI": [RequestLoggingMiddleware, RateLimitMiddleware, SecurityHeadersMiddleware],
+    }
+
+    baseline = None
+    for label, classes in stacks.items():
+        elapsed = asyncio.run(drive(build_app(classes), args.requests))
+        per_request = elapsed / args.requests * 1e6
+        if baseline is None:
+            baseline = per_request
+        print(
+            f"{label:<20} {per_request:8.1f} us/request "
+            f"(+{per_request - baseline:6.1f} us middleware overhead)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Time to find duplicate identities on a payroll with hash indexes versus comparing every pair of employees.
+
+Generates --employees synthetic employees spread over --ministries
+ministries, with --duplicates planted pairs sharing a bank account, a
+phone number, an address, or a respelt name and date of birth in another
+ministry. Feeds them all through app.analytics.payroll.IdentityIndex, as
+the daily payroll scan does, and compares every pair of the first
+--pairwise-employees with the same matching rules, as an analyst's script
+would. Reports each one's time, the pairwise time extrapolated to the whole
+payroll (it grows with the square of the count), and the share of planted
+pairs each found.
+
+    python -m benchmarks.payroll_clusters --employees 1000000 --pairwise-employees 3000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--employees", type=int, default=1_000_000)
+parser.add_argument("--pairwise-employees", type=int, default=3_000)
+parser.add_argument("--ministries", type=int, default=22)
+parser.add_argument("--duplicates", type=int, default=2_000, help="planted pairs per rule")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "benchmark")
+
+from app.analytics import payroll
+
+FIRST_NAMES = ["John", "Mary", "Peter", "Grace", "James", "Faith", "David", "Mercy", "Joseph", "Esther",
+               "Brian", "Ann", "Kevin", "Joyce", "Daniel", "Ruth", "Samuel", "Lucy", "Paul", "Alice"]
+LAST_NAMES = ["Kamau", "Wanjiru", "Otieno", "Achieng", "Mwangi", "Njeri", "Kiprop", "Chebet", "Ouma", "Wafula",
+              "Mutua", "Mwende", "Kipchoge", "Akinyi", "Omondi", "Nyambura", "Kibet", "Jepkosgei", "Barasa", "Wambui"]
+BANKS = ["Equity Bank", "KCB", "Co-operative Bank", "NCBA", "Absa Kenya", "Stanbic", "Family Bank"]
+RESPELLINGS = {"John": "Jon", "Mwangi": "Muangi", "Wanjiru": "Wanjirru", "Otieno": "Otienno", "Mary": "Marry"}
+
+
+def employee(rng: random.Random, number: int):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "employee_id": number,
+        "first_name": first,
+        "last_name": last,
+        "date_of_birth": date(1960, 1, 1) + timedelta(days=rng.randrange(40 * 365)),
+        "phone_number": f"+2547{number:08d}",
+        "alternative_phone": None,
+        "physical_address": f"House {number}, Estate {rng.randrange(5_000)}",
+        "bank_name": rng.choice(BANKS),
+        "account_number": f"{number:012d}",
+        "ministry_id": rng.randrange(args.ministries),
+    }
+
+
+def generate(rng: random.Random):
+    """
+    Employees, and the planted duplicate pairs for each rule as (row, row).
+    """
+    employees = [employee(rng, number) for number in range(args.employees)]
+    planted = {rule: [] for rule in payroll.IDENTITY_RULES}
+    copies = rng.sample(range(args.employees), 4 * args.duplicates)
+    for position, copy in enumerate(copies):
+        rule = payroll.IDENTITY_RULES[position % 4]
+        original = rng.randrange(args.employees)
+        if original == copy:
+            continue
+        source, target = employees[original], employees[copy]
+        if rule == payroll.SHARED_BANK_ACCOUNT:
+            # Same account written with and without its leading zeros
+            target["bank_name"], target["account_number"] = source["bank_name"].upper(), source["account_number"].lstrip("0")
+        elif rule == payroll.SHARED_PHONE:
+            target["alternative_phone"] = "0" + source["phone_number"][-9:]
+        elif rule == payroll.SHARED_ADDRESS:
+            target["physical_address"] = source["physical_address"].lower().replace(",", "")
+        else:
+            target["first_name"] = RESPELLINGS.get(source["first_name"], source["first_name"])
+            target["last_name"] = RESPELLINGS.get(source["last_name"], source["last_name"])
+            target["date_of_birth"] = source["date_of_birth"]
+            target["ministry_id"] = (source["ministry_id"] + 1) % args.ministries
+        planted[rule].append((min(original, copy), max(original, copy)))
+    return employees, planted
+
+
+def keys(row):
+    return {
+        payroll.SHARED_BANK_ACCOUNT: {payroll.bank_key(row["bank_name"], row["account_number"])},
+        payroll.SHARED_PHONE: {payroll.phone_key(row["phone_number"]), payroll.phone_key(row["alternative_phone"])} - {""},
+        payroll.SHARED_ADDRESS: {payroll.address_key(row["physical_address"])},
+        payroll.DUPLICATE_NAME: {payroll.name_key(row["first_name"], row["last_name"], row["date_of_birth"])} - {""},
+    }
+
+
+def pairwise(employees):
+    """
+    Every pair compared field by field, the keys computed once per employee.
+    """
+    row_keys = [keys(row) for row in employees]
+    found = {rule: set() for rule in payroll.IDENTITY_RULES}
+    for i in range(len(employees)):
+        for j in range(i + 1, len(employees)):
+            for rule in payroll.IDENTITY_RULES:
+                if row_keys[i][rule] & row_keys[j][rule]:
+                    if rule != payroll.DUPLICATE_NAME or employees[i]["ministry_id"] != employees[j]["ministry_id"]:
+                        found[rule].add((i, j))
+    return found
+
+
+def indexed(employees):
+    index = payroll.IdentityIndex(max_cluster_size=25)
+    for row in employees:
+        index.add(**row)
+    found = {rule: set() for rule in payroll.IDENTITY_RULES}
+    for cluster in index.clusters():
+        rows = sorted(cluster.rows)
+        found[cluster.rule].update((a, b) for n, a in enumerate(rows) for b in rows[n + 1:])
+    return found
+
+
+def timed(function, *arguments):
+    started = time.perf_counter()
+    result = function(*arguments)
+    return result, time.perf_counter() - started
+
+
+def recall(found, planted, rows):
+    cells = []
+    for rule in payroll.IDENTITY_RULES:
+        within = {pair for pair in planted[rule] if pair[1] < rows}
+        cells.append(f"{len(found[rule] & within) / len(within):.1%}" if within else "-")
+    print("".join(f"{cell:>22}" for cell in cells))
+
+
+def main():
+    employees, planted = generate(random.Random(args.seed))
+    subset = min(args.pairwise_employees, args.employees)
+
+    print(f"{args.employees:,} employees, {args.duplicates:,} planted pairs per rule")
+    print(f"{'method':<10}{'employees':>12}{'seconds':>10}" + "".join(f"{rule:>22}" for rule in payroll.IDENTITY_RULES))
+
+    found, elapsed = timed(indexed, employees)
+    print(f"{'index':<10}{args.employees:>12,}{elapsed:>10.2f}", end="")
+    recall(found, planted, args.employees)
+
+    found, elapsed = timed(pairwise, employees[:subset])
+    print(f"{'pairwise':<10}{subset:>12,}{elapsed:>10.2f}", end="")
+    recall(found, planted, subset)
+    projected = elapsed * (args.employees / subset) ** 2
+    print(f"pairwise over all {args.employees:,} employees: about {projected / 3600:,.1f} hours")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Insert throughput and index size with random (v4) versus time-ordered (v7) UUID keys.
+
+Inserts --rows rows into a table clustered on a 16-byte UUID primary key,
+committing every --batch rows, once with uuid.uuid4 and once with
+app.models.base.uuid7. The page cache is kept small (--cache-kb) so the
+index does not fit in memory, as on a large production table. Reports rows
+per second over the last batches, the final page count, and how full the
+pages are.
+
+SQLite WITHOUT ROWID tables are B-trees keyed on the primary key, like a
+Postgres primary key index, so the effect of insert order is the same.
+
+    python -m benchmarks.uuid_insert --rows 500000 --batch 1000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+parser.add_argument("--rows", type=int, default=500_000)
+parser.add_argument("--batch", type=int, default=1_000)
+parser.add_argument("--cache-kb", type=int, default=2_048)
+args = parser.parse_args()
+
+for name in ("POSTGRES_SERVER", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "benchmark")
+
+from app.models.base import uuid7
+
+PAYLOAD = "x" * 120
+
+
+def run(generate) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "uuid_insert.db")
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA cache_size = -{args.cache_kb}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(
+        "CREATE TABLE crime_reports (id BLOB PRIMARY KEY, created_at REAL, description TEXT) WITHOUT ROWID"
+    )
+
+    batches = args.rows // args.batch
+    tail = max(1, batches // 10)
+    started = tail_started = time.perf_counter()
+    for batch in range(batches):
+        if batch == batches - tail:
+            tail_started = time.perf_counter()
+        now = time.time()
+        conn.executemany(
+            "INSERT INTO crime_reports VALUES (?, ?, ?)",
+            [(generate().bytes, now, PAYLOAD) for _ in range(args.batch)],
+        )
+        conn.commit()
+    finished = time.perf_counter()
+
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    conn.close()
+    return {
+        "rows_per_s": args.rows / (finished - started),
+        "tail_rows_per_s": tail * args.batch / (finished - tail_started),
+        "pages": pages,
+        "fill": args.rows * (16 + 8 + len(PAYLOAD)) / (pages * page_size),
+    }
+
+
+def main():
+    print(f"{args.rows} rows, batches of {args.batch}, {args.cache_kb} KB page cache")
+    print(f"{'key':<8}{'rows/s':>10}{'last 10% rows/s':>18}{'pages':>10}{'page fill':>11}")
+    for name, generate in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+        result = run(generate)
+        print(
+            f"{name:<8}{result['rows_per_s']:>10.0f}{result['tail_rows_per_s']:>18.0f}"
+            f"{result['pages']:>10}{result['fill']:>11.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()